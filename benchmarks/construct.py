@@ -0,0 +1,74 @@
+'''
+construct.py
+Times building a large number of Transaction objects, validated and trusted,
+and measures the memory held by them with tracemalloc.
+
+    python benchmarks/construct.py                  #1,000,000 of each
+    python benchmarks/construct.py --count 100000
+'''
+import argparse
+import os
+import sys
+import time
+import tracemalloc
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), '..'))
+
+from python_paystack.objects.transactions import Transaction
+
+
+def build(count, emails, trusted=False):
+    '''
+    Builds count transactions cycling through emails, returns the elapsed seconds
+    '''
+    emails = (emails * (count // len(emails) + 1))[:count]
+    started = time.perf_counter()
+    for email in emails:
+        Transaction(5000, email, trusted=trusted)
+    return time.perf_counter() - started
+
+
+def memory(count):
+    '''
+    Returns the bytes held per transaction once count transactions are built,
+    and after each of them was converted with to_dict
+    '''
+    tracemalloc.start()
+    try:
+        baseline = tracemalloc.get_traced_memory()[0]
+        transactions = [Transaction(5000, 'customer@example.com', trusted=True)
+                        for _ in range(count)]
+        built = tracemalloc.get_traced_memory()[0]
+        for transaction in transactions:
+            transaction.to_dict()
+        converted = tracemalloc.get_traced_memory()[0]
+    finally:
+        tracemalloc.stop()
+    return (built - baseline) / count, (converted - baseline) / count
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__,
+                                     formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--count', type=int, default=1000000)
+    args = parser.parse_args()
+
+    distinct = ['customer%d@example.com' % index for index in range(args.count)]
+    runs = [
+        ('validated, one email', ['customer@example.com'], False),
+        ('validated, distinct emails', distinct, False),
+        ('trusted, distinct emails', distinct, True),
+    ]
+    for name, emails, trusted in runs:
+        elapsed = build(args.count, emails, trusted)
+        print('%-28s %10d in %6.2fs  %10.0f objects/s  %6.2f us each' % (
+            name, args.count, elapsed, args.count / elapsed, elapsed / args.count * 1e6))
+
+    #Includes the list slot holding each transaction
+    built, converted = memory(args.count)
+    print('%-28s %10d  %6.0f bytes each, %6.0f after to_dict' % (
+        'memory', args.count, built, converted))
+
+
+if __name__ == '__main__':
+    main()
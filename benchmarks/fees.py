@@ -0,0 +1,102 @@
+'''
+fees.py
+Checks the batch fee engine against Transaction.full_transaction_cost and times
+both over a batch of amounts. Exits with an error if any cost differs.
+
+    python benchmarks/fees.py                     #1,000,000 amounts
+    python benchmarks/fees.py --count 100000
+'''
+import argparse
+import os
+import sys
+import time
+
+import numpy
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), '..'))
+
+from python_paystack.fees import (batch_transaction_cost, exact_transaction_cost, FEE_CAP,
+                                  FEE_THRESHOLD)
+from python_paystack.objects.transactions import Transaction
+from python_paystack.paystack_config import PaystackConfig
+
+SEED = 20180101
+
+
+def dataset(count):
+    '''
+    Returns arrays of amounts and locales, with the amounts around the
+    threshold and cap boundaries well represented
+    '''
+    rng = numpy.random.default_rng(SEED)
+    amounts = numpy.concatenate([
+        rng.integers(1, 20000000, count // 2),
+        rng.integers(FEE_THRESHOLD - 5000, FEE_THRESHOLD + 5000, count // 4),
+        rng.integers(10000000, 16000000, count - count // 2 - count // 4),
+    ])
+    locales = rng.choice(numpy.array(['LOCAL', 'INTERNATIONAL']), len(amounts))
+    return amounts, locales
+
+
+def timed(function):
+    started = time.perf_counter()
+    result = function()
+    return result, time.perf_counter() - started
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__,
+                                     formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--count', type=int, default=1000000)
+    args = parser.parse_args()
+
+    local_cost, intl_cost = PaystackConfig.LOCAL_COST, PaystackConfig.INTL_COST
+    amounts, locales = dataset(args.count)
+    amount_list, locale_list = amounts.tolist(), locales.tolist()
+
+    def scalar():
+        transaction = Transaction(1, 'customer@example.com')
+        costs = []
+        for amount, locale in zip(amount_list, locale_list):
+            transaction.amount = amount
+            costs.append(transaction.full_transaction_cost(locale, local_cost, intl_cost))
+        return costs
+
+    def exact():
+        rates = {'LOCAL' : local_cost, 'INTERNATIONAL' : intl_cost}
+        return [exact_transaction_cost(amount, rates[locale])
+                for amount, locale in zip(amount_list, locale_list)]
+
+    scalar_costs, scalar_time = timed(scalar)
+    batch_costs, batch_time = timed(
+        lambda: batch_transaction_cost(amounts, locales, local_cost, intl_cost))
+    exact_costs, exact_time = timed(exact)
+    exact_batch_costs, exact_batch_time = timed(
+        lambda: batch_transaction_cost(amounts, locales, local_cost, intl_cost, exact=True))
+
+    count = len(amount_list)
+    for name, elapsed in (('full_transaction_cost', scalar_time),
+                          ('batch_transaction_cost', batch_time),
+                          ('exact_transaction_cost', exact_time),
+                          ('batch_transaction_cost exact', exact_batch_time)):
+        print('%-30s %8.3fs  %12.0f amounts/s' % (name, elapsed, count / elapsed))
+
+    scalar_costs = numpy.array(scalar_costs)
+    exact_costs = numpy.array(exact_costs)
+    batch_mismatches = int(numpy.count_nonzero(batch_costs != scalar_costs))
+    exact_mismatches = int(numpy.count_nonzero(exact_batch_costs != exact_costs))
+    rounding = exact_costs - scalar_costs
+    capped = int(numpy.count_nonzero(scalar_costs == amounts + FEE_CAP))
+
+    print('%d amounts, %d at the fee cap' % (count, capped))
+    print('batch vs full_transaction_cost: %d differ' % batch_mismatches)
+    print('exact batch vs exact_transaction_cost: %d differ' % exact_mismatches)
+    print('exact vs floating point: %d differ, by %d to %d kobo' % (
+        numpy.count_nonzero(rounding), rounding.min(), rounding.max()))
+
+    if batch_mismatches or exact_mismatches:
+        sys.exit(1)
+
+
+if __name__ == '__main__':
+    main()
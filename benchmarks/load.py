@@ -0,0 +1,185 @@
+'''
+load.py
+Drives the managers against a local PaystackSimulator and reports throughput
+and p50/p99 latency per operation.
+
+    python benchmarks/load.py --requests 5000 --concurrency 32 --latency 0.005
+    python benchmarks/load.py --http --throttle-rate 0.01 --error-rate 0.01
+
+--http serves the simulator from this process, so client and server share the GIL.
+For higher loads run it separately and pass its url:
+
+    python -m python_paystack.simulator --port 8000
+    python benchmarks/load.py --url http://127.0.0.1:8000
+'''
+import argparse
+import os
+import sys
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), '..'))
+
+from python_paystack.paystack_config import PaystackConfig
+
+
+def percentile(samples, fraction):
+    '''
+    Returns the sample at fraction (0 to 1) of the sorted samples
+    '''
+    if not samples:
+        return 0.0
+    index = min(len(samples) - 1, int(round(fraction * (len(samples) - 1))))
+    return samples[index]
+
+
+def build_operations(session, simulator=None):
+    '''
+    Returns a list of (name, callable) pairs, each making one API call.
+    Seeds simulator with transactions to list, if given.
+    '''
+    from python_paystack.managers import (CustomersManager, PlanManager, TransactionsManager,
+                                          TransfersManager, Utils)
+    from python_paystack.objects.customers import Customer
+    from python_paystack.objects.plans import Plan
+    from python_paystack.objects.transactions import Transaction
+    from python_paystack.objects.transfers import Transfer
+
+    transactions = TransactionsManager(session=session)
+    #Uncached, so transaction.verify measures a round trip; the cached path is reported apart
+    transactions.verification_cache = None
+    cached = TransactionsManager(session=session)
+    customers = CustomersManager(session=session)
+    plans = PlanManager(session=session)
+    transfers = TransfersManager(session=session)
+    utils = Utils(session=session)
+
+    if simulator is not None:
+        simulator.add_transactions(500)
+    customer = customers.create(Customer('load@example.com'))
+    charge = Transaction(5000, 'load@example.com')
+    charge.authorization_code = 'AUTH_LOAD'
+    reference = transactions.charge_authorization(charge)['reference']
+    transfer = transfers.create(Transfer(5000, 'RCP_load'))
+    counter = iter(range(10 ** 9))
+
+    def initialize():
+        transaction = Transaction(5000, 'load%d@example.com' % next(counter))
+        return transactions.initialize_transaction('STANDARD', transaction)
+
+    def charge_authorization():
+        transaction = Transaction(5000, 'load@example.com')
+        transaction.authorization_code = 'AUTH_LOAD'
+        return transactions.charge_authorization(transaction)
+
+    return [
+        ('transaction.initialize', initialize),
+        ('transaction.verify', lambda: transactions.verify_transaction(reference)),
+        ('transaction.verify (cached)', lambda: cached.verify_transaction(reference)),
+        ('transaction.charge_authorization', charge_authorization),
+        ('transaction.list', lambda: transactions.get_all(per_page=50)),
+        ('transaction.totals', transactions.get_total_transactions),
+        ('customer.get', lambda: customers.get(customer.id)),
+        ('customer.list', lambda: customers.get_all(per_page=50)),
+        ('plan.create', lambda: plans.create(Plan('Load', 'monthly', 10000))),
+        ('transfer.get', lambda: transfers.get(transfer.id)),
+        ('bank.resolve_bvn', lambda: utils.resolve_bvn('12345678901')),
+    ]
+
+
+def run(operations, requests, concurrency):
+    '''
+    Makes requests calls, cycling through operations on concurrency threads.
+    Returns a dict of the latencies, error count and busy seconds of each operation,
+    and the elapsed time.
+    '''
+    results = {name : {'latencies' : [], 'errors' : 0, 'busy' : 0.0} for name, _ in operations}
+    lock = threading.Lock()
+
+    def call(index):
+        name, operation = operations[index % len(operations)]
+        started = time.perf_counter()
+        try:
+            operation()
+        except BaseException:
+            with lock:
+                results[name]['errors'] += 1
+                results[name]['busy'] += time.perf_counter() - started
+            return
+        elapsed = time.perf_counter() - started
+        with lock:
+            results[name]['latencies'].append(elapsed)
+            results[name]['busy'] += elapsed
+
+    started = time.perf_counter()
+    with ThreadPoolExecutor(max_workers=concurrency) as executor:
+        list(executor.map(call, range(requests)))
+    return results, time.perf_counter() - started
+
+
+def report(results, elapsed):
+    '''
+    Prints a row per operation and the overall throughput.
+    An operation's calls/s is over the seconds threads spent in it, not the whole run,
+    so it is the rate one thread sustains on that operation alone.
+    '''
+    print('%-34s %8s %7s %10s %10s %10s' % ('operation', 'calls', 'errors', 'calls/s',
+                                            'p50 ms', 'p99 ms'))
+    total = 0
+    for name, result in results.items():
+        latencies = sorted(result['latencies'])
+        total += len(latencies) + result['errors']
+        print('%-34s %8d %7d %10.0f %10.2f %10.2f' % (
+            name, len(latencies), result['errors'],
+            len(latencies) / result['busy'] if result['busy'] else 0.0,
+            percentile(latencies, 0.5) * 1000, percentile(latencies, 0.99) * 1000))
+    print('%d calls in %.2fs, %.0f calls/s' % (total, elapsed, total / elapsed))
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__,
+                                     formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--requests', type=int, default=5000)
+    parser.add_argument('--concurrency', type=int, default=16)
+    parser.add_argument('--latency', type=float, default=0.0,
+                        help='seconds the simulator adds to every response')
+    parser.add_argument('--error-rate', type=float, default=0.0)
+    parser.add_argument('--throttle-rate', type=float, default=0.0)
+    parser.add_argument('--http', action='store_true',
+                        help='serve the simulator over local HTTP instead of in-process')
+    parser.add_argument('--url', help='url of a simulator running in another process')
+    args = parser.parse_args()
+
+    PaystackConfig.SECRET_KEY = PaystackConfig.SECRET_KEY or 'sk_test_load'
+    PaystackConfig.PUBLIC_KEY = PaystackConfig.PUBLIC_KEY or 'pk_test_load'
+    PaystackConfig.RETRY_BACKOFF = 0.01
+
+    from python_paystack.simulator import PaystackSimulator, SimulatorSession, serve
+    from python_paystack.transport import build_session
+
+    simulator = PaystackSimulator(latency=args.latency, error_rate=args.error_rate,
+                                  throttle_rate=args.throttle_rate, retry_after=0, seed=1)
+    server = None
+    if args.url:
+        PaystackConfig.PAYSTACK_URL = args.url
+        session = build_session(pool_maxsize=args.concurrency)
+    elif args.http:
+        server = serve(simulator)
+        PaystackConfig.PAYSTACK_URL = server.url
+        session = build_session(pool_maxsize=args.concurrency)
+    else:
+        session = SimulatorSession(simulator)
+
+    try:
+        operations = build_operations(session, simulator if not args.url else None)
+        results, elapsed = run(operations, args.requests, args.concurrency)
+        report(results, elapsed)
+    finally:
+        if server is not None:
+            server.shutdown()
+            server.server_close()
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,448 @@
+'''
+suite.py
+Offline benchmarks of the library's hot paths, run against fixed datasets and a
+stub transport so results are comparable between runs on the same machine.
+
+    python benchmarks/suite.py                          #run every benchmark
+    python benchmarks/suite.py filters requests         #only names containing these words
+    python benchmarks/suite.py --save results.json      #record the results
+    python benchmarks/suite.py --compare results.json   #fail on regressions against a recording
+
+Each benchmark reports the best time per call of several repeats, in microseconds.
+Benchmarks handling a batch per call also report the items handled per second.
+'''
+import argparse
+import itertools
+import json
+import os
+import platform
+import random
+import subprocess
+import sys
+import timeit
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), '..'))
+
+os.environ.setdefault('PAYSTACK_SECRET_KEY', 'sk_test_benchmark')
+os.environ.setdefault('PAYSTACK_PUBLIC_KEY', 'pk_test_benchmark')
+
+BENCHMARKS = []
+
+#Seed for every generated dataset, change it only together with the recorded baselines
+SEED = 20180101
+
+
+def benchmark(name, items=None):
+    '''
+    Registers a benchmark. The decorated function does any setup and returns
+    the callable that is timed.
+
+    Arguments:
+    items : Number of items each call handles, to report items per second
+    '''
+    def register(setup):
+        BENCHMARKS.append((name, setup, items))
+        return setup
+    return register
+
+
+#Datasets
+
+def transaction_record(rng, index):
+    '''
+    A transaction as returned by paystack's list and verify endpoints
+    '''
+    amount = rng.randint(100, 10000000)
+    return {
+        'id' : index,
+        'domain' : 'live',
+        'status' : rng.choice(['success', 'failed', 'abandoned']),
+        'reference' : 'ref%08d' % index,
+        'amount' : amount,
+        'gateway_response' : 'Approved',
+        'paid_at' : '2018-01-%02dT10:00:00.000Z' % rng.randint(1, 28),
+        'created_at' : '2018-01-%02dT09:59:00.000Z' % rng.randint(1, 28),
+        'channel' : 'card',
+        'currency' : rng.choice(['NGN', 'NGN', 'NGN', 'GHS', 'USD']),
+        'ip_address' : '41.58.0.%d' % rng.randint(1, 254),
+        'metadata' : {'custom_fields' : [{'display_name' : 'Order', 'variable_name' : 'order',
+                                          'value' : 'ORD%d' % index}]},
+        'fees' : int(amount * 0.015),
+        'customer' : {'id' : rng.randint(1, 500), 'email' : 'customer%d@example.com' % index,
+                      'customer_code' : 'CUS_%010d' % index, 'risk_action' : 'default'},
+        'authorization' : {'authorization_code' : 'AUTH_%d' % index, 'bin' : '408408',
+                           'last4' : '4081', 'exp_month' : '12', 'exp_year' : '2030',
+                           'card_type' : 'visa', 'bank' : 'Test Bank', 'country_code' : 'NG',
+                           'reusable' : True},
+    }
+
+
+def transaction_records(count):
+    rng = random.Random(SEED)
+    return [transaction_record(rng, index) for index in range(count)]
+
+
+class StubResponse():
+    status_code = 200
+    headers = {}
+
+    def __init__(self, content):
+        self.content = content
+
+
+class StubSession():
+    '''
+    Transport returning the same canned response to every request,
+    so only the client's own overhead is measured
+    '''
+
+    def __init__(self, data, meta=None):
+        content = {'status' : True, 'message' : 'ok', 'data' : data}
+        if meta is not None:
+            content['meta'] = meta
+        self.response = StubResponse(json.dumps(content).encode())
+
+    def request(self, method, url, **kwargs):
+        return self.response
+
+
+#Serialization
+
+@benchmark('serialization.transaction.to_dict')
+def bench_to_dict():
+    from python_paystack.objects.transactions import Transaction
+    transaction = Transaction.from_dict(transaction_records(1)[0])
+    return transaction.to_dict
+
+
+@benchmark('serialization.transaction.from_dict')
+def bench_from_dict():
+    from python_paystack.objects.transactions import Transaction
+    record = transaction_records(1)[0]
+    return lambda: Transaction.from_dict(record)
+
+
+@benchmark('serialization.transaction.to_json')
+def bench_to_json():
+    from python_paystack.objects.transactions import Transaction
+    transaction = Transaction.from_dict(transaction_records(1)[0])
+    return transaction.to_json
+
+
+@benchmark('serialization.transaction.from_json')
+def bench_from_json():
+    from python_paystack.objects.transactions import Transaction
+    data = json.dumps(transaction_records(1)[0])
+    return lambda: Transaction.from_json(data)
+
+
+@benchmark('serialization.transaction.to_json_pickled')
+def bench_to_json_pickled():
+    from python_paystack.objects.transactions import Transaction
+    transaction = Transaction.from_dict(transaction_records(1)[0])
+    return lambda: transaction.to_json(pickled=True)
+
+
+@benchmark('serialization.transaction.from_json_pickled')
+def bench_from_json_pickled():
+    from python_paystack.objects.transactions import Transaction
+    data = Transaction.from_dict(transaction_records(1)[0]).to_json(pickled=True)
+    return lambda: Transaction.from_json(data, pickled=True)
+
+
+@benchmark('serialization.transaction.construct')
+def bench_construct():
+    from python_paystack.objects.transactions import Transaction
+    return lambda: Transaction(5000, 'customer@example.com')
+
+
+@benchmark('serialization.transaction.construct_trusted')
+def bench_construct_trusted():
+    from python_paystack.objects.transactions import Transaction
+    return lambda: Transaction(5000, 'customer@example.com', trusted=True)
+
+
+@benchmark('serialization.transfer.construct')
+def bench_transfer_construct():
+    from python_paystack.objects.transfers import Transfer
+    return lambda: Transfer(5000, 'RCP_benchmark')
+
+
+#Validation
+
+@benchmark('validation.email')
+def bench_email():
+    from python_paystack.objects.validation import is_valid_email
+    return lambda: is_valid_email('customer.name+tag@mail.example.com')
+
+
+@benchmark('validation.url')
+def bench_url():
+    from python_paystack.objects.validation import is_valid_url
+    return lambda: is_valid_url('https://example.com/paystack/callback')
+
+
+#Fees
+
+@benchmark('fees.full_transaction_cost')
+def bench_full_transaction_cost():
+    from python_paystack.objects.transactions import Transaction
+    transaction = Transaction(123456, 'customer@example.com')
+    return lambda: transaction.full_transaction_cost('LOCAL', 0.015, 0.039)
+
+
+@benchmark('fees.exact_transaction_cost')
+def bench_exact_transaction_cost():
+    from python_paystack.fees import exact_transaction_cost
+    return lambda: exact_transaction_cost(123456, 0.015)
+
+
+@benchmark('fees.batch_transaction_cost.10k')
+def bench_batch_transaction_cost():
+    try:
+        import numpy
+    except ImportError:
+        return None
+    from python_paystack.fees import batch_transaction_cost
+    amounts = numpy.array([record['amount'] for record in transaction_records(10000)])
+    return lambda: batch_transaction_cost(amounts, 'LOCAL', 0.015, 0.039)
+
+
+#Filters
+
+@benchmark('filters.find_key_value.nested')
+def bench_find_key_value():
+    from python_paystack.objects.filters import Filter
+    record = transaction_records(1)[0]
+    return lambda: Filter.find_key_value('last4', record)
+
+
+@benchmark('filters.filter_amount.100k')
+def bench_filter_amount():
+    from python_paystack.objects.filters import Filter
+    records = transaction_records(100000)
+    amount_range = range(100000, 5000000)
+    return lambda: [record for record in records if Filter.filter_amount(amount_range, record)]
+
+
+@benchmark('filters.between.100k')
+def bench_between():
+    #The query of filters.filter_amount.100k, as a Predicate
+    from python_paystack.objects.filters import Filter
+    records = transaction_records(100000)
+    predicate = Filter.between('amount', range(100000, 5000000))
+    return lambda: list(predicate.select(records))
+
+
+@benchmark('filters.predicate.10k')
+def bench_predicate():
+    from python_paystack.objects.filters import Filter
+    records = transaction_records(10000)
+    predicate = (Filter.between('amount', range(100000, 5000000))
+                 & Filter.is_in('currency', ('NGN', 'GHS'))
+                 & Filter.equals('authorization.card_type', 'visa'))
+    return lambda: list(predicate.select(records))
+
+
+@benchmark('filters.table.10k')
+def bench_table_filter():
+    try:
+        from python_paystack.columnar import TransactionTable
+    except ImportError:
+        return None
+    table = TransactionTable.from_records(transaction_records(10000))
+    return lambda: table.filter(amount_range=range(100000, 5000000), currencies=['NGN', 'GHS'])
+
+
+#Requests
+
+@benchmark('requests.verify_transaction')
+def bench_verify():
+    from python_paystack.managers import TransactionsManager
+    manager = TransactionsManager(session=StubSession(transaction_records(1)[0]))
+    manager.verification_cache = None
+    return lambda: manager.verify_transaction('ref00000000')
+
+
+@benchmark('requests.verify_transaction.cached')
+def bench_verify_cached():
+    from python_paystack.cache import VerificationCache
+    from python_paystack.managers import TransactionsManager
+    record = dict(transaction_records(1)[0], status='success')
+    manager = TransactionsManager(session=StubSession(record))
+    manager.verification_cache = VerificationCache()
+    return lambda: manager.verify_transaction('ref00000000')
+
+
+@benchmark('requests.mixins.get')
+def bench_get():
+    from python_paystack.managers import CustomersManager
+    customer = {'id' : 1, 'email' : 'customer@example.com', 'customer_code' : 'CUS_1'}
+    manager = CustomersManager(session=StubSession(customer))
+    return lambda: manager.get(1)
+
+
+@benchmark('requests.mixins.get_mirrored')
+def bench_get_mirrored():
+    from python_paystack.managers import CustomersManager
+    from python_paystack.mirror import CUSTOMER_FIELDS, Mirror
+    customer = {'id' : 1, 'email' : 'customer@example.com', 'customer_code' : 'CUS_1'}
+    mirror = Mirror(CUSTOMER_FIELDS)
+    mirror.put(customer)
+    manager = CustomersManager(session=StubSession(customer), mirror=mirror)
+    return lambda: manager.get('customer@example.com')
+
+
+@benchmark('requests.mixins.create')
+def bench_create():
+    from python_paystack.managers import CustomersManager
+    from python_paystack.objects.customers import Customer
+    customer = Customer('customer@example.com', 'Ada', 'Obi')
+    manager = CustomersManager(session=StubSession({'id' : 1, 'email' : customer.email}))
+    return lambda: manager.create(customer)
+
+
+@benchmark('requests.mixins.get_all.100')
+def bench_get_all():
+    from python_paystack.managers import TransactionsManager
+    meta = {'total' : 100, 'perPage' : 100, 'page' : 1, 'pageCount' : 1}
+    manager = TransactionsManager(session=StubSession(transaction_records(100), meta))
+    return lambda: manager.get_all(per_page=100)
+
+
+@benchmark('requests.execute.raw')
+def bench_execute():
+    from python_paystack.managers import TransactionsManager
+    manager = TransactionsManager(session=StubSession({'id' : 1}))
+    url = manager.PAYSTACK_URL + '/transaction/totals'
+    return lambda: manager.execute('GET', url)
+
+
+@benchmark('requests.client.create')
+def bench_client_create():
+    from python_paystack.client import PaystackClient
+    return lambda: PaystackClient('sk_test_tenant', 'pk_test_tenant')
+
+
+@benchmark('requests.client.bind')
+def bench_client_bind():
+    from python_paystack.client import PaystackClient
+    from python_paystack.managers import TransactionsManager
+    manager = TransactionsManager(session=StubSession({'id' : 1}))
+    clients = [PaystackClient('sk_test_%d' % index, 'pk_test_%d' % index) for index in range(1000)]
+    tenants = itertools.cycle(clients)
+    return lambda: manager.bind(next(tenants))
+
+
+#Webhooks
+
+@benchmark('webhooks.verify_and_parse')
+def bench_webhook():
+    from python_paystack.webhooks import compute_signature, parse_event, verify_signature
+    payload = json.dumps({'event' : 'charge.success',
+                          'data' : transaction_records(1)[0]}).encode()
+    signature = compute_signature(payload, 'sk_test_benchmark')
+
+    def handle():
+        verify_signature(payload, signature, 'sk_test_benchmark')
+        return parse_event(payload)
+
+    return handle
+
+
+@benchmark('webhooks.processor.1000', items=1000)
+def bench_webhook_processor():
+    #Submits 1000 signed events and waits for the workers to handle them
+    from python_paystack.webhooks import SeenSet, WebhookProcessor, compute_signature
+    deliveries = []
+    for record in transaction_records(1000):
+        payload = json.dumps({'event' : 'charge.success', 'data' : record}).encode()
+        deliveries.append((payload, compute_signature(payload, 'sk_test_benchmark')))
+    processor = WebhookProcessor('sk_test_benchmark')
+    processor.on('charge.success', lambda event: event.object)
+
+    def process():
+        #The same deliveries are sent every call, so forget the ones already seen
+        processor.seen = SeenSet()
+        for payload, signature in deliveries:
+            processor.submit(payload, signature)
+        processor.join()
+
+    return process
+
+
+#Runner
+
+def measure(function, repeat=5, min_time=0.2):
+    '''
+    Returns the best time per call in seconds over repeat runs
+    of at least min_time seconds each
+    '''
+    timer = timeit.Timer(function)
+    number, _ = timer.autorange()
+    number = max(1, int(number * min_time / 0.2))
+    return min(timer.repeat(repeat=repeat, number=number)) / number
+
+
+def environment():
+    try:
+        commit = subprocess.run(['git', 'rev-parse', '--short', 'HEAD'], capture_output=True,
+                                text=True, cwd=os.path.dirname(os.path.abspath(__file__))).stdout
+    except OSError:
+        commit = ''
+    return {'python' : platform.python_version(), 'machine' : platform.machine(),
+            'commit' : commit.strip()}
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__,
+                                     formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('names', nargs='*', help='only run benchmarks containing these words')
+    parser.add_argument('--repeat', type=int, default=5)
+    parser.add_argument('--save', help='write the results to this json file')
+    parser.add_argument('--compare', help='json file of earlier results to compare with')
+    parser.add_argument('--threshold', type=float, default=0.2,
+                        help='slowdown reported as a regression, 0.2 is 20%%')
+    args = parser.parse_args()
+
+    baseline = {}
+    if args.compare:
+        with open(args.compare) as baseline_file:
+            baseline = json.load(baseline_file)['results']
+
+    results = {}
+    regressions = []
+    for name, setup, items in BENCHMARKS:
+        if args.names and not any(word in name for word in args.names):
+            continue
+        function = setup()
+        if function is None:
+            print('%-46s skipped' % name)
+            continue
+
+        seconds = measure(function, args.repeat)
+        results[name] = seconds
+        line = '%-46s %12.2f us' % (name, seconds * 1e6)
+        if items:
+            line += '  %10.0f/s' % (items / seconds)
+        if name in baseline:
+            change = seconds / baseline[name] - 1
+            line += '  %+7.1f%%' % (change * 100)
+            if change > args.threshold:
+                regressions.append(name)
+                line += '  REGRESSION'
+        print(line)
+
+    if args.save:
+        with open(args.save, 'w') as results_file:
+            json.dump({'environment' : environment(), 'results' : results}, results_file,
+                      indent=2, sort_keys=True)
+
+    if regressions:
+        print('%d regression(s) over %d%%: %s' % (len(regressions), args.threshold * 100,
+                                                 ', '.join(regressions)))
+        sys.exit(1)
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,48 @@
+'''
+python_paystack
+A Paystack API wrapper.
+
+The names below are imported from their modules on first use, so importing the
+package itself is cheap. e.g
+
+    from python_paystack import PaystackConfig, TransactionsManager
+'''
+import importlib
+
+_EXPORTS = {
+    'PaystackConfig' : '.paystack_config',
+    'PaystackClient' : '.client',
+    'Utils' : '.managers',
+    'TransactionsManager' : '.managers',
+    'CustomersManager' : '.managers',
+    'PlanManager' : '.managers',
+    'TransfersManager' : '.managers',
+    'SubAccountManager' : '.managers',
+    'Transaction' : '.objects.transactions',
+    'Customer' : '.objects.customers',
+    'Plan' : '.objects.plans',
+    'Transfer' : '.objects.transfers',
+    'SubAccount' : '.objects.subaccounts',
+    'Filter' : '.objects.filters',
+    'APIConnectionFailedError' : '.objects.errors',
+    'InvalidEmailError' : '.objects.errors',
+    'URLValidationError' : '.objects.errors',
+    'InvalidSignatureError' : '.objects.errors',
+    'WebhookProcessor' : '.webhooks',
+    'Mirror' : '.mirror',
+}
+
+__all__ = list(_EXPORTS)
+
+
+def __getattr__(name):
+    module = _EXPORTS.get(name)
+    if module is None:
+        raise AttributeError("module %r has no attribute %r" % (__name__, name))
+    value = getattr(importlib.import_module(module, __name__), name)
+    globals()[name] = value
+    return value
+
+
+def __dir__():
+    return sorted(list(globals()) + __all__)
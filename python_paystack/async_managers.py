@@ -0,0 +1,541 @@
+'''
+async_managers.py
+asyncio counterparts of the classes in managers.py.
+Requires aiohttp (pip install python_paystack[async])
+'''
+
+import asyncio
+import time
+from itertools import islice
+import aiohttp
+
+from .objects.base import Manager
+from .objects.customers import Customer
+from .objects.errors import APIConnectionFailedError, Error
+from .objects.filters import Filter
+from .objects.plans import Plan
+from .objects.transfers import Transfer
+from .objects.transactions import Transaction
+from .objects.subaccounts import SubAccount
+
+from .paystack_config import PaystackConfig
+from .cache import get_verification_cache
+from .instrumentation import get_instrument
+from .jsoncodec import get_codec
+from .managers import (check_charge_matches, initialize_transaction_data, is_duplicate_reference,
+                       verified_transaction)
+from .mixins import list_params, has_next_page
+from .pipeline import Call
+from .ratelimit import RateLimiter
+
+
+def build_async_session(limit=None, limit_per_host=None, timeout=None):
+    '''
+    Returns an aiohttp.ClientSession backed by a single keep-alive connection pool.
+    Settings that are not supplied are taken from PaystackConfig.
+    Must be called from within a running event loop.
+
+    Arguments:
+    limit : Maximum number of open connections
+    limit_per_host : Maximum number of open connections per host
+    timeout : (connect, read) timeout in seconds
+    '''
+    if limit_per_host is None:
+        limit_per_host = PaystackConfig.POOL_MAXSIZE
+    if limit is None:
+        limit = PaystackConfig.POOL_CONNECTIONS * PaystackConfig.POOL_MAXSIZE
+    if timeout is None:
+        timeout = PaystackConfig.TIMEOUT
+
+    connect_timeout, read_timeout = timeout
+    connector = aiohttp.TCPConnector(limit=limit, limit_per_host=limit_per_host)
+    client_timeout = aiohttp.ClientTimeout(sock_connect=connect_timeout,
+                                           sock_read=read_timeout)
+    return aiohttp.ClientSession(connector=connector, timeout=client_timeout)
+
+
+class AsyncResponse():
+    '''
+    Fully read response returned by AsyncManager.request.
+    Mirrors the attributes of requests.Response used by the managers.
+    '''
+
+    def __init__(self, status_code, headers, content):
+        self.status_code = status_code
+        self.headers = headers
+        self.content = content
+
+    def json(self):
+        return get_codec().loads(self.content)
+
+
+class AsyncManager(Manager):
+    '''
+    Abstract base class for asyncio 'Manager' classes.
+
+    Each instance owns one pooled aiohttp session, created on first use.
+    Pass the same session to several managers to share a pool between them.
+    '''
+
+    def __init__(self, session=None, client=None):
+        super().__init__(session, client)
+        if type(self) is AsyncManager:
+            raise TypeError("Can not make instance of abstract base class")
+        #The client's session is a requests.Session, so only its settings are used
+        self._session = session
+        self._owns_session = session is None
+
+    def bind(self, client, **tenant_attributes):
+        '''
+        Returns a copy of this manager using client's settings, see Manager.bind.
+        The copy shares this manager's aiohttp session but does not close it.
+        '''
+        manager = super().bind(client, **tenant_attributes)
+        manager._session = self._session
+        manager._owns_session = False
+        return manager
+
+    @property
+    def session(self):
+        '''
+        The aiohttp session used for every request made by this manager
+        '''
+        if self._session is None or self._session.closed:
+            self._session = build_async_session()
+            self._owns_session = True
+        return self._session
+
+    async def execute(self, method, url, data=None, params=None, bind=None, raw=False,
+                      check=True, idempotent=False):
+        '''
+        Sends an API call through the request pipeline and returns the response data.
+        See Manager.execute
+        '''
+        call = Call(method, url, data, params, bind, raw, check, idempotent)
+        for stage in self.request_stages:
+            stage(self, call)
+        call.response = await self.request(method, call.url, idempotent, **call.request_kwargs())
+        for stage in self.response_stages:
+            stage(self, call)
+        return call.result
+
+    async def request(self, method, url, idempotent=False, **kwargs):
+        '''
+        Sends a request through the manager's pooled session and returns an AsyncResponse.
+        Rate limiting and retries follow Manager.request.
+
+        Arguments :
+        method : HTTP method e.g GET, POST, PUT
+        url : Full request url
+        '''
+        instrument = self.instrument or get_instrument()
+        attempt = 0
+        while True:
+            if self.rate_limiter is not None:
+                delay = self.rate_limiter.try_acquire()
+                while delay:
+                    await asyncio.sleep(delay)
+                    delay = self.rate_limiter.try_acquire()
+
+            if instrument is not None:
+                instrument.before_request(method, url, attempt, kwargs.get('data'))
+                started = time.perf_counter()
+            response = error = None
+            try:
+                async with self.session.request(method, url, **kwargs) as raw_response:
+                    content = await raw_response.read()
+                    response = AsyncResponse(raw_response.status, raw_response.headers, content)
+            except BaseException as raised:
+                error = raised
+                if not isinstance(error, (aiohttp.ClientConnectionError, asyncio.TimeoutError)):
+                    raise
+            finally:
+                #Every attempt is recorded, whatever it raised
+                if instrument is not None:
+                    instrument.after_request(method, url, attempt, kwargs.get('data'), response,
+                                             time.perf_counter() - started, error)
+
+            if error is not None:
+                if not self.retry_policy.should_retry(method, None, attempt, idempotent):
+                    raise error
+                delay = self.retry_policy.delay(attempt)
+            else:
+                if not self.retry_policy.should_retry(method, response.status_code, attempt,
+                                                     idempotent):
+                    return self.check_response_status(response)
+                delay = self.retry_policy.delay(attempt, response.headers.get('Retry-After'))
+                if response.status_code == 429 and self.rate_limiter is not None:
+                    self.rate_limiter.pause(delay)
+
+            await asyncio.sleep(delay)
+            attempt += 1
+
+    async def close(self):
+        '''
+        Closes the session if it was created by this manager
+        '''
+        if self._owns_session and self._session is not None:
+            await self._session.close()
+        self._session = None
+
+    async def __aenter__(self):
+        return self
+
+    async def __aexit__(self, *exc_info):
+        await self.close()
+
+
+class AsyncCreatableMixin(object):
+    async def create(self, target_object):
+        '''
+        Creates the target object and returns the object returned by paystack
+        '''
+        url = self.PAYSTACK_URL + self._endpoint
+
+        return await self.execute('POST', url, target_object.to_dict(),
+                                  bind=self._object_class.from_dict)
+
+
+class AsyncRetrieveableMixin(object):
+    '''
+    asyncio version of RetrieveableMixin
+    '''
+
+    async def get_page(self, **params):
+        '''
+        Returns a tuple of the raw data list and the metadata of a single page
+        '''
+        content = await self.execute('GET', self.PAYSTACK_URL + self._endpoint,
+                                     params=list_params(**params), raw=True)
+        return (content['data'], content.get('meta', {}))
+
+    async def get_all(self, page=None, per_page=None, **filters):
+        '''
+        Returns a tuple of the objects on a single page and the page metadata
+        '''
+        data, meta = await self.get_page(page=page, per_page=per_page, **filters)
+        return ([self._object_class.from_dict(item) for item in data], meta)
+
+    async def iter_all(self, per_page=100, start=None, end=None, raw=False,
+                       prefetch=True, **filters):
+        '''
+        Async generator over every object of the endpoint.
+        See RetrieveableMixin.iter_all
+        '''
+        def fetch(page):
+            return self.get_page(page=page, per_page=per_page, start=start, end=end, **filters)
+
+        page = 1
+        data, meta = await fetch(page)
+        upcoming = None
+        try:
+            while True:
+                upcoming = None
+                if has_next_page(meta, page, len(data)):
+                    upcoming = fetch(page + 1)
+                    if prefetch:
+                        upcoming = asyncio.ensure_future(upcoming)
+
+                for item in data:
+                    yield item if raw else self._object_class.from_dict(item)
+
+                if upcoming is None:
+                    return
+
+                page += 1
+                data, meta = await upcoming
+        finally:
+            if upcoming is not None:
+                if prefetch:
+                    upcoming.cancel()
+                else:
+                    upcoming.close()
+
+    async def get(self, object_id):
+        '''
+        Method for getting an object with the specified id
+        '''
+        url = "%s%s/%s" % (self.PAYSTACK_URL, self._endpoint, object_id)
+        return await self.execute('GET', url, bind=self._object_class.from_dict)
+
+
+class AsyncUpdateableMixin(object):
+    async def update(self, object_id, updated_object):
+        '''
+        Method for updating an existing object
+        '''
+        if not isinstance(updated_object, self._object_class):
+            raise TypeError
+
+        url = "%s%s/%s" % (self.PAYSTACK_URL, self._endpoint, object_id)
+
+        content = await self.execute('PUT', url, updated_object.to_dict(), raw=True, check=False)
+
+        status, message = self.get_content_status(content)
+        if status or message:
+            return (status, message)
+        else:
+            raise APIConnectionFailedError(message)
+
+
+class AsyncUtils(AsyncManager):
+    '''
+    asyncio version of Utils
+    '''
+
+    def __init__(self, session=None, client=None):
+        super().__init__(session, client)
+
+    async def _get_data(self, url):
+        content = await self.execute('GET', url, raw=True, check=False)
+
+        status, message = self.get_content_status(content)
+        if status:
+            return content['data']
+
+    async def resolve_card_bin(self, card_bin, endpoint='/decision/bin/'):
+        return await self._get_data(self.PAYSTACK_URL + endpoint + card_bin[:6])
+
+    async def get_banks(self, endpoint='/bank'):
+        return await self._get_data(self.PAYSTACK_URL + endpoint)
+
+    async def resolve_bvn(self, bvn, endpoint='/bank/resolve_bvn/'):
+        return await self._get_data(self.PAYSTACK_URL + endpoint + bvn)
+
+    async def resolve_account_number(self, account_number, bank_code, endpoint='/bank/resolve'):
+        params = "?account_number=%s&bank_code=%s" % (account_number, bank_code)
+        return await self._get_data(self.PAYSTACK_URL + endpoint + params)
+
+
+class AsyncTransactionsManager(AsyncRetrieveableMixin, AsyncManager):
+    '''
+    asyncio version of TransactionsManager
+    '''
+
+    LOCAL_COST = PaystackConfig.LOCAL_COST
+    INTL_COST = PaystackConfig.INTL_COST
+    PASS_ON_TRANSACTION_COST = PaystackConfig.PASS_ON_TRANSACTION_COST
+
+    _endpoint = '/transaction'
+    _object_class = Transaction
+
+    def __init__(self, endpoint='/transaction', session=None, client=None):
+        super().__init__(session, client)
+        self._endpoint = endpoint
+        #Coalesces verifications and caches transactions in a terminal status, None to disable
+        self.verification_cache = get_verification_cache()
+
+    async def initialize_transaction(self, method, transaction: Transaction,
+                                     callback_url='', endpoint='/initialize'):
+        '''
+        Initializes a paystack transaction.
+        See TransactionsManager.initialize_transaction
+        '''
+        generated = not transaction.reference
+        if generated:
+            transaction.reference = str(transaction.generate_reference_code())
+
+        method, data = initialize_transaction_data(method, transaction, callback_url,
+                                                   self.PASS_ON_TRANSACTION_COST,
+                                                   self.LOCAL_COST, self.INTL_COST,
+                                                   self.client.public_key)
+
+        if method in ('INLINE', 'INLINE EMBED'):
+            return data
+
+        url = self.PAYSTACK_URL + self._endpoint + endpoint
+        content = await self.execute('POST', url, data, raw=True, check=False, idempotent=True)
+        status, message = self.get_content_status(content)
+
+        if not status and generated and is_duplicate_reference(message):
+            #An earlier attempt was applied but its authorization url was lost
+            transaction.reference = str(transaction.generate_reference_code())
+            data['reference'] = transaction.reference
+            content = await self.execute('POST', url, data, raw=True, check=False,
+                                         idempotent=True)
+            status, message = self.get_content_status(content)
+
+        if not status:
+            raise APIConnectionFailedError(message)
+        return Transaction.from_dict(content['data'])
+
+    async def verify_transaction(self, transaction_reference: str, endpoint='/verify/'):
+        '''
+        Verifies a payment using the transaction reference.
+        See TransactionsManager.get_verification_data for the caching of verifications.
+        '''
+        url = self.PAYSTACK_URL + self._endpoint + endpoint + transaction_reference
+        if self.verification_cache is None:
+            return await self.execute('GET', url, bind=verified_transaction)
+        data = await self.verification_cache.get_or_verify_async(
+            (self.client.public_key, url), lambda: self.execute('GET', url))
+        return verified_transaction(data)
+
+    async def verify_many(self, references, concurrency=100, rate_limit=None):
+        '''
+        Async generator verifying many transactions concurrently.
+        See TransactionsManager.verify_many
+        '''
+        if concurrency < 1:
+            raise ValueError("concurrency should be at least 1")
+
+        if rate_limit is not None and not isinstance(rate_limit, RateLimiter):
+            rate_limit = RateLimiter(rate_limit)
+
+        async def verify(reference):
+            if rate_limit is not None:
+                delay = rate_limit.try_acquire()
+                while delay:
+                    await asyncio.sleep(delay)
+                    delay = rate_limit.try_acquire()
+            try:
+                return (reference, await self.verify_transaction(reference), None)
+            except (Exception, Error) as error:
+                return (reference, None, error)
+
+        references = iter(references)
+        pending = set()
+        try:
+            while True:
+                for reference in islice(references, concurrency - len(pending)):
+                    pending.add(asyncio.ensure_future(verify(reference)))
+
+                if not pending:
+                    return
+
+                done, pending = await asyncio.wait(pending, return_when=asyncio.FIRST_COMPLETED)
+                for task in done:
+                    yield task.result()
+        finally:
+            for task in pending:
+                task.cancel()
+
+    async def charge_authorization(self, transaction: Transaction,
+                                   endpoint='/charge_authorization'):
+        '''
+        Charges a saved authorization and returns the charge data.
+        See TransactionsManager.charge_authorization
+        '''
+        generated = not transaction.reference
+        if generated:
+            transaction.reference = str(transaction.generate_reference_code())
+
+        url = self.PAYSTACK_URL + self._endpoint + endpoint
+        data = transaction.to_dict()
+        try:
+            return await self.execute('POST', url, data, idempotent=True)
+        except APIConnectionFailedError as error:
+            if not generated or not is_duplicate_reference(error.message):
+                raise
+            #An earlier attempt was applied, return its outcome
+            url = self.PAYSTACK_URL + self._endpoint + '/verify/' + transaction.reference
+            data = await self.execute('GET', url)
+            check_charge_matches(transaction, data)
+            return data
+
+    async def get_transactions(self, filter=None):
+        '''
+        Returns the first page of transactions with the option of filtering by status
+        '''
+        url = self.PAYSTACK_URL + self._endpoint
+        if filter:
+            url += '/?status={}'.format(filter)
+
+        return await self.execute('GET', url, raw=True, check=False)
+
+    async def get_total_transactions(self):
+        '''
+        Get total amount recieved from transactions
+        '''
+        return await self.execute('GET', self.PAYSTACK_URL + self._endpoint + '/totals')
+
+    def filter_transactions(self, amount_range: range, transactions):
+        '''
+        Returns all transactions with amounts in the given amount_range
+        '''
+        return [transaction for transaction in transactions
+                if Filter.filter_amount(amount_range, transaction)]
+
+
+class AsyncCustomersManager(AsyncCreatableMixin, AsyncRetrieveableMixin,
+                            AsyncUpdateableMixin, AsyncManager):
+    '''
+    asyncio version of CustomersManager
+    '''
+    _endpoint = '/customer'
+    _object_class = Customer
+
+    def __init__(self, session=None, client=None):
+        super().__init__(session, client)
+
+    async def set_risk_action(self, risk_action, customer: Customer):
+        '''
+        Method for either blacklisting or whitelisting a customer
+        '''
+        if not isinstance(customer, Customer):
+            raise TypeError("customer argument should be of type 'Customer' ")
+
+        if risk_action not in ('allow', 'deny'):
+            raise ValueError("Invalid risk action")
+
+        data = {'customer' : customer.id, 'risk_action' : risk_action}
+        url = self.PAYSTACK_URL + self._endpoint + '/set_risk_action'
+
+        return await self.execute('POST', url, data, bind=Customer.from_dict)
+
+    async def deactive_authorization(self, authorization_code):
+        '''
+        Method to deactivate an existing authorization
+        '''
+        data = {'authorization_code' : authorization_code}
+        url = self.PAYSTACK_URL + self._endpoint + '/deactivate_authorization'
+
+        return await self.execute('POST', url, data)
+
+
+class AsyncPlanManager(AsyncCreatableMixin, AsyncRetrieveableMixin,
+                       AsyncUpdateableMixin, AsyncManager):
+    '''
+    asyncio version of PlanManager
+    '''
+    _endpoint = '/plan'
+    _object_class = Plan
+
+    def __init__(self, endpoint='/plan', session=None, client=None):
+        super().__init__(session, client)
+        self._endpoint = endpoint
+
+
+class AsyncTransfersManager(AsyncCreatableMixin, AsyncRetrieveableMixin,
+                            AsyncUpdateableMixin, AsyncManager):
+    '''
+    asyncio version of TransfersManager
+    '''
+    _endpoint = '/transfer'
+    _object_class = Transfer
+
+    def __init__(self, endpoint='/transfer', session=None, client=None):
+        super().__init__(session, client)
+        self._endpoint = endpoint
+
+    async def finalize_transfer(self, transfer_id, otp):
+        '''
+        Method for finalizing transfers
+        '''
+        data = {'transfer_code' : str(transfer_id), 'otp' : str(otp)}
+        url = self.PAYSTACK_URL + self._endpoint + '/finalize_transfer'
+
+        return await self.execute('POST', url, data)
+
+
+class AsyncSubAccountManager(AsyncCreatableMixin, AsyncRetrieveableMixin,
+                             AsyncUpdateableMixin, AsyncManager):
+    '''
+    asyncio version of SubAccountManager
+    '''
+    _endpoint = None
+    _object_class = SubAccount
+
+    def __init__(self, endpoint='/subaccount', session=None, client=None):
+        super().__init__(session, client)
+        self._endpoint = endpoint
@@ -0,0 +1,433 @@
+'''
+cache.py
+Caching of reference data that rarely changes, e.g banks and card BINs,
+and of transactions that can no longer change
+'''
+import json
+import os
+import threading
+import time
+from collections import OrderedDict
+
+from .jsoncodec import get_codec
+from .lazy import LazyModule
+from .paystack_config import PaystackConfig
+
+asyncio = LazyModule('asyncio')
+hashlib = LazyModule('hashlib')
+tempfile = LazyModule('tempfile')
+
+_cache_lock = threading.Lock()
+_shared_cache = None
+_shared_verification_cache = None
+
+#Transaction statuses paystack will not change again
+TERMINAL_STATUSES = frozenset(('success', 'failed', 'reversed'))
+
+
+class CacheBackend():
+    '''
+    Interface for cache storage backends.
+    Values must be json serializable so they can be kept outside the process.
+    '''
+
+    def get(self, key):
+        '''
+        Returns a (found, value) tuple
+        '''
+        raise NotImplementedError
+
+    def set(self, key, value, ttl):
+        '''
+        Stores value under key for ttl seconds
+        '''
+        raise NotImplementedError
+
+    def delete(self, key):
+        raise NotImplementedError
+
+    def clear(self):
+        raise NotImplementedError
+
+
+class TTLCache(CacheBackend):
+    '''
+    Thread-safe in-process LRU cache whose entries expire after their ttl.
+    Values are held encoded, so every caller gets its own copy.
+
+    Attributes:
+    maxsize : Maximum number of entries, the least recently used entry is evicted first
+    '''
+
+    def __init__(self, maxsize=1024):
+        self.maxsize = maxsize
+        self.codec = get_codec()
+        self._data = OrderedDict()
+        self._lock = threading.Lock()
+
+    def get(self, key):
+        with self._lock:
+            entry = self._data.get(key)
+            if entry is None:
+                return (False, None)
+            expires, encoded = entry
+            if expires < time.monotonic():
+                del self._data[key]
+                return (False, None)
+            self._data.move_to_end(key)
+        return (True, self.codec.loads(encoded))
+
+    def set(self, key, value, ttl):
+        encoded = self.codec.dumps(value)
+        with self._lock:
+            self._data[key] = (time.monotonic() + ttl, encoded)
+            self._data.move_to_end(key)
+            while len(self._data) > self.maxsize:
+                self._data.popitem(last=False)
+
+    def delete(self, key):
+        with self._lock:
+            self._data.pop(key, None)
+
+    def clear(self):
+        with self._lock:
+            self._data.clear()
+
+    def __len__(self):
+        return len(self._data)
+
+
+class FileCache(CacheBackend):
+    '''
+    Cache kept as one json file per key in a local directory,
+    so it survives restarts and can be shared by worker processes
+    '''
+
+    def __init__(self, directory):
+        self.directory = directory
+        os.makedirs(directory, exist_ok=True)
+
+    def _path(self, key):
+        return os.path.join(self.directory, hashlib.sha1(key.encode()).hexdigest() + '.json')
+
+    def get(self, key):
+        try:
+            with open(self._path(key)) as cache_file:
+                entry = json.load(cache_file)
+        except (OSError, ValueError):
+            return (False, None)
+
+        if entry['expires'] < time.time():
+            self.delete(key)
+            return (False, None)
+        return (True, entry['value'])
+
+    def set(self, key, value, ttl):
+        entry = {'expires' : time.time() + ttl, 'value' : value}
+        descriptor, temp_path = tempfile.mkstemp(dir=self.directory)
+        with os.fdopen(descriptor, 'w') as cache_file:
+            json.dump(entry, cache_file)
+        os.replace(temp_path, self._path(key))
+
+    def delete(self, key):
+        try:
+            os.remove(self._path(key))
+        except FileNotFoundError:
+            pass
+
+    def clear(self):
+        for name in os.listdir(self.directory):
+            if name.endswith('.json'):
+                os.remove(os.path.join(self.directory, name))
+
+
+class RedisCache(CacheBackend):
+    '''
+    Adapter for a Redis compatible client, i.e any object with
+    get(key), setex(key, ttl, value), delete(key) and keys(pattern) methods
+    '''
+
+    def __init__(self, client, prefix='python_paystack:'):
+        self.client = client
+        self.prefix = prefix
+
+    def get(self, key):
+        value = self.client.get(self.prefix + key)
+        if value is None:
+            return (False, None)
+        return (True, json.loads(value))
+
+    def set(self, key, value, ttl):
+        self.client.setex(self.prefix + key, max(1, int(ttl)), json.dumps(value))
+
+    def delete(self, key):
+        self.client.delete(self.prefix + key)
+
+    def clear(self):
+        keys = self.client.keys(self.prefix + '*')
+        if keys:
+            self.client.delete(*keys)
+
+
+class LookupCache():
+    '''
+    Read-through cache in front of a CacheBackend.
+    Counts hits and misses and makes sure concurrent lookups of the same
+    missing key only call the loader once. Every caller gets its own copy of the value.
+    '''
+
+    def __init__(self, backend=None):
+        self.backend = backend if backend is not None else TTLCache(PaystackConfig.CACHE_MAXSIZE)
+        self.codec = get_codec()
+        self.hits = 0
+        self.misses = 0
+        self._lock = threading.Lock()
+        self._in_flight = {}
+
+    def get_or_load(self, key, loader, ttl):
+        '''
+        Returns the cached value for key, or calls loader() and caches its result for ttl seconds.
+        None results are not cached.
+        '''
+        found, value = self.backend.get(key)
+        if found:
+            with self._lock:
+                self.hits += 1
+            return value
+
+        with self._lock:
+            self.misses += 1
+            call = self._in_flight.get(key)
+            leader = call is None
+            if leader:
+                call = self._in_flight[key] = _Call()
+
+        if not leader:
+            return self.codec.loads(call.wait())
+
+        try:
+            value = loader()
+            if value is not None:
+                self.backend.set(key, value, ttl)
+        except BaseException as error:
+            call.fail(error)
+            raise
+        else:
+            #Waiters decode their own copy
+            call.resolve(self.codec.dumps(value))
+            return value
+        finally:
+            with self._lock:
+                del self._in_flight[key]
+
+    def invalidate(self, key=None):
+        '''
+        Removes key from the cache, or every entry if no key is given
+        '''
+        if key is None:
+            self.backend.clear()
+        else:
+            self.backend.delete(key)
+
+    def stats(self):
+        '''
+        Returns a dict of the hit and miss counts
+        '''
+        return {'hits' : self.hits, 'misses' : self.misses}
+
+
+class _Call():
+    '''
+    Result of a load that other threads are waiting on
+    '''
+
+    def __init__(self):
+        self._event = threading.Event()
+        self._value = None
+        self._error = None
+
+    def resolve(self, value):
+        self._value = value
+        self._event.set()
+
+    def fail(self, error):
+        self._error = error
+        self._event.set()
+
+    def wait(self):
+        self._event.wait()
+        if self._error is not None:
+            raise self._error
+        return self._value
+
+
+class VerificationCache():
+    '''
+    Verification data of transactions in a terminal status, kept in an LRU, with
+    concurrent verifications of the same transaction coalesced into one request.
+    Data is held encoded, so every caller gets its own copy. Thread-safe.
+
+    Arguments:
+    maxsize : Maximum number of transactions kept, the least recently used is evicted first
+    terminal_statuses : Statuses whose data is cached
+    '''
+
+    def __init__(self, maxsize=None, terminal_statuses=TERMINAL_STATUSES):
+        if maxsize is None:
+            maxsize = PaystackConfig.VERIFICATION_CACHE_MAXSIZE
+        self.maxsize = maxsize
+        self.terminal_statuses = frozenset(terminal_statuses)
+        self.codec = get_codec()
+        self.hits = 0
+        self.misses = 0
+        self.coalesced = 0
+        self._data = OrderedDict()
+        self._lock = threading.Lock()
+        self._in_flight = {}
+
+    def __len__(self):
+        return len(self._data)
+
+    def _lookup(self, key):
+        #Called with the lock held, returns the encoded data or None
+        encoded = self._data.get(key)
+        if encoded is not None:
+            self._data.move_to_end(key)
+            self.hits += 1
+        return encoded
+
+    def _store(self, key, data):
+        encoded = self.codec.dumps(data)
+        if isinstance(data, dict) and data.get('status') in self.terminal_statuses:
+            with self._lock:
+                self._data[key] = encoded
+                self._data.move_to_end(key)
+                while len(self._data) > self.maxsize:
+                    self._data.popitem(last=False)
+        return encoded
+
+    def get_or_verify(self, key, loader):
+        '''
+        Returns the cached data for key, or the data returned by loader().
+        Threads asking for a key already being loaded wait for that load.
+        '''
+        with self._lock:
+            encoded = self._lookup(key)
+            if encoded is None:
+                call = self._in_flight.get(key)
+                leader = call is None
+                if leader:
+                    self.misses += 1
+                    call = self._in_flight[key] = _Call()
+                else:
+                    self.coalesced += 1
+        if encoded is not None:
+            return self.codec.loads(encoded)
+
+        if not leader:
+            return self.codec.loads(call.wait())
+
+        try:
+            data = loader()
+            encoded = self._store(key, data)
+        except BaseException as error:
+            call.fail(error)
+            raise
+        else:
+            call.resolve(encoded)
+            return data
+        finally:
+            with self._lock:
+                del self._in_flight[key]
+
+    async def get_or_verify_async(self, key, loader):
+        '''
+        asyncio version of get_or_verify, loader is a coroutine function.
+        Tasks of the same event loop asking for a key already being loaded await that load.
+        The load runs in its own task, so cancelling one of the callers does not
+        cancel it for the others.
+        '''
+        loop = asyncio.get_running_loop()
+        in_flight_key = (loop, key)
+        with self._lock:
+            encoded = self._lookup(key)
+            if encoded is None:
+                task = self._in_flight.get(in_flight_key)
+                if task is None:
+                    self.misses += 1
+                    task = loop.create_task(self._load_async(in_flight_key, key, loader))
+                    #Retrieve the exception, in case every caller was cancelled
+                    task.add_done_callback(lambda task: task.cancelled() or task.exception())
+                    self._in_flight[in_flight_key] = task
+                else:
+                    self.coalesced += 1
+        if encoded is None:
+            encoded = await asyncio.shield(task)
+        return self.codec.loads(encoded)
+
+    async def _load_async(self, in_flight_key, key, loader):
+        try:
+            return self._store(key, await loader())
+        finally:
+            with self._lock:
+                del self._in_flight[in_flight_key]
+
+    def invalidate(self, key=None):
+        '''
+        Removes key from the cache, or every entry if no key is given
+        '''
+        with self._lock:
+            if key is None:
+                self._data.clear()
+            else:
+                self._data.pop(key, None)
+
+    def stats(self):
+        '''
+        Returns a dict of the hit, miss and coalesced counts and the number of entries
+        '''
+        return {'hits' : self.hits, 'misses' : self.misses, 'coalesced' : self.coalesced,
+                'size' : len(self._data)}
+
+
+def get_lookup_cache():
+    '''
+    Returns the process wide LookupCache used by Utils
+    '''
+    global _shared_cache
+    if _shared_cache is None:
+        with _cache_lock:
+            if _shared_cache is None:
+                _shared_cache = LookupCache()
+    return _shared_cache
+
+
+def set_lookup_cache(cache):
+    '''
+    Replaces the process wide LookupCache, e.g with one backed by FileCache or RedisCache
+    '''
+    global _shared_cache
+    with _cache_lock:
+        _shared_cache = cache
+
+
+def get_verification_cache():
+    '''
+    Returns the process wide VerificationCache used by the transaction managers
+    '''
+    global _shared_verification_cache
+    if _shared_verification_cache is None:
+        with _cache_lock:
+            if _shared_verification_cache is None:
+                _shared_verification_cache = VerificationCache()
+    return _shared_verification_cache
+
+
+def set_verification_cache(cache):
+    '''
+    Replaces the process wide VerificationCache used by managers created afterwards.
+    Set a manager's verification_cache to None to turn caching off for it.
+    '''
+    global _shared_verification_cache
+    with _cache_lock:
+        _shared_verification_cache = cache
@@ -0,0 +1,123 @@
+'''
+client.py
+Settings of a single paystack integration, for processes serving several of them
+'''
+import threading
+from types import MappingProxyType
+
+from .paystack_config import PaystackConfig
+
+
+def auth_headers(secret_key):
+    '''
+    Returns the read only headers sent with every request made with secret_key
+    '''
+    return MappingProxyType({'Authorization' : 'Bearer %s' % secret_key,
+                             'Content-Type' : 'application/json',
+                             'cache-control' : 'no-cache'})
+
+
+class PaystackClient():
+    '''
+    Keys, fee settings, base url and connection pool of one paystack integration.
+
+    Managers created with client=... or rebound with Manager.bind(client) use these
+    instead of PaystackConfig, so one process can serve many integrations. The
+    request headers are built once, when the client is created, and clients are
+    cheap enough to keep one per merchant. Settings are read only; create a new
+    client when a merchant's keys change.
+
+    Arguments:
+    secret_key, public_key : The integration's API keys
+    paystack_url, local_cost, intl_cost, pass_on_transaction_cost, timeout :
+        Default to the PaystackConfig setting of the same name
+    session : requests.Session for this integration's requests, e.g from
+              transport.build_session(). Defaults to the pooled session shared by
+              every manager, which is enough since every integration calls the same host.
+    '''
+
+    def __init__(self, secret_key, public_key, paystack_url=None, local_cost=None,
+                 intl_cost=None, pass_on_transaction_cost=None, timeout=None, session=None):
+        if not secret_key or not public_key:
+            raise ValueError("secret_key and public_key are required")
+
+        self._secret_key = secret_key
+        self._public_key = public_key
+        self._paystack_url = paystack_url or PaystackConfig.PAYSTACK_URL
+        self._local_cost = PaystackConfig.LOCAL_COST if local_cost is None else local_cost
+        self._intl_cost = PaystackConfig.INTL_COST if intl_cost is None else intl_cost
+        if pass_on_transaction_cost is None:
+            pass_on_transaction_cost = PaystackConfig.PASS_ON_TRANSACTION_COST
+        self._pass_on_transaction_cost = pass_on_transaction_cost
+        self._timeout = PaystackConfig.TIMEOUT if timeout is None else timeout
+        self._session = session
+        self._headers = auth_headers(secret_key)
+        self._managers = {}
+        self._lock = threading.Lock()
+
+    @classmethod
+    def from_config(cls):
+        '''
+        Returns a client with the settings currently in PaystackConfig
+        '''
+        if not PaystackConfig.SECRET_KEY or not PaystackConfig.PUBLIC_KEY:
+            raise ValueError("No secret key or public key found,"
+                             "assign values using PaystackConfig.SECRET_KEY = SECRET_KEY and"
+                             "PaystackConfig.PUBLIC_KEY = PUBLIC_KEY")
+        return cls(PaystackConfig.SECRET_KEY, PaystackConfig.PUBLIC_KEY)
+
+    secret_key = property(lambda self: self._secret_key)
+    public_key = property(lambda self: self._public_key)
+    paystack_url = property(lambda self: self._paystack_url)
+    local_cost = property(lambda self: self._local_cost)
+    intl_cost = property(lambda self: self._intl_cost)
+    pass_on_transaction_cost = property(lambda self: self._pass_on_transaction_cost)
+    timeout = property(lambda self: self._timeout)
+    session = property(lambda self: self._session)
+    headers = property(lambda self: self._headers)
+
+    def __repr__(self):
+        return "PaystackClient(%s..., %s)" % (self._public_key[:12], self._paystack_url)
+
+    def manager(self, manager_class):
+        '''
+        Returns this client's instance of manager_class, created on first use
+        '''
+        manager = self._managers.get(manager_class)
+        if manager is None:
+            with self._lock:
+                manager = self._managers.get(manager_class)
+                if manager is None:
+                    manager = manager_class(client=self)
+                    self._managers[manager_class] = manager
+        return manager
+
+    @property
+    def transactions(self):
+        from .managers import TransactionsManager
+        return self.manager(TransactionsManager)
+
+    @property
+    def customers(self):
+        from .managers import CustomersManager
+        return self.manager(CustomersManager)
+
+    @property
+    def plans(self):
+        from .managers import PlanManager
+        return self.manager(PlanManager)
+
+    @property
+    def transfers(self):
+        from .managers import TransfersManager
+        return self.manager(TransfersManager)
+
+    @property
+    def subaccounts(self):
+        from .managers import SubAccountManager
+        return self.manager(SubAccountManager)
+
+    @property
+    def utils(self):
+        from .managers import Utils
+        return self.manager(Utils)
@@ -0,0 +1,150 @@
+'''
+columnar.py
+Columnar tables of transactions for vectorized filtering and totals.
+Requires numpy (pip install python_paystack[analytics])
+'''
+import numpy
+
+from .objects.base import Base
+
+
+class TransactionTable():
+    '''
+    Transactions stored as one numpy array per column.
+
+    Columns:
+    id, amount : int64
+    reference, status, currency, email : str
+    created_at : datetime64[ms], NaT when missing
+    '''
+
+    COLUMNS = ('id', 'reference', 'amount', 'status', 'currency', 'created_at', 'email')
+
+    def __init__(self, columns):
+        lengths = {len(columns[name]) for name in self.COLUMNS}
+        if len(lengths) > 1:
+            raise ValueError("All columns should have the same length")
+        self.columns = columns
+
+    @classmethod
+    def from_records(cls, records):
+        '''
+        Builds a table from transaction dicts or Transaction objects,
+        e.g TransactionsManager.iter_all(raw=True)
+        '''
+        ids, references, amounts, statuses = [], [], [], []
+        currencies, created, emails = [], [], []
+
+        for record in records:
+            if isinstance(record, Base):
+                record = record.to_dict()
+
+            customer = record.get('customer') or {}
+            created_at = record.get('created_at') or record.get('createdAt')
+
+            ids.append(record.get('id') or 0)
+            references.append(record.get('reference') or '')
+            amounts.append(record.get('amount') or 0)
+            statuses.append(record.get('status') or '')
+            currencies.append(record.get('currency') or '')
+            created.append(created_at.rstrip('Z') if created_at else 'NaT')
+            emails.append(record.get('email') or customer.get('email') or '')
+
+        return cls({
+            'id' : numpy.array(ids, dtype=numpy.int64),
+            'reference' : numpy.array(references, dtype=str),
+            'amount' : numpy.array(amounts, dtype=numpy.int64),
+            'status' : numpy.array(statuses, dtype=str),
+            'currency' : numpy.array(currencies, dtype=str),
+            'created_at' : numpy.array(created, dtype='datetime64[ms]'),
+            'email' : numpy.array(emails, dtype=str),
+        })
+
+    def __len__(self):
+        return len(self.columns['amount'])
+
+    def __getitem__(self, name):
+        return self.columns[name]
+
+    def where(self, mask):
+        '''
+        Returns a new table holding the rows where mask is True
+        '''
+        return TransactionTable({name : column[mask] for name, column in self.columns.items()})
+
+    def amount_mask(self, amount_range):
+        '''
+        Boolean mask of rows whose amount is in amount_range.
+        amount_range is a range (stop excluded) or a (low, high) tuple (both included).
+        '''
+        amounts = self.columns['amount']
+        if isinstance(amount_range, range):
+            if amount_range.step != 1:
+                raise ValueError("amount_range should have a step of 1")
+            return (amounts >= amount_range.start) & (amounts < amount_range.stop)
+
+        low, high = amount_range
+        return (amounts >= low) & (amounts <= high)
+
+    def status_mask(self, *statuses):
+        return numpy.isin(self.columns['status'], statuses)
+
+    def currency_mask(self, *currencies):
+        return numpy.isin(self.columns['currency'], currencies)
+
+    def date_mask(self, start=None, end=None):
+        '''
+        Boolean mask of rows created from start up to (and excluding) end
+        '''
+        created = self.columns['created_at']
+        mask = ~numpy.isnat(created)
+        if start is not None:
+            mask &= created >= numpy.datetime64(start, 'ms')
+        if end is not None:
+            mask &= created < numpy.datetime64(end, 'ms')
+        return mask
+
+    def filter(self, amount_range=None, statuses=None, currencies=None, start=None, end=None):
+        '''
+        Returns a new table with the rows matching every filter given
+        '''
+        mask = numpy.ones(len(self), dtype=bool)
+        if amount_range is not None:
+            mask &= self.amount_mask(amount_range)
+        if statuses:
+            mask &= self.status_mask(*statuses)
+        if currencies:
+            mask &= self.currency_mask(*currencies)
+        if start is not None or end is not None:
+            mask &= self.date_mask(start, end)
+        return self.where(mask)
+
+    def total(self):
+        '''
+        Sum of the amount column
+        '''
+        return int(self.columns['amount'].sum())
+
+    def total_by(self, column):
+        '''
+        Returns a dict of the amount total for each value of column, e.g 'status' or 'currency'
+        '''
+        keys, inverse = numpy.unique(self.columns[column], return_inverse=True)
+        totals = numpy.zeros(len(keys), dtype=numpy.int64)
+        numpy.add.at(totals, inverse, self.columns['amount'])
+        return {str(key) : int(total) for key, total in zip(keys, totals)}
+
+    def count_by(self, column):
+        '''
+        Returns a dict of the row count for each value of column
+        '''
+        keys, counts = numpy.unique(self.columns[column], return_counts=True)
+        return {str(key) : int(count) for key, count in zip(keys, counts)}
+
+    def to_records(self):
+        '''
+        Returns the rows as a list of dicts
+        '''
+        names = self.COLUMNS
+        columns = [self.columns[name].tolist() for name in names]
+        return [dict(zip(names, row)) for row in zip(*columns)]
@@ -0,0 +1,145 @@
+'''
+fees.py
+Paystack fee calculation, for single amounts and batches of amounts.
+
+The cost of a transaction is the amount the customer pays so that the
+integration receives amount after paystack's fees: amount / (1 - rate), with a
+flat fee added once the cost is over FEE_THRESHOLD and the fee capped at FEE_CAP.
+
+transaction_cost and batch_transaction_cost use floating point and give the
+same results as Transaction.full_transaction_cost. exact_transaction_cost and
+batch_transaction_cost(exact=True) use integer arithmetic on the rates as
+fractions, for results that do not depend on floating point rounding.
+Batches require numpy (pip install python_paystack[analytics]).
+'''
+import math
+from fractions import Fraction
+from functools import lru_cache
+
+from .lazy import LazyModule
+
+numpy = LazyModule('numpy')
+
+LOCALES = ('LOCAL', 'INTERNATIONAL')
+
+#Amounts in kobo
+FEE_THRESHOLD = 250000
+FLAT_FEE = 100
+FEE_CAP = 200000
+
+
+def transaction_cost(amount, rate):
+    '''
+    Returns the cost of amount (in kobo) with fees at rate added, rounded up to a kobo
+
+    Arguments:
+    amount : Amount in kobo
+    rate : Paystack's percentage fee as a fraction e.g 0.015
+    '''
+    cost = amount / (1 - rate)
+    if cost > FEE_THRESHOLD:
+        cost = (amount + FLAT_FEE) / (1 - rate)
+
+    #Paystack's fee is capped at N2000
+    if rate * cost > FEE_CAP:
+        cost = amount + FEE_CAP
+
+    return math.ceil(cost)
+
+
+@lru_cache(maxsize=64)
+def exact_rate(rate):
+    '''
+    Returns rate as a Fraction, taking floats by their decimal value e.g 0.015 as 3/200
+    '''
+    if isinstance(rate, float):
+        return Fraction(repr(rate))
+    return Fraction(rate)
+
+
+def exact_transaction_cost(amount, rate):
+    '''
+    Returns the same as transaction_cost, computed exactly with integers
+
+    Arguments:
+    amount : Amount in kobo, an integer
+    rate : Fee as a float, Decimal, Fraction or string e.g '0.015'
+    '''
+    rate = exact_rate(rate)
+    numerator, denominator = rate.numerator, rate.denominator
+    remainder = denominator - numerator
+
+    amount = int(amount)
+    #cost = amount * denominator / remainder, compared without dividing
+    if amount * denominator > FEE_THRESHOLD * remainder:
+        amount_with_fee = amount + FLAT_FEE
+    else:
+        amount_with_fee = amount
+
+    if numerator * amount_with_fee > FEE_CAP * remainder:
+        return amount + FEE_CAP
+
+    return -(-amount_with_fee * denominator // remainder)
+
+
+def locale_rates(locales, local_cost, intl_cost, size):
+    '''
+    Returns an array of the rate (local_cost or intl_cost) for each locale.
+    locales is either one locale for every amount or an array of them.
+    '''
+    if isinstance(locales, str):
+        if locales not in LOCALES:
+            raise ValueError("Invalid locale, locale should be 'LOCAL' or 'INTERNATIONAL'")
+        return numpy.full(size, local_cost if locales == 'LOCAL' else intl_cost)
+
+    locales = numpy.asarray(locales)
+    if locales.shape != (size,):
+        raise ValueError("locales should have one locale for each amount")
+    local = locales == 'LOCAL'
+    if not numpy.all(local | (locales == 'INTERNATIONAL')):
+        raise ValueError("Invalid locale, locale should be 'LOCAL' or 'INTERNATIONAL'")
+    return numpy.where(local, local_cost, intl_cost)
+
+
+def batch_transaction_cost(amounts, locales, local_cost, intl_cost, exact=False):
+    '''
+    Returns an int64 array of the cost of each amount, see transaction_cost
+
+    Arguments:
+    amounts : Sequence or array of amounts in kobo
+    locales : 'LOCAL' or 'INTERNATIONAL' for every amount, or an array of them
+    local_cost, intl_cost : Fees for local and international cards
+    exact : Compute with integers like exact_transaction_cost
+    '''
+    if exact:
+        return _exact_batch_cost(amounts, locales, local_cost, intl_cost)
+
+    amounts = numpy.asarray(amounts, dtype=numpy.float64)
+    rates = locale_rates(locales, local_cost, intl_cost, len(amounts))
+
+    divisor = 1 - rates
+    cost = amounts / divisor
+    cost = numpy.where(cost > FEE_THRESHOLD, (amounts + FLAT_FEE) / divisor, cost)
+    cost = numpy.where(rates * cost > FEE_CAP, amounts + FEE_CAP, cost)
+    return numpy.ceil(cost).astype(numpy.int64)
+
+
+def _exact_batch_cost(amounts, locales, local_cost, intl_cost):
+    amounts = numpy.asarray(amounts, dtype=numpy.int64)
+    local, intl = exact_rate(local_cost), exact_rate(intl_cost)
+    denominator = local.denominator * intl.denominator // math.gcd(local.denominator,
+                                                                   intl.denominator)
+
+    numerators = locale_rates(locales, local.numerator * (denominator // local.denominator),
+                              intl.numerator * (denominator // intl.denominator), len(amounts))
+    numerators = numerators.astype(numpy.int64)
+    remainders = denominator - numerators
+
+    largest = int(numpy.abs(amounts).max(initial=0)) + FEE_CAP
+    if largest * denominator >= 2 ** 62:
+        raise OverflowError("amounts too large for exact batch computation")
+
+    with_fee = numpy.where(amounts * denominator > FEE_THRESHOLD * remainders,
+                           amounts + FLAT_FEE, amounts)
+    cost = -(-with_fee * denominator // remainders)
+    return numpy.where(numerators * with_fee > FEE_CAP * remainders, amounts + FEE_CAP, cost)
@@ -0,0 +1,177 @@
+'''
+idempotency.py
+Local journal of operations that move money, so they can be retried or resumed
+without being applied twice
+'''
+import json
+import sqlite3
+import threading
+import time
+
+
+class JournalEntry():
+    '''
+    A logical operation recorded in the journal
+
+    Attributes:
+    key : Caller supplied idempotency key e.g an order id
+    tenant : Integration the key belongs to e.g its public key, '' if not given
+    operation : Name of the manager method e.g 'charge_authorization'
+    reference : Transaction reference sent to paystack for every attempt
+    state : 'pending', 'succeeded' or 'failed'
+    response : Response data of a completed operation
+    '''
+
+    PENDING = 'pending'
+    SUCCEEDED = 'succeeded'
+    FAILED = 'failed'
+
+    def __init__(self, key, operation, reference, state, response=None, tenant=''):
+        self.key = key
+        self.tenant = tenant
+        self.operation = operation
+        self.reference = reference
+        self.state = state
+        self.response = response
+
+    def __str__(self):
+        return "%s %s (%s) : %s" % (self.operation, self.key, self.reference, self.state)
+
+
+class IdempotencyJournal():
+    '''
+    SQLite backed journal. Safe to share between threads; several processes
+    may use the same database file. Keys are scoped to a tenant, so integrations
+    sharing a journal can use the same order ids.
+
+    Arguments:
+    path : Database file, ':memory:' for a journal that does not survive restarts
+    '''
+
+    def __init__(self, path):
+        self.path = path
+        self._lock = threading.Lock()
+        self._connection = sqlite3.connect(path, check_same_thread=False,
+                                           isolation_level=None, timeout=30)
+        with self._lock:
+            self._connection.execute("PRAGMA journal_mode=WAL")
+            self._connection.execute(
+                "CREATE TABLE IF NOT EXISTS operations ("
+                "tenant TEXT NOT NULL DEFAULT '', key TEXT NOT NULL, operation TEXT NOT NULL, "
+                "reference TEXT NOT NULL, state TEXT NOT NULL, response TEXT, error TEXT, "
+                "created REAL NOT NULL, updated REAL NOT NULL, PRIMARY KEY (tenant, key))")
+            self._migrate()
+
+    def _migrate(self):
+        #Journals created before keys were scoped to a tenant, their entries get tenant ''
+        columns = [row[1] for row in self._connection.execute("PRAGMA table_info(operations)")]
+        if 'tenant' in columns:
+            return
+        self._connection.executescript(
+            "BEGIN IMMEDIATE;"
+            "ALTER TABLE operations RENAME TO operations_unscoped;"
+            "CREATE TABLE operations ("
+            "tenant TEXT NOT NULL DEFAULT '', key TEXT NOT NULL, operation TEXT NOT NULL, "
+            "reference TEXT NOT NULL, state TEXT NOT NULL, response TEXT, error TEXT, "
+            "created REAL NOT NULL, updated REAL NOT NULL, PRIMARY KEY (tenant, key));"
+            "INSERT INTO operations (key, operation, reference, state, response, error, "
+            "created, updated) SELECT key, operation, reference, state, response, error, "
+            "created, updated FROM operations_unscoped;"
+            "DROP TABLE operations_unscoped;"
+            "COMMIT;")
+
+    def begin(self, key, operation, reference, tenant=''):
+        '''
+        Records the start of an operation and returns its JournalEntry.
+        If key was already recorded, the existing entry is returned, so a retried
+        or resumed operation reuses its original reference. A failed entry is
+        moved back to pending first, as the operation is about to be attempted again.
+        '''
+        now = time.time()
+        with self._lock:
+            self._connection.execute(
+                "INSERT OR IGNORE INTO operations "
+                "(tenant, key, operation, reference, state, created, updated) "
+                "VALUES (?, ?, ?, ?, ?, ?, ?)",
+                (tenant, key, operation, reference, JournalEntry.PENDING, now, now))
+            self._connection.execute(
+                "UPDATE operations SET state = ?, error = NULL, updated = ? "
+                "WHERE tenant = ? AND key = ? AND state = ?",
+                (JournalEntry.PENDING, now, tenant, key, JournalEntry.FAILED))
+            return self._get(key, tenant)
+
+    def get(self, key, tenant=''):
+        '''
+        Returns the JournalEntry for key, or None
+        '''
+        with self._lock:
+            return self._get(key, tenant)
+
+    def _get(self, key, tenant):
+        row = self._connection.execute(
+            "SELECT key, operation, reference, state, response FROM operations "
+            "WHERE tenant = ? AND key = ?", (tenant, key)).fetchone()
+        if row is None:
+            return None
+        key, operation, reference, state, response = row
+        if response is not None:
+            response = json.loads(response)
+        return JournalEntry(key, operation, reference, state, response, tenant)
+
+    def restart(self, key, reference, tenant=''):
+        '''
+        Gives a pending operation a new reference, for operations that are safe to
+        start again once paystack rejected their reference. Returns the JournalEntry.
+        '''
+        with self._lock:
+            self._connection.execute(
+                "UPDATE operations SET reference = ?, state = ?, response = NULL, error = NULL, "
+                "updated = ? WHERE tenant = ? AND key = ?",
+                (reference, JournalEntry.PENDING, time.time(), tenant, key))
+            return self._get(key, tenant)
+
+    def complete(self, key, response, tenant=''):
+        '''
+        Marks an operation as succeeded and stores its response data
+        '''
+        self._update(key, tenant, JournalEntry.SUCCEEDED, response=json.dumps(response))
+
+    def fail(self, key, error, tenant=''):
+        '''
+        Marks an operation as failed. Only do this when paystack is known not
+        to have applied it, otherwise leave it pending and resolve it later.
+        '''
+        self._update(key, tenant, JournalEntry.FAILED, error=str(error))
+
+    def _update(self, key, tenant, state, response=None, error=None):
+        with self._lock:
+            self._connection.execute(
+                "UPDATE operations SET state = ?, response = ?, error = ?, updated = ? "
+                "WHERE tenant = ? AND key = ?",
+                (state, response, error, time.time(), tenant, key))
+
+    def pending(self, operation=None, older_than=0, tenant=None):
+        '''
+        Returns the entries still pending, e.g those left by a worker that stopped mid-request
+
+        Arguments:
+        operation : Only return entries of this operation
+        older_than : Only return entries last updated more than this many seconds ago
+        tenant : Only return entries of this tenant, None for every tenant
+        '''
+        query = "SELECT tenant, key FROM operations WHERE state = ? AND updated <= ?"
+        params = [JournalEntry.PENDING, time.time() - older_than]
+        if operation is not None:
+            query += " AND operation = ?"
+            params.append(operation)
+        if tenant is not None:
+            query += " AND tenant = ?"
+            params.append(tenant)
+
+        with self._lock:
+            rows = self._connection.execute(query, params).fetchall()
+            return [self._get(key, tenant) for tenant, key in rows]
+
+    def close(self):
+        with self._lock:
+            self._connection.close()
@@ -0,0 +1,191 @@
+'''
+instrumentation.py
+Hooks for observing the requests sent by managers, and a metrics collector
+exported in the OpenMetrics text format
+'''
+import threading
+from bisect import bisect_left
+
+_instrument_lock = threading.Lock()
+_shared_instrument = None
+
+#Path segments that name an action rather than a resource id
+ENDPOINT_ACTIONS = frozenset([
+    'bank', 'bin', 'bulk', 'charge_authorization', 'customer', 'deactivate_authorization',
+    'decision', 'finalize_transfer', 'initialize', 'plan', 'resolve', 'resolve_bvn',
+    'set_risk_action', 'subaccount', 'totals', 'transaction', 'transfer', 'verify',
+])
+
+DEFAULT_BUCKETS = (0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0)
+
+
+def endpoint_label(url):
+    '''
+    Returns the path of url with resource ids and references replaced by {id},
+    e.g https://api.paystack.co/transaction/verify/ref_123 gives /transaction/verify/{id}
+    '''
+    path = url.partition('://')[2].partition('/')[2].partition('?')[0]
+    return '/' + '/'.join([segment if segment in ENDPOINT_ACTIONS else '{id}'
+                           for segment in path.split('/') if segment])
+
+
+class Instrument():
+    '''
+    Interface for request instrumentation. Every method is a no-op,
+    so subclasses only override the hooks they need.
+
+    Both hooks are called once per attempt, so a retried request calls them
+    again with a greater attempt number.
+    '''
+
+    def before_request(self, method, url, attempt, data):
+        '''
+        Called before an attempt is sent
+
+        Arguments:
+        method : HTTP method
+        url : Full request url
+        attempt : Number of retries already made
+        data : Request body, or None
+        '''
+
+    def after_request(self, method, url, attempt, data, response, elapsed, error=None):
+        '''
+        Called once an attempt has completed, including attempts that raised
+
+        Arguments:
+        response : The response, or None if the attempt raised
+        elapsed : Seconds taken by the attempt
+        error : The exception raised by the attempt, if any
+        '''
+
+
+class _Series():
+    '''
+    Counters of a single (method, endpoint) pair
+    '''
+
+    __slots__ = ('buckets', 'total', 'count', 'sent', 'received', 'retries', 'statuses')
+
+    def __init__(self, bucket_count):
+        self.buckets = [0] * (bucket_count + 1)
+        self.total = 0.0
+        self.count = 0
+        self.sent = 0
+        self.received = 0
+        self.retries = 0
+        self.statuses = {}
+
+
+class Metrics(Instrument):
+    '''
+    Thread-safe collector of per endpoint latency histograms, status counts,
+    bytes sent and received, retries and requests in flight
+
+    Arguments:
+    buckets : Upper bounds of the latency histogram buckets, in seconds
+    '''
+
+    def __init__(self, buckets=DEFAULT_BUCKETS):
+        self.buckets = tuple(sorted(buckets))
+        self.in_flight = 0
+        self._series = {}
+        self._lock = threading.Lock()
+
+    def before_request(self, method, url, attempt, data):
+        with self._lock:
+            self.in_flight += 1
+
+    def after_request(self, method, url, attempt, data, response, elapsed, error=None):
+        key = (method.upper(), endpoint_label(url))
+        status = 'error' if response is None else str(response.status_code)
+        received = len(response.content or b'') if response is not None else 0
+        sent = len(data) if data else 0
+
+        with self._lock:
+            self.in_flight -= 1
+            series = self._series.get(key)
+            if series is None:
+                series = self._series[key] = _Series(len(self.buckets))
+            series.buckets[bisect_left(self.buckets, elapsed)] += 1
+            series.total += elapsed
+            series.count += 1
+            series.sent += sent
+            series.received += received
+            if attempt:
+                series.retries += 1
+            series.statuses[status] = series.statuses.get(status, 0) + 1
+
+    def snapshot(self):
+        '''
+        Returns a dict of the counters of every (method, endpoint) pair
+        '''
+        with self._lock:
+            return {key : {'count' : series.count, 'seconds' : series.total,
+                           'buckets' : list(series.buckets), 'sent_bytes' : series.sent,
+                           'received_bytes' : series.received, 'retries' : series.retries,
+                           'statuses' : dict(series.statuses)}
+                    for key, series in self._series.items()}
+
+    def reset(self):
+        with self._lock:
+            self._series = {}
+
+    def to_openmetrics(self, prefix='paystack'):
+        '''
+        Returns the metrics in the OpenMetrics text exposition format
+        '''
+        snapshot = self.snapshot()
+        bounds = [repr(float(bound)) for bound in self.buckets] + ['+Inf']
+        lines = []
+
+        def labels(key, **extra):
+            pairs = [('method', key[0]), ('endpoint', key[1])] + sorted(extra.items())
+            return '{%s}' % ','.join('%s="%s"' % pair for pair in pairs)
+
+        lines.append('# TYPE %s_request_duration_seconds histogram' % prefix)
+        lines.append('# UNIT %s_request_duration_seconds seconds' % prefix)
+        for key, series in sorted(snapshot.items()):
+            cumulative = 0
+            for bound, count in zip(bounds, series['buckets']):
+                cumulative += count
+                lines.append('%s_request_duration_seconds_bucket%s %d'
+                             % (prefix, labels(key, le=bound), cumulative))
+            lines.append('%s_request_duration_seconds_sum%s %r'
+                         % (prefix, labels(key), series['seconds']))
+            lines.append('%s_request_duration_seconds_count%s %d'
+                         % (prefix, labels(key), series['count']))
+
+        lines.append('# TYPE %s_requests counter' % prefix)
+        for key, series in sorted(snapshot.items()):
+            for status, count in sorted(series['statuses'].items()):
+                lines.append('%s_requests_total%s %d'
+                             % (prefix, labels(key, status=status), count))
+
+        for name, field in (('request_retries', 'retries'), ('request_sent_bytes', 'sent_bytes'),
+                            ('response_received_bytes', 'received_bytes')):
+            lines.append('# TYPE %s_%s counter' % (prefix, name))
+            for key, series in sorted(snapshot.items()):
+                lines.append('%s_%s_total%s %d' % (prefix, name, labels(key), series[field]))
+
+        lines.append('# TYPE %s_requests_in_flight gauge' % prefix)
+        lines.append('%s_requests_in_flight %d' % (prefix, self.in_flight))
+        lines.append('# EOF')
+        return '\n'.join(lines) + '\n'
+
+
+def get_instrument():
+    '''
+    Returns the process wide Instrument used by managers without their own, or None
+    '''
+    return _shared_instrument
+
+
+def set_instrument(instrument):
+    '''
+    Replaces the process wide Instrument, e.g with a Metrics instance.
+    Pass None to disable instrumentation.
+    '''
+    global _shared_instrument
+    with _instrument_lock:
+        _shared_instrument = instrument
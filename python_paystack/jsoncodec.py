@@ -0,0 +1,105 @@
+'''
+jsoncodec.py
+JSON encoding and decoding of request and response bodies.
+
+orjson or ujson are used when installed (pip install python_paystack[fast]),
+otherwise the standard library json module.
+Set PaystackConfig.JSON_CODEC to 'orjson', 'ujson' or 'json' to pick one.
+'''
+import importlib
+import json
+import threading
+
+from .paystack_config import PaystackConfig
+
+_codec_lock = threading.Lock()
+_shared_codec = None
+
+
+class JSONCodec():
+    '''
+    Standard library codec and interface for the others.
+    loads takes bytes or str, so response bodies are decoded without
+    being converted to str first.
+    '''
+
+    name = 'json'
+
+    def dumps(self, data):
+        return json.dumps(data)
+
+    def loads(self, content):
+        return json.loads(content)
+
+
+class OrjsonCodec(JSONCodec):
+    '''
+    Codec backed by orjson. dumps returns bytes.
+    '''
+
+    name = 'orjson'
+
+    def __init__(self):
+        self._orjson = importlib.import_module('orjson')
+        self.dumps = self._orjson.dumps
+        self.loads = self._orjson.loads
+
+
+class UjsonCodec(JSONCodec):
+    '''
+    Codec backed by ujson
+    '''
+
+    name = 'ujson'
+
+    def __init__(self):
+        self._ujson = importlib.import_module('ujson')
+        self.dumps = self._ujson.dumps
+        self.loads = self._ujson.loads
+
+
+CODECS = {
+    'orjson' : OrjsonCodec,
+    'ujson' : UjsonCodec,
+    'json' : JSONCodec,
+}
+
+#Order codecs are tried in when PaystackConfig.JSON_CODEC is 'auto'
+PREFERRED_CODECS = ('orjson', 'ujson', 'json')
+
+
+def build_codec(name='auto'):
+    '''
+    Returns the codec called name, or the fastest one installed if name is 'auto'
+    '''
+    if name != 'auto':
+        if name not in CODECS:
+            raise ValueError("JSON_CODEC should be 'auto' or one of %s" % ', '.join(CODECS))
+        return CODECS[name]()
+
+    for name in PREFERRED_CODECS:
+        try:
+            return CODECS[name]()
+        except ImportError:
+            continue
+
+
+def get_codec():
+    '''
+    Returns the process wide codec selected by PaystackConfig.JSON_CODEC
+    '''
+    global _shared_codec
+    if _shared_codec is None:
+        with _codec_lock:
+            if _shared_codec is None:
+                _shared_codec = build_codec(PaystackConfig.JSON_CODEC)
+    return _shared_codec
+
+
+def set_codec(codec):
+    '''
+    Replaces the process wide codec. Pass None to select it again from PaystackConfig on next use.
+    '''
+    global _shared_codec
+    with _codec_lock:
+        _shared_codec = codec
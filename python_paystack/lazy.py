@@ -0,0 +1,28 @@
+'''
+lazy.py
+Deferred imports for dependencies that are slow to import
+'''
+import importlib
+
+
+class LazyModule():
+    '''
+    Stand-in for a module that is only imported when one of its attributes is first used.
+    Attributes are cached on the stand-in, so later lookups do not go through __getattr__.
+    '''
+
+    def __init__(self, name):
+        self._name = name
+        self._module = None
+
+    def __getattr__(self, attribute):
+        if attribute.startswith('__'):
+            raise AttributeError(attribute)
+        if self._module is None:
+            self._module = importlib.import_module(self._name)
+        value = getattr(self._module, attribute)
+        setattr(self, attribute, value)
+        return value
+
+    def __repr__(self):
+        return "<lazy module '%s'>" % self._name
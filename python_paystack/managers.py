@@ -2,86 +2,185 @@
 Managers.py
 '''
 
-import json
-import requests
-import validators
+from itertools import islice
 
 from .objects.base import Manager
 from .objects.customers import Customer
-from .objects.errors import APIConnectionFailedError, URLValidationError
+from .objects.errors import APIConnectionFailedError, Error, URLValidationError
 from .objects.filters import Filter
 from .objects.plans import Plan
 from .objects.transfers import Transfer
 from .objects.transactions import Transaction
+from .objects.validation import is_valid_url
 from .objects.subaccounts import SubAccount
 
 from .paystack_config import PaystackConfig
-from .mixins import CreatableMixin, RetrieveableMixin, UpdateableMixin
+from .cache import get_lookup_cache, get_verification_cache
+from .idempotency import JournalEntry
+from .lazy import LazyModule
+from .mixins import CreatableMixin, MirroredMixin, RetrieveableMixin, UpdateableMixin
+from .ratelimit import RateLimiter
 
-class Utils(Manager):
+futures = LazyModule('concurrent.futures')
+
+
+def initialize_transaction_data(method, transaction: Transaction, callback_url,
+                                pass_on_transaction_cost, local_cost, intl_cost, public_key=None):
     '''
+    Validates the arguments to initialize_transaction and builds the request body.
+    Returns a tuple of the normalized method and the data dict.
 
+    Shared by the blocking and asyncio transaction managers.
     '''
+    method = method.upper()
+    if method not in ('STANDARD', 'INLINE', 'INLINE EMBED'):
+        raise ValueError("method argument should be STANDARD, INLINE or INLINE EMBED")
 
-    def __init__(self):
-        super().__init__()
+    data = transaction.to_dict()
 
+    #The transaction keeps its amount, so initializing it again does not add the fees twice
+    if pass_on_transaction_cost:
+        data['amount'] = transaction.full_transaction_cost(transaction.card_locale,
+                                                           local_cost, intl_cost)
 
-    def resolve_card_bin(self, card_bin, endpoint='/decision/bin/'):
-        '''
+    if callback_url:
+        if is_valid_url(callback_url):
+            data['callback_url'] = callback_url
 
-        '''
-        card_bin = card_bin[:6]
-        url = self.PAYSTACK_URL + endpoint + card_bin
-        headers, _ = self.build_request_args()
+        else:
+            raise URLValidationError
 
-        response = requests.get(url, headers=headers)
-        content = self.parse_response_content(response.content)
+    if method in ('INLINE', 'INLINE EMBED'):
+        data['key'] = public_key or PaystackConfig.PUBLIC_KEY
 
-        status, message = self.get_content_status(content)
-        if status:
-            return content['data']
-        
-    def get_banks(self, endpoint='/bank'):
-        '''
+    return (method, data)
 
-        '''
-        url = self.PAYSTACK_URL + endpoint
-        headers, _ = self.build_request_args()
 
-        response = requests.get(url, headers=headers)
-        content = self.parse_response_content(response.content)
+def check_charge_matches(transaction: Transaction, data):
+    '''
+    Raises APIConnectionFailedError unless data, the verification data of a charge
+    with transaction's reference, is for the amount, authorization and email requested
+    '''
+    authorization = data.get('authorization') or {}
+    customer = data.get('customer') or {}
+    requested = (int(transaction.amount), transaction.authorization_code,
+                 str(transaction.email).lower())
+    charged = (int(data.get('amount') or 0), authorization.get('authorization_code'),
+               str(customer.get('email')).lower())
+    if requested != charged:
+        raise APIConnectionFailedError("Transaction reference %s was used for a different charge"
+                                       % transaction.reference)
+
+
+def verified_transaction(data_dict):
+    '''
+    Builds a Transaction from the data returned by the verify endpoint
+    '''
+    transaction = Transaction.from_dict(data_dict)
+    transaction.email = data_dict['customer']['email']
+    transaction.authorization_code = data_dict['authorization']['authorization_code']
+    return transaction
 
-        status, message = self.get_content_status(content)
-        if status:
-            return content['data']
 
-    def resolve_bvn(self, bvn, endpoint='/bank/resolve_bvn/'):
-        url = self.PAYSTACK_URL + endpoint + bvn
-        headers, _ = self.build_request_args()
+def is_duplicate_reference(message):
+    '''
+    Returns True if paystack rejected a request because its reference was already used
+    '''
+    return 'duplicate' in str(message).lower()
+
+
+def map_concurrently(function, items, concurrency):
+    '''
+    Calls function on every item using a bounded pool of threads.
+    Items are consumed lazily, with at most 'concurrency' calls in flight.
+    Yields an (item, result, error) tuple per item as each call completes;
+    a call that raises yields its exception as error.
+    '''
+    items = iter(items)
+    with futures.ThreadPoolExecutor(max_workers=concurrency) as executor:
+        pending = {}
+        while True:
+            for item in islice(items, concurrency - len(pending)):
+                pending[executor.submit(function, item)] = item
+
+            if not pending:
+                return
+
+            done, _ = futures.wait(pending, return_when=futures.FIRST_COMPLETED)
+            for future in done:
+                item = pending.pop(future)
+                try:
+                    yield (item, future.result(), None)
+                except (Exception, Error) as error:
+                    yield (item, None, error)
+
+
+def chunk_transfers(transfers, chunk_size):
+    '''
+    Groups transfers by currency and source into lists of at most chunk_size
+    '''
+    groups = {}
+    for transfer in transfers:
+        if not isinstance(transfer, Transfer):
+            raise TypeError("transfers should contain Transfer objects")
 
-        response = requests.get(url, headers=headers)
-        content = self.parse_response_content(response.content)
+        key = (transfer.currency, transfer.source)
+        group = groups.setdefault(key, [])
+        group.append(transfer)
+        if len(group) == chunk_size:
+            yield groups.pop(key)
+
+    for group in groups.values():
+        yield group
+
+
+class Utils(Manager):
+    '''
+    Reference lookups (banks, card BINs, account numbers, BVNs).
+    Banks, card BINs and account numbers are cached for PaystackConfig.CACHE_TTLS
+    in a shared LookupCache, or the cache passed in.
+    '''
+
+    def __init__(self, session=None, cache=None, client=None):
+        super().__init__(session, client)
+        self.cache = cache if cache is not None else get_lookup_cache()
+
+    def _get_data(self, url):
+        content = self.execute('GET', url, raw=True, check=False)
 
         status, message = self.get_content_status(content)
         if status:
             return content['data']
-    
-    def resolve_account_number(self, account_number, bank_code, endpoint='/bank/resolve'):
+
+    def _cached_get_data(self, lookup, url):
+        ttl = PaystackConfig.CACHE_TTLS.get(lookup)
+        if not ttl:
+            return self._get_data(url)
+        return self.cache.get_or_load(url, lambda: self._get_data(url), ttl)
+
+    def resolve_card_bin(self, card_bin, endpoint='/decision/bin/'):
         '''
-        '''        
-        params = "?account_number=%s&bank_code=%s" % (account_number, bank_code)
-        url = self.PAYSTACK_URL + endpoint + params
+        Returns the details of a card BIN (the first 6 digits of a card number)
+        '''
+        card_bin = card_bin[:6]
+        return self._cached_get_data('card_bin', self.PAYSTACK_URL + endpoint + card_bin)
 
-        headers, _ = self.build_request_args()
+    def get_banks(self, endpoint='/bank'):
+        '''
+        Returns the list of banks supported by paystack
+        '''
+        return self._cached_get_data('banks', self.PAYSTACK_URL + endpoint)
 
-        response = requests.get(url, headers=headers)
-        content = self.parse_response_content(response.content)
+    def resolve_bvn(self, bvn, endpoint='/bank/resolve_bvn/'):
+        return self._get_data(self.PAYSTACK_URL + endpoint + bvn)
+
+    def resolve_account_number(self, account_number, bank_code, endpoint='/bank/resolve'):
+        '''
+        Returns the account name for an account number
+        '''
+        params = "?account_number=%s&bank_code=%s" % (account_number, bank_code)
+        return self._cached_get_data('account_number', self.PAYSTACK_URL + endpoint + params)
 
-        status, message = self.get_content_status(content)
-        if status:
-            return content['data']
-        
 
 
 class TransactionsManager(RetrieveableMixin, Manager):
@@ -102,67 +201,114 @@ class TransactionsManager(RetrieveableMixin, Manager):
 
     _endpoint = '/transaction'
     _object_class = Transaction
+    _tenant_attributes = ('journal',)
 
-
-    def __init__(self, endpoint='/transaction'):
-        super().__init__()
+    def __init__(self, endpoint='/transaction', session=None, journal=None, client=None):
+        '''
+        Arguments:
+        journal : IdempotencyJournal recording initialize_transaction and
+                  charge_authorization calls made with an idempotency_key,
+                  under the client's public key
+        '''
+        super().__init__(session, client)
         self._endpoint = endpoint
+        self.journal = journal
+        #Coalesces verifications and caches transactions in a terminal status, None to disable
+        self.verification_cache = get_verification_cache()
+
+    def _begin_operation(self, operation, transaction: Transaction, idempotency_key):
+        '''
+        Records operation in the journal and gives transaction the reference of its
+        first attempt. Returns the JournalEntry, or None if the call is not journaled.
+        '''
+        if self.journal is None or idempotency_key is None:
+            return None
 
+        entry = self.journal.begin(idempotency_key, operation, transaction.reference,
+                                   self.client.public_key)
+        transaction.reference = entry.reference
+        return entry
 
     def initialize_transaction(self, method, transaction: Transaction,
-                               callback_url='', endpoint='/initialize'):
+                               callback_url='', endpoint='/initialize', idempotency_key=None):
         '''
         Initializes a paystack transaction.
         Returns an authorization url which points to a paystack form if the method is standard.
         Returns a dict containing transaction information if the method is inline or inline embed
 
+        A reference is generated for transactions without one, so the request can
+        safely be retried: paystack rejects a second transaction with the same reference.
+        If paystack reports an attempt with that reference was already applied, its
+        response was lost, so the transaction is initialized again with a new reference.
+        This is safe as initializing only creates a payment page nobody has seen.
+        References supplied by the caller are only replaced for journaled calls.
+
         Arguments:
         method : Specifies whether to use paystack inline, standard or inline embed
         callback_url : URL paystack redirects to after a user enters their card details
         plan_code : Payment plan code
         endpoint : Paystack API endpoint for intializing transactions
+        idempotency_key : Key of the logical operation e.g an order id. With a journal,
+                          calls with the same key reuse one reference and a completed
+                          call returns its recorded result.
         '''
+        generated = not transaction.reference
+        if generated:
+            transaction.reference = str(transaction.generate_reference_code())
 
-        method = method.upper()
-        if method not in ('STANDARD', 'INLINE', 'INLINE EMBED'):
-            raise ValueError("method argument should be STANDARD, INLINE or INLINE EMBED")
-
-        if self.PASS_ON_TRANSACTION_COST:
-            transaction.amount = transaction.full_transaction_cost(transaction.card_locale,
-                                                                   self.LOCAL_COST, self.INTL_COST)
-
-        data = json.JSONDecoder().decode(transaction.to_json())
-
-        if callback_url:
-            if validators.url(callback_url):
-                data['callback_url'] = callback_url
-
-            else:
-                raise URLValidationError
+        method, data = initialize_transaction_data(method, transaction, callback_url,
+                                                   self.PASS_ON_TRANSACTION_COST,
+                                                   self.LOCAL_COST, self.INTL_COST,
+                                                   self.client.public_key)
 
         if method in ('INLINE', 'INLINE EMBED'):
-            data['key'] = PaystackConfig.PUBLIC_KEY
             return data
 
-        headers, data = self.build_request_args(data)
+        #Journaled once the arguments are valid, so only requests that are sent are recorded
+        entry = self._begin_operation('initialize_transaction', transaction, idempotency_key)
+        if entry is not None:
+            if entry.state == JournalEntry.SUCCEEDED:
+                return Transaction.from_dict(entry.response)
+            data['reference'] = transaction.reference
 
         url = self.PAYSTACK_URL + self._endpoint + endpoint
-        response = requests.post(url, headers=headers, data=data)
-        content = response.content
-        content = self.parse_response_content(content)
-
-
+        content = self.execute('POST', url, data, raw=True, check=False, idempotent=True)
         status, message = self.get_content_status(content)
 
+        if not status and is_duplicate_reference(message) and (generated or entry is not None):
+            #An earlier attempt was applied but its authorization url was lost
+            transaction.reference = str(transaction.generate_reference_code())
+            data['reference'] = transaction.reference
+            if entry is not None:
+                entry = self.journal.restart(entry.key, transaction.reference, entry.tenant)
+            content = self.execute('POST', url, data, raw=True, check=False, idempotent=True)
+            status, message = self.get_content_status(content)
+
         #status = True for a successful connection
         if status:
-            data = json.dumps(content['data'])
-            transaction = Transaction.from_json(data)
-            return transaction
+            if entry is not None:
+                self.journal.complete(entry.key, content['data'], entry.tenant)
+            return Transaction.from_dict(content['data'])
         else:
-            #Connection failed
+            if entry is not None:
+                self.journal.fail(entry.key, message, entry.tenant)
             raise APIConnectionFailedError(message)
 
+    def get_verification_data(self, transaction_reference : str, endpoint='/verify/'):
+        '''
+        Returns the raw verification data of a transaction.
+        Concurrent calls for the same transaction share one request, and transactions
+        in a terminal status are answered from the verification_cache.
+
+        Arguments:
+        endpoint : Paystack API endpoint for verifying transactions
+        '''
+        url = self.PAYSTACK_URL + self._endpoint + endpoint + transaction_reference
+        if self.verification_cache is None:
+            return self.execute('GET', url)
+        return self.verification_cache.get_or_verify((self.client.public_key, url),
+                                                     lambda: self.execute('GET', url))
+
     def verify_transaction(self, transaction_reference : str, endpoint='/verify/'):
         '''
         Verifies a payment using the transaction reference.
@@ -170,107 +316,168 @@ class TransactionsManager(RetrieveableMixin, Manager):
         Arguments:
         endpoint : Paystack API endpoint for verifying transactions
         '''
+        return verified_transaction(self.get_verification_data(transaction_reference, endpoint))
 
-        endpoint += transaction_reference
-        url = self.PAYSTACK_URL + self._endpoint + endpoint
+    def verify_many(self, references, concurrency=10, rate_limit=None):
+        '''
+        Verifies many transactions concurrently on a bounded pool of threads.
+        Yields a (reference, transaction, error) tuple per reference as each one completes;
+        a failed verification yields its exception as error instead of stopping the batch.
 
-        headers, _ = self.build_request_args()
-        response = requests.get(url, headers=headers)
-        content = response.content
-        content = self.parse_response_content(content)
+        Arguments:
+        references : Iterable of transaction references, consumed lazily
+        concurrency : Maximum number of verifications in flight
+        rate_limit : Maximum verifications per second, or a RateLimiter shared with other callers
+        '''
+        if concurrency < 1:
+            raise ValueError("concurrency should be at least 1")
 
-        status, message = self.get_content_status(content)
+        if rate_limit is not None and not isinstance(rate_limit, RateLimiter):
+            rate_limit = RateLimiter(rate_limit)
 
-        if status:
-            data_dict = content['data']
-            data = json.dumps(content['data'])
-            transaction = Transaction.from_json(data)
-            transaction.email = data_dict['customer']['email']
-            transaction.authorization_code = data_dict['authorization']['authorization_code']
-            return transaction
-        else:
-            raise APIConnectionFailedError(message)
+        def verify(reference):
+            if rate_limit is not None:
+                rate_limit.acquire()
+            return self.verify_transaction(reference)
+
+        return map_concurrently(verify, references, concurrency)
+
+    def charge_authorization(self, transaction: Transaction, endpoint='/charge_authorization',
+                             idempotency_key=None):
+        '''
+        Charges a saved authorization and returns the charge data.
+
+        A reference is generated for transactions without one and the request is
+        retried with it, so a charge is never applied twice. If an earlier attempt
+        with a generated or journaled reference was already applied, its verification
+        data is returned, once checked to be for the same amount, authorization and email.
+        A reference supplied by the caller that paystack reports as already used raises
+        APIConnectionFailedError.
+
+        Arguments:
+        idempotency_key : Key of the logical operation e.g an order id. With a journal,
+                          calls with the same key reuse one reference and a completed
+                          call returns its recorded result.
+        '''
+        generated = not transaction.reference
+        if generated:
+            transaction.reference = str(transaction.generate_reference_code())
 
-    def charge_authorization(self, transaction: Transaction, endpoint='/charge_authorization'):
-        data = transaction.to_json()
-        headers, _ = self.build_request_args()
+        entry = self._begin_operation('charge_authorization', transaction, idempotency_key)
+        if entry is not None and entry.state == JournalEntry.SUCCEEDED:
+            return entry.response
 
-        response = requests.post(self.PAYSTACK_URL + self._endpoint + endpoint,
-                                 headers=headers, data=data)
-        content = response.content
-        content = self.parse_response_content(content)
+        url = self.PAYSTACK_URL + self._endpoint + endpoint
+        content = self.execute('POST', url, transaction.to_dict(), raw=True, check=False,
+                               idempotent=True)
 
         status, message = self.get_content_status(content)
 
         #status = True for a successful connection
         if status:
-            return content['data']
+            data = content['data']
+        elif is_duplicate_reference(message) and (generated or entry is not None):
+            #An earlier attempt was applied, return its outcome
+            data = self.get_verification_data(transaction.reference)
+            check_charge_matches(transaction, data)
         else:
             #Connection failed
+            if entry is not None:
+                self.journal.fail(entry.key, message, entry.tenant)
             raise APIConnectionFailedError(message)
+
+        if entry is not None:
+            self.journal.complete(entry.key, data, entry.tenant)
+        return data
+
+    def resolve_pending(self, operation='charge_authorization', older_than=60):
+        '''
+        Settles this integration's journaled operations left pending, e.g by a worker
+        that stopped mid-request, by verifying their references and recording the verification data.
+        Yields a (entry, data, error) tuple per pending operation. Operations that can
+        not be verified yet stay pending and yield the exception as error.
+
+        Arguments:
+        operation : Only resolve entries of this operation, None for every operation
+        older_than : Only resolve operations last updated more than this many seconds ago
+        '''
+        if self.journal is None:
+            raise ValueError("resolve_pending requires a journal")
+
+        for entry in self.journal.pending(operation, older_than, self.client.public_key):
+            try:
+                data = self.get_verification_data(entry.reference)
+            except (Exception, Error) as error:
+                yield (entry, None, error)
+            else:
+                self.journal.complete(entry.key, data, entry.tenant)
+                yield (entry, data, None)
     
     def get_transactions(self,filter=None):
         '''
-        Returns all transactions with the option of filtering by the transation status
+        Returns the first page of transactions as the raw response, with the option of
+        filtering by the transation status.
         Transaction statuses include : 'failed', 'success', 'abandoned'
+
+        Use iter_all to walk every page e.g iter_all(status='success', start=date)
         '''
         url = self.PAYSTACK_URL + self._endpoint
         if filter:
             url += '/?status={}'.format(filter)
-        
-        config = PaystackConfig()
-        headers = {
-            'Authorization':'Bearer '+config.SECRET_KEY
-        }        
-        r = requests.get(url,headers=headers)
 
-        return r.json()
+        return self.execute('GET', url, raw=True, check=False)
 
     def get_total_transactions(self):
         '''
         Get total amount recieved from transactions
         '''
-        headers, _ = self.build_request_args()
         url = self.PAYSTACK_URL + self._endpoint
         url += '/totals'
-        response = requests.get(url, headers=headers)
-
-        content = response.content
-        content = self.parse_response_content(content)
-
-        status, message = self.get_content_status(content)
+        return self.execute('GET', url)
 
-        if status:
-            return content['data']
-        else:
-            raise APIConnectionFailedError(message)
-    
 
     def filter_transactions(self, amount_range: range, transactions):
         '''
-        Returns all transactions with amounts in the given amount_range
+        Returns all transactions with amounts in the given amount_range.
+        transactions is a list of transaction dicts or a TransactionTable,
+        which is filtered in a single vectorized pass.
         '''
+        if hasattr(transactions, 'amount_mask'):
+            return transactions.where(transactions.amount_mask(amount_range))
+
         results = []
         for transaction in transactions:
             if Filter.filter_amount(amount_range, transaction):
                 results.append(transaction)
 
         return results
-    
 
-class CustomersManager(CreatableMixin, RetrieveableMixin, UpdateableMixin, Manager):
+    def get_table(self, per_page=100, **filters):
+        '''
+        Fetches every page of transactions into a columnar TransactionTable.
+        Takes the same filters as iter_all. Requires numpy.
+        '''
+        from .columnar import TransactionTable
+
+        return TransactionTable.from_records(self.iter_all(per_page=per_page, raw=True, **filters))
+
+
+class CustomersManager(MirroredMixin, CreatableMixin, RetrieveableMixin, UpdateableMixin,
+                       Manager):
     '''
     CustomersManager class which handels actions for Paystack Customers
 
     Attributes :
     _endpoint : Paystack API endpoint for 'customers' actions
+    mirror : Optional Mirror serving get, e.g Mirror(CUSTOMER_FIELDS)
 
     '''
     _endpoint = '/customer'
     _object_class = Customer
 
-    def __init__(self):
-        super().__init__()
+    def __init__(self, session=None, mirror=None, client=None):
+        super().__init__(session, client)
+        self.mirror = mirror
  
 
     def set_risk_action(self, risk_action, customer: Customer):
@@ -293,21 +500,9 @@ class CustomersManager(CreatableMixin, RetrieveableMixin, UpdateableMixin, Manag
 
         else:
             data = {'customer' : customer.id, 'risk_action' : risk_action}
-            headers, data = self.build_request_args(data)
             url = "%s%s" % (self.PAYSTACK_URL + self._endpoint, endpoint)
 
-            response = requests.post(url, headers=headers, data=data)
-
-            content = response.content
-            content = self.parse_response_content(content)
-
-            status, message = self.get_content_status(content)
-
-            if status:
-                data = json.dumps(content['data'])
-                return Customer.from_json(data)
-            else:
-                raise APIConnectionFailedError(message)
+            return self._mirror_put(self.execute('POST', url, data, bind=Customer.from_dict))
 
     def deactive_authorization(self, authorization_code):
         '''
@@ -318,35 +513,28 @@ class CustomersManager(CreatableMixin, RetrieveableMixin, UpdateableMixin, Manag
 
         '''
         data = {'authorization_code' : authorization_code}
-        headers, data = self.build_request_args(data)
 
         url = "%s/deactivate_authorization" % (self.PAYSTACK_URL + self._endpoint)
-        response = requests.post(url, headers=headers, data=data)
-
-        content = response.content
-        content = self.parse_response_content(content)
-
-        status, message = self.get_content_status(content)
-
-        if status:
-            return content['data']
-        else:
-            raise APIConnectionFailedError(message)
+        return self.execute('POST', url, data)
 
 
 
 
-class PlanManager(CreatableMixin, RetrieveableMixin, UpdateableMixin, Manager):
+class PlanManager(MirroredMixin, CreatableMixin, RetrieveableMixin, UpdateableMixin, Manager):
     '''
     Plan Manager class
+
+    Attributes :
+    mirror : Optional Mirror serving get, e.g Mirror(PLAN_FIELDS)
     '''
 
     _endpoint = '/plan'
     _object_class = Plan
 
-    def __init__(self, endpoint='/plan'):
-        super().__init__()
+    def __init__(self, endpoint='/plan', session=None, mirror=None, client=None):
+        super().__init__(session, client)
         self._endpoint = endpoint
+        self.mirror = mirror
 
     
 
@@ -359,8 +547,11 @@ class TransfersManager(CreatableMixin, RetrieveableMixin, UpdateableMixin, Manag
     _endpoint = '/transfer'
     _object_class = Transfer
 
-    def __init__(self, endpoint='/transfer'):
-        super().__init__()
+    #Maximum number of transfers paystack accepts in a single bulk request
+    BULK_LIMIT = 100
+
+    def __init__(self, endpoint='/transfer', session=None, client=None):
+        super().__init__(session, client)
         self._endpoint = endpoint
 
 
@@ -372,24 +563,64 @@ class TransfersManager(CreatableMixin, RetrieveableMixin, UpdateableMixin, Manag
         otp = str(otp)
 
         data = {'transfer_code' : transfer_id, 'otp' : otp}
-        headers, data = self.build_request_args(data)
 
         url = self.PAYSTACK_URL + self._endpoint
         url += '/finalize_transfer'
-        response = requests.post(url, headers=headers, data=data)
-        content = response.content
-        content = self.parse_response_content(content)
+        return self.execute('POST', url, data)
 
+    def bulk_create(self, transfers, chunk_size=100, concurrency=4, endpoint='/bulk'):
+        '''
+        Initiates many transfers through paystack's bulk transfer endpoint.
+        Transfers are grouped by currency and source, split into chunks of at most
+        chunk_size and the chunks are submitted concurrently.
 
-        status, message = self.get_content_status(content)
+        Yields a (transfer, created_transfer, error) tuple per transfer as its chunk completes.
+        If a chunk fails, each of its transfers is yielded with the error, so only
+        those transfers need to be resubmitted.
 
-        if status:
-            data = content['data']
-            return data
+        Transfers without a reference are given one before they are sent. A chunk that
+        failed with a timeout may still have been applied; resubmitting its transfers
+        with the same references makes paystack reject them as duplicates instead of
+        paying twice.
 
-        else:
-            #Connection failed
-            raise APIConnectionFailedError(message)
+        Arguments:
+        transfers : Iterable of Transfer objects, consumed lazily
+        chunk_size : Maximum number of transfers per request (paystack allows 100)
+        concurrency : Maximum number of chunks in flight
+        '''
+        if not 1 <= chunk_size <= self.BULK_LIMIT:
+            raise ValueError("chunk_size should be between 1 and %s" % self.BULK_LIMIT)
+        if concurrency < 1:
+            raise ValueError("concurrency should be at least 1")
+
+        url = self.PAYSTACK_URL + self._endpoint + endpoint
+
+        def submit(chunk):
+            currency, source = chunk[0].currency, chunk[0].source
+            items = []
+            for transfer in chunk:
+                if not transfer.reference:
+                    transfer.reference = str(transfer.generate_reference_code())
+                item = transfer.to_dict()
+                item.pop('currency', None)
+                item.pop('source', None)
+                items.append(item)
+
+            data = {'currency' : currency, 'source' : source, 'transfers' : items}
+            results = self.execute('POST', url, data)
+            if len(results) != len(chunk):
+                raise APIConnectionFailedError("Bulk transfer returned %s results for %s transfers"
+                                               % (len(results), len(chunk)))
+            return [Transfer.from_dict(result) for result in results]
+
+        chunks = chunk_transfers(transfers, chunk_size)
+        for chunk, created, error in map_concurrently(submit, chunks, concurrency):
+            if error is not None:
+                for transfer in chunk:
+                    yield (transfer, None, error)
+            else:
+                for transfer, created_transfer in zip(chunk, created):
+                    yield (transfer, created_transfer, None)
 
 
 
@@ -401,7 +632,7 @@ class SubAccountManager(CreatableMixin, RetrieveableMixin, UpdateableMixin, Mana
     _endpoint = None
     _object_class = SubAccount
 
-    def __init__(self, endpoint='/subaccount'):
-        super().__init__()
+    def __init__(self, endpoint='/subaccount', session=None, client=None):
+        super().__init__(session, client)
         self._endpoint = endpoint
 
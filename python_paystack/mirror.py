@@ -0,0 +1,174 @@
+'''
+mirror.py
+Local copy of the customers or plans of an integration, so lookups can be served
+without a request to paystack.
+
+A Mirror is filled from the list endpoint with sync(), kept up to date by the
+manager it is given to (create, update, set_risk_action) and serves that
+manager's get(). Incremental syncs only fetch records created since the newest
+record already held; changes made outside this process show up after a full sync.
+'''
+import threading
+import time
+
+from .jsoncodec import get_codec
+
+CUSTOMER_FIELDS = ('customer_code', 'email')
+PLAN_FIELDS = ('plan_code',)
+
+
+class Mirror():
+    '''
+    In-memory copy of the records of a list endpoint, indexed by id and the given fields.
+    Records are held encoded, so objects returned from it can be changed freely.
+    Safe to share between threads.
+
+    Arguments:
+    fields : Record fields to look records up by besides id, e.g CUSTOMER_FIELDS
+    '''
+
+    def __init__(self, fields=()):
+        self.fields = tuple(fields)
+        self.codec = get_codec()
+        #createdAt of the newest record held, incremental syncs start from it
+        self.watermark = None
+        self.synced_at = None
+        self.full_synced_at = None
+        self._records = {}
+        self._indexes = {field : {} for field in self.fields}
+        self._lock = threading.Lock()
+
+    def __len__(self):
+        return len(self._records)
+
+    def __contains__(self, key):
+        return self._find_id(key) is not None
+
+    def _find_id(self, key):
+        if isinstance(key, int) or (isinstance(key, str) and key.isdigit()):
+            record_id = int(key)
+            if record_id in self._records:
+                return record_id
+        for index in self._indexes.values():
+            record_id = index.get(key)
+            if record_id is not None:
+                return record_id
+        return None
+
+    def find(self, key):
+        '''
+        Returns a copy of the record with the id or indexed field value key, or None
+        '''
+        with self._lock:
+            record_id = self._find_id(key)
+            if record_id is None:
+                return None
+            encoded = self._records[record_id][0]
+        return self.codec.loads(encoded)
+
+    def put(self, record):
+        '''
+        Adds or replaces a record. Records without an id are ignored.
+        '''
+        record_id = record.get('id')
+        if record_id is None:
+            return
+        encoded = self.codec.dumps(record)
+        keys = tuple(record.get(field) for field in self.fields)
+        with self._lock:
+            self._store(int(record_id), encoded, keys, record.get('createdAt'))
+
+    def _store(self, record_id, encoded, keys, created_at):
+        previous = self._records.get(record_id)
+        if previous is not None:
+            for field, key in zip(self.fields, previous[1]):
+                if key is not None and self._indexes[field].get(key) == record_id:
+                    del self._indexes[field][key]
+
+        self._records[record_id] = (encoded, keys)
+        for field, key in zip(self.fields, keys):
+            if key is not None:
+                self._indexes[field][key] = record_id
+
+        if created_at and (self.watermark is None or created_at > self.watermark):
+            self.watermark = created_at
+
+    def merge(self, key, changes):
+        '''
+        Updates the fields of a record held under key with changes.
+        Returns the updated record, or None if no record is held under key.
+        '''
+        record = self.find(key)
+        if record is None:
+            return None
+        record.update(changes)
+        self.put(record)
+        return record
+
+    def remove(self, key):
+        '''
+        Removes the record held under key
+        '''
+        with self._lock:
+            record_id = self._find_id(key)
+            if record_id is None:
+                return
+            _, keys = self._records.pop(record_id)
+            for field, key in zip(self.fields, keys):
+                if key is not None and self._indexes[field].get(key) == record_id:
+                    del self._indexes[field][key]
+
+    def clear(self):
+        with self._lock:
+            self._records.clear()
+            for index in self._indexes.values():
+                index.clear()
+            self.watermark = None
+
+    def sync(self, manager, full=False, per_page=100):
+        '''
+        Fetches records from manager's list endpoint and returns how many were fetched.
+
+        Arguments:
+        manager : A manager with iter_all, e.g CustomersManager
+        full : Fetch every record and drop those paystack no longer lists,
+               instead of only those created since the last sync
+        per_page : Number of records per request
+        '''
+        started = time.time()
+        start = None if full else self.watermark
+        records = list(manager.iter_all(per_page=per_page, start=start, raw=True))
+
+        encoded = [(int(record['id']), self.codec.dumps(record),
+                    tuple(record.get(field) for field in self.fields), record.get('createdAt'))
+                   for record in records if record.get('id') is not None]
+        with self._lock:
+            if full or start is None:
+                self._records.clear()
+                for index in self._indexes.values():
+                    index.clear()
+                self.watermark = None
+                self.full_synced_at = started
+            for entry in encoded:
+                self._store(*entry)
+            self.synced_at = started
+        return len(records)
+
+    def staleness(self):
+        '''
+        Returns the seconds since the last sync started, or None if never synced
+        '''
+        if self.synced_at is None:
+            return None
+        return time.time() - self.synced_at
+
+    def stats(self):
+        '''
+        Returns a dict of the number of records held and the sync times
+        '''
+        full_staleness = None
+        if self.full_synced_at is not None:
+            full_staleness = time.time() - self.full_synced_at
+        return {'records' : len(self._records), 'watermark' : self.watermark,
+                'synced_at' : self.synced_at, 'staleness' : self.staleness(),
+                'full_synced_at' : self.full_synced_at, 'full_staleness' : full_staleness}
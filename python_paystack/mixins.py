@@ -1,11 +1,11 @@
 '''
 
 '''
-import json
-import requests
-
+from .lazy import LazyModule
 from .objects.errors import APIConnectionFailedError
 
+futures = LazyModule('concurrent.futures')
+
 class CreatableMixin(object):
     def create(self, target_object):
         '''
@@ -13,69 +13,122 @@ class CreatableMixin(object):
         '''
         url = self.PAYSTACK_URL + self._endpoint
 
-        data = target_object.to_json()        
-        headers, _ = self.build_request_args()        
-        response = requests.post(url, headers=headers, data=data)
-        
-        content = response.content
-        content = self.parse_response_content(content)        
-        status, message = self.get_content_status(content)
+        return self.execute('POST', url, target_object.to_dict(),
+                            bind=self._object_class.from_dict)
+
+
+def list_params(page=None, per_page=None, start=None, end=None, **filters):
+    '''
+    Builds the query parameters for paystack's list endpoints
+
+    Arguments:
+    page : Page number to fetch
+    per_page : Number of records per page
+    start : Only list records created from this date (datetime, date or string)
+    end : Only list records created up to this date (datetime, date or string)
+    filters : Other endpoint specific filters e.g status, customer, currency
+    '''
+    params = {}
+    if page is not None:
+        params['page'] = page
+    if per_page is not None:
+        params['perPage'] = per_page
+    if start is not None:
+        params['from'] = start.isoformat() if hasattr(start, 'isoformat') else start
+    if end is not None:
+        params['to'] = end.isoformat() if hasattr(end, 'isoformat') else end
+
+    for key, value in filters.items():
+        if value is not None:
+            params[key] = value
+
+    return params
 
-        if status:
-            data = json.dumps(content['data'])
-            return self._object_class.from_json(data)
-        else:
-            raise APIConnectionFailedError(message)
+
+def has_next_page(meta, page, item_count):
+    '''
+    Returns True if the page metadata points to another page after the given page
+    '''
+    if not item_count:
+        return False
+    page_count = meta.get('pageCount')
+    if page_count is None:
+        per_page = meta.get('perPage')
+        return bool(per_page) and item_count >= int(per_page)
+    return page < int(page_count)
 
 
 class RetrieveableMixin(object):
     '''
 
     '''
-        
-    def get_all(self):
-        '''
 
+    def get_page(self, **params):
         '''
-        headers, _ = self.build_request_args()
-        response = requests.get(self.PAYSTACK_URL + self._endpoint, headers=headers)
-
-        content = response.content
-        content = self.parse_response_content(content)
+        Returns a tuple of the raw data list and the metadata of a single page.
+        Takes the same arguments as list_params.
+        '''
+        content = self.execute('GET', self.PAYSTACK_URL + self._endpoint,
+                               params=list_params(**params), raw=True)
+        return (content['data'], content.get('meta', {}))
 
-        status, message = self.get_content_status(content)
+    def get_all(self, page=None, per_page=None, **filters):
+        '''
+        Returns a tuple of the objects on a single page and the page metadata
+        '''
+        data, meta = self.get_page(page=page, per_page=per_page, **filters)
+        objects = []
+        for item in data:
+            objects.append(self._object_class.from_dict(item))
+        return (objects, meta)
 
-        if status:
-            data = content['data']
-            meta = content['meta']
-            objects = []
-            for item in data:
-                item = json.dumps(item)                
-                objects.append(self._object_class.from_json(item))
-                return (objects, meta)
-        else:
-            raise APIConnectionFailedError(message)
+    def iter_all(self, per_page=100, start=None, end=None, raw=False, prefetch=True, **filters):
+        '''
+        Generator over every object of the endpoint, one page at a time.
+        Pages are requested lazily and, with prefetch, the next page is fetched in a
+        background thread while the current one is consumed, so at most two pages
+        are held in memory.
+
+        Arguments:
+        per_page : Number of records per request
+        start, end : Date range filters (see list_params)
+        raw : Yield the response dicts instead of objects
+        prefetch : Fetch the next page while the current one is being consumed
+        filters : Other endpoint specific filters e.g status
+        '''
+        def fetch(page):
+            return self.get_page(page=page, per_page=per_page, start=start, end=end, **filters)
+
+        executor = futures.ThreadPoolExecutor(max_workers=1) if prefetch else None
+        try:
+            page = 1
+            data, meta = fetch(page)
+            while True:
+                upcoming = None
+                if has_next_page(meta, page, len(data)):
+                    if executor:
+                        upcoming = executor.submit(fetch, page + 1)
+                    else:
+                        upcoming = page + 1
+
+                for item in data:
+                    yield item if raw else self._object_class.from_dict(item)
+
+                if upcoming is None:
+                    return
+
+                page += 1
+                data, meta = upcoming.result() if executor else fetch(page)
+        finally:
+            if executor:
+                executor.shutdown(wait=False, cancel_futures=True)
 
-        
     def get(self, object_id):
         '''
         Method for getting an object with the specified id
         '''
-        headers, _ = self.build_request_args()
-
         url = "%s%s/%s" % (self.PAYSTACK_URL, self._endpoint, object_id)
-        response = requests.get(url, headers=headers)
-
-        content = response.content
-        content = self.parse_response_content(content)
-
-        status, message = self.get_content_status(content)
-
-        if status:
-            data = json.dumps(content['data'])            
-            return self._object_class.from_json(data)
-        else:
-            raise APIConnectionFailedError(message)
+        return self.execute('GET', url, bind=self._object_class.from_dict)
 
 
 class UpdateableMixin(object):
@@ -86,16 +139,44 @@ class UpdateableMixin(object):
         if not isinstance(updated_object, self._object_class):
             raise TypeError
 
-        data = updated_object.to_json()
-        headers, _ = self.build_request_args()
         url = "%s%s/%s" % (self.PAYSTACK_URL, self._endpoint, object_id)
 
-        response = requests.put(url, headers=headers, data=data)
-        content = response.content
-        content = self.parse_response_content(content)
+        content = self.execute('PUT', url, updated_object.to_dict(), raw=True, check=False)
 
         status, message = self.get_content_status(content)
         if status or message:
             return (status, message)
         else:
-            raise APIConnectionFailedError(message)
\ No newline at end of file
+            raise APIConnectionFailedError(message)
+
+class MirroredMixin(object):
+    '''
+    Serves get from the manager's mirror, when it has one, and records the objects
+    returned by get, create and update in it. See mirror.py
+    '''
+    mirror = None
+    _tenant_attributes = ('mirror',)
+
+    def _mirror_put(self, target_object):
+        if self.mirror is not None and target_object is not None:
+            self.mirror.put(target_object.to_dict())
+        return target_object
+
+    def get(self, object_id):
+        '''
+        Method for getting an object with the specified id, or any field the mirror indexes
+        '''
+        if self.mirror is not None:
+            record = self.mirror.find(object_id)
+            if record is not None:
+                return self._object_class.from_dict(record)
+        return self._mirror_put(super().get(object_id))
+
+    def create(self, target_object):
+        return self._mirror_put(super().create(target_object))
+
+    def update(self, object_id, updated_object):
+        result = super().update(object_id, updated_object)
+        if self.mirror is not None and result[0]:
+            self.mirror.merge(object_id, updated_object.to_dict())
+        return result
@@ -2,18 +2,137 @@
 base.py
 '''
 import json
-import jsonpickle
-from .errors import InvalidInstance
-from ..paystack_config import PaystackConfig
+import time
+from itertools import repeat
+from operator import attrgetter
+from types import MemberDescriptorType
+from .errors import APIConnectionFailedError, InvalidInstance
+from ..client import PaystackClient
+from ..instrumentation import get_instrument
+from ..jsoncodec import get_codec
+from ..lazy import LazyModule
+from ..pipeline import Call, REQUEST_STAGES, RESPONSE_STAGES
+from ..ratelimit import RetryPolicy, get_rate_limiter
+from ..transport import get_session
+
+jsonpickle = LazyModule('jsonpickle')
+requests = LazyModule('requests')
+
+set_slot = MemberDescriptorType.__set__
 
 class Base():
     '''
     Abstract Base Class
+
+    Subclasses declare their fields and default values in _defaults and list the
+    same names and '_extra' in __slots__. Fields hold their default until set, and
+    fields still holding their default are left out of to_dict. Attributes without
+    a declared field, e.g extra keys in an API response or a 'subaccount' set by the
+    caller, are kept in the _extra dict and sent with the fields. _extra is None for
+    objects without such attributes, so objects do not carry an empty dict.
     '''
+    __slots__ = ()
+
+    _defaults = {}
+    _extra = None
+    #Field tables built once per class from _defaults
+    _field_table = ()
+    _field_names = frozenset()
+    _field_getter = staticmethod(lambda instance: ())
+    _field_slots = ()
+    _field_values = ()
+
+    def __init_subclass__(cls, **kwargs):
+        super().__init_subclass__(**kwargs)
+        cls._field_table = tuple(cls._defaults.items())
+        cls._field_names = frozenset(cls._defaults)
+        if cls._defaults:
+            getter = attrgetter(*cls._defaults)
+            if len(cls._defaults) == 1:
+                cls._field_getter = staticmethod(lambda instance: (getter(instance),))
+            else:
+                cls._field_getter = staticmethod(getter)
+
+        cls._field_slots = tuple(getattr(cls, name, None) for name in cls._defaults)
+        if not all(isinstance(slot, MemberDescriptorType) for slot in cls._field_slots):
+            raise TypeError("%s should list every field of _defaults in __slots__" % cls.__name__)
+        cls._field_values = tuple(cls._defaults.values())
+
     def __init__(self):
         if type(self) is Base:
             raise TypeError("Can not make instance of abstract base class")
 
+        #Sets every field through its slot, skipping __setattr__
+        any(map(set_slot, self._field_slots, repeat(self), self._field_values))
+        object.__setattr__(self, '_extra', None)
+
+    def __setattr__(self, name, value):
+        try:
+            object.__setattr__(self, name, value)
+        except AttributeError:
+            #A read only property, not a missing field
+            if hasattr(type(self), name):
+                raise
+            #Not a field, kept with the extra keys of API responses and sent with the fields
+            if self._extra is None:
+                object.__setattr__(self, '_extra', {})
+            self._extra[name] = value
+
+    def __delattr__(self, name):
+        extra = self._extra
+        if extra is not None and name in extra:
+            del extra[name]
+        else:
+            object.__delattr__(self, name)
+
+    def __getattr__(self, name):
+        #Only called for names that are not fields, e.g extra keys of an API response
+        extra = self._extra if name != '_extra' else None
+        if extra is None or name not in extra:
+            raise AttributeError("%r object has no attribute %r" % (type(self).__name__, name))
+        return extra[name]
+
+    def __getstate__(self):
+        state = {}
+        for (name, default), value in zip(self._field_table, self._field_getter(self)):
+            if value is not default:
+                state[name] = value
+        if self._extra:
+            state.update(self._extra)
+        return state
+
+    def __setstate__(self, state):
+        values = map(state.get, self._defaults, self._field_values)
+        any(map(set_slot, self._field_slots, repeat(self), values))
+
+        extra = None
+        if not self._field_names.issuperset(state):
+            extra = {key : state[key] for key in state.keys() - self._field_names}
+        object.__setattr__(self, '_extra', extra)
+
+    def to_dict(self):
+        '''
+        Method to return the instance's attributes as a plain dict
+        '''
+        data = self.__getstate__()
+        for key, value in data.items():
+            if isinstance(value, Base):
+                data[key] = value.to_dict()
+        return data
+
+    @classmethod
+    def from_dict(cls, data):
+        '''
+        Method to return a class instance from an already decoded dict,
+        e.g. the 'data' of an API response.
+        The class's __init__ is not called, so no validation is done.
+        '''
+        if not isinstance(data, dict):
+            raise TypeError("data argument should be a dict")
+
+        class_object = cls.__new__(cls)
+        class_object.__setstate__(data)
+        return class_object
 
     def to_json(self, pickled=False):
         '''
@@ -22,33 +141,20 @@ class Base():
         if pickled:
             return jsonpickle.encode(self)
         else:
-            data = json.JSONDecoder().decode(jsonpickle.encode(self))
-            data.pop("py/object")
-            return json.dumps(data)
+            return json.dumps(self.to_dict())
 
     @classmethod
     def from_json(cls, data, pickled=False):
         '''
         Method to return a class instance from given json dict
         '''
-        class_name = cls.__name__
-        class_object = None
         if pickled:
             class_object = jsonpickle.decode(data)
-        else:
-            py_object = str(cls).replace('<class ', '')
-            py_object = py_object.replace('>', '')
-            py_object = py_object.replace("'", "")
-            data = json.JSONDecoder().decode(data)
-            data['py/object'] = py_object
-            data = json.JSONEncoder().encode(data)
-
-            class_object = jsonpickle.decode(data)
-
-        if isinstance(class_object, cls):
+            if not isinstance(class_object, cls):
+                raise InvalidInstance(cls.__name__)
             return class_object
-        else:
-            raise InvalidInstance(class_name)
+
+        return cls.from_dict(get_codec().loads(data))
 
 class Manager(Base):
     '''
@@ -61,21 +167,168 @@ class Manager(Base):
     INTL_COST = None
     PASS_ON_TRANSACTION_COST = None
 
-    decoder = json.JSONDecoder()
+    #Stages of the request pipeline, see pipeline.py
+    request_stages = REQUEST_STAGES
+    response_stages = RESPONSE_STAGES
 
-    def __init__(self):
+    #Attributes holding data of the manager's integration, e.g a mirror, left out by bind
+    _tenant_attributes = ()
+
+    def __init__(self, session=None, client=None):
+        '''
+        Arguments :
+        session : Optional requests.Session to send requests with.
+                  Defaults to the client's session, or the pooled session shared by every manager.
+        client : PaystackClient whose keys, url and fee settings are used.
+                 Defaults to the settings in PaystackConfig.
+        '''
         super().__init__()
         if type(self) is Manager:
             raise TypeError("Can not make instance of abstract base class")
 
-        if not PaystackConfig.SECRET_KEY or not PaystackConfig.PUBLIC_KEY:
-            raise ValueError("No secret key or public key found,"
-                             "assign values using PaystackConfig.SECRET_KEY = SECRET_KEY and"
-                             "PaystackConfig.PUBLIC_KEY = PUBLIC_KEY")
+        if client is None:
+            client = PaystackClient.from_config()
+        else:
+            self.LOCAL_COST = client.local_cost
+            self.INTL_COST = client.intl_cost
+            self.PASS_ON_TRANSACTION_COST = client.pass_on_transaction_cost
+
+        self.retry_policy = RetryPolicy()
+        self.rate_limiter = get_rate_limiter()
+        self.codec = get_codec()
+        #Instrument for this manager's requests, None to use the process wide one
+        self.instrument = None
+        self._session = session if session is not None else client.session
+        self._bind_client(client)
+
+    def _bind_client(self, client):
+        self.client = client
+        self.PAYSTACK_URL = client.paystack_url
+        self.SECRET_KEY = client.secret_key
+        self.timeout = client.timeout
+        #Read only, shared by every request of the client
+        self.headers = client.headers
+
+    def bind(self, client, **tenant_attributes):
+        '''
+        Returns a copy of this manager making its requests with client's settings and
+        session, e.g to serve a request for another merchant.
+        Settings such as the retry policy and instrument are shared with this manager;
+        data of this manager's integration, e.g its mirror or journal, is not copied
+        and can be given for the new client instead.
+
+        Arguments:
+        client : PaystackClient of the other integration
+        tenant_attributes : e.g mirror or journal of the other integration, None if not given
+        '''
+        unexpected = set(tenant_attributes) - set(self._tenant_attributes)
+        if unexpected:
+            raise TypeError("bind() got unexpected arguments: %s" % ', '.join(sorted(unexpected)))
+
+        manager = type(self).__new__(type(self))
+        manager.__dict__.update(self.__dict__)
+        for name in self._tenant_attributes:
+            setattr(manager, name, tenant_attributes.get(name))
+        manager.LOCAL_COST = client.local_cost
+        manager.INTL_COST = client.intl_cost
+        manager.PASS_ON_TRANSACTION_COST = client.pass_on_transaction_cost
+        manager._session = client.session
+        manager._bind_client(client)
+        return manager
+
+    @property
+    def session(self):
+        '''
+        The session used for every request made by this manager
+        '''
+        if self._session is None:
+            return get_session()
+        return self._session
+
+    def execute(self, method, url, data=None, params=None, bind=None, raw=False, check=True,
+                idempotent=False):
+        '''
+        Sends an API call through the request pipeline and returns the response data.
+        Every manager method goes through here, so pipeline stages apply to all of them.
+
+        Arguments :
+        method : HTTP method e.g GET, POST, PUT
+        url : Full request url
+        data : Request body, a dict is encoded as json
+        params : Query parameters
+        bind : Callable the response data is passed through e.g Transaction.from_dict
+        raw : Return the whole decoded response instead of its data
+        check : Raise APIConnectionFailedError if the response status is false
+        idempotent : The request is safe to retry even if its method is not
+        '''
+        call = Call(method, url, data, params, bind, raw, check, idempotent)
+        for stage in self.request_stages:
+            stage(self, call)
+        call.response = self.request(method, call.url, idempotent, **call.request_kwargs())
+        for stage in self.response_stages:
+            stage(self, call)
+        return call.result
+
+    def request(self, method, url, idempotent=False, **kwargs):
+        '''
+        Sends a request through the manager's pooled session and returns the response.
+        Waits on the manager's rate_limiter before every attempt and retries throttled or
+        failed requests according to its retry_policy.
+
+        Arguments :
+        method : HTTP method e.g GET, POST, PUT
+        url : Full request url
+        idempotent : The request is safe to repeat even if its method is not
+        '''
+        kwargs.setdefault('timeout', self.timeout)
+        instrument = self.instrument or get_instrument()
+        attempt = 0
+        while True:
+            if self.rate_limiter is not None:
+                self.rate_limiter.acquire()
+
+            if instrument is not None:
+                instrument.before_request(method, url, attempt, kwargs.get('data'))
+                started = time.perf_counter()
+            response = error = None
+            try:
+                response = self.session.request(method, url, **kwargs)
+            except BaseException as raised:
+                error = raised
+                if not isinstance(error, (requests.ConnectionError, requests.Timeout)):
+                    raise
+            finally:
+                #Every attempt is recorded, whatever it raised
+                if instrument is not None:
+                    instrument.after_request(method, url, attempt, kwargs.get('data'), response,
+                                             time.perf_counter() - started, error)
 
-        self.PAYSTACK_URL = PaystackConfig.PAYSTACK_URL
-        self.SECRET_KEY = PaystackConfig.SECRET_KEY
+            if error is not None:
+                if not self.retry_policy.should_retry(method, None, attempt, idempotent):
+                    raise error
+                delay = self.retry_policy.delay(attempt)
+            else:
+                if not self.retry_policy.should_retry(method, response.status_code, attempt,
+                                                     idempotent):
+                    return self.check_response_status(response)
+                delay = self.retry_policy.delay(attempt, response.headers.get('Retry-After'))
+                if response.status_code == 429 and self.rate_limiter is not None:
+                    self.rate_limiter.pause(delay)
 
+            time.sleep(delay)
+            attempt += 1
+
+    def check_response_status(self, response):
+        '''
+        Returns the response, or raises APIConnectionFailedError if paystack throttled
+        the request or failed to process it (HTTP 429 or 5xx).
+        Other error statuses carry a json body which is handled by the caller.
+        '''
+        status_code = response.status_code
+        if status_code == 429 or status_code >= 500:
+            raise APIConnectionFailedError("Paystack API request failed with HTTP status %s"
+                                           % status_code)
+        return response
 
     def get_content_status(self, content):
         '''
@@ -92,14 +345,18 @@ class Manager(Base):
 
     def parse_response_content(self, content):
         '''
-        Method to convert a response's content in bytes to a string.
+        Method to decode a response's json content, straight from bytes.
 
         Arguments:
         content : Response in bytes
         '''
-        content = bytes.decode(content)
-        content = self.decoder.decode(content)
-        return content
+        return self.codec.loads(content)
+
+    def build_headers(self):
+        '''
+        Returns a copy of the headers sent with every request
+        '''
+        return dict(self.headers)
 
     def build_request_args(self, data=None):
         '''
@@ -109,11 +366,4 @@ class Manager(Base):
         Arguments :
         data(Dict) : An optional data argument which holds the body of the request.
         '''
-        headers = {'Authorization' : 'Bearer %s' % self.SECRET_KEY,
-                   'Content-Type' : 'application/json',
-                   'cache-control' : 'no-cache'
-                  }
-
-        data = json.dumps(data)
-
-        return (headers, data)
+        return (self.build_headers(), json.dumps(data))
@@ -2,41 +2,44 @@
 customers.py
 '''
 
-import validators
 from .errors import InvalidEmailError
 from .base import Base
+from .validation import is_valid_email
 
 class Customer(Base):
     '''
     Customer class that holds customer properties
     '''
 
-    phone = None
-    email = None
-    customer_code = None
-    risk_action = None
-    first_name = None
-    last_name = None
-    id = None
-    metadata = None
+    _defaults = {
+        'phone' : None,
+        'email' : None,
+        'customer_code' : None,
+        'risk_action' : None,
+        'first_name' : None,
+        'last_name' : None,
+        'id' : None,
+        'metadata' : None,
+    }
+    __slots__ = tuple(_defaults) + ('_extra',)
 
     def __init__(self, email, first_name=None, last_name=None,
-                 phone=None, risk_action=None, id=None, metadata=None):
+                 phone=None, risk_action=None, id=None, metadata=None, trusted=False):
         super().__init__()
-        if validators.email(email):
-            self.email = email
-            self.first_name = first_name
-            self.last_name = last_name
-            self.phone = phone
-            self.risk_action = risk_action
-            # self.id = id
-        else:
-            raise InvalidEmailError
+        if not trusted:
+            if not is_valid_email(email):
+                raise InvalidEmailError
 
-        if metadata and not isinstance(metadata, dict):
-            raise TypeError("meta argument should be a dict")
-        else:
-            self.metadata = metadata
+            if metadata and not isinstance(metadata, dict):
+                raise TypeError("meta argument should be a dict")
+
+        self.email = email
+        self.first_name = first_name
+        self.last_name = last_name
+        self.phone = phone
+        self.risk_action = risk_action
+        # self.id = id
+        self.metadata = metadata
 
     def __str__(self):
         value = self.email
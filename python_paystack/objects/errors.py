@@ -52,3 +52,14 @@ class URLValidationError(Error):
 
     def __str__(self):
         return self.message
+
+
+class InvalidSignatureError(Error):
+    '''
+    Raised when a webhook payload does not match its x-paystack-signature header
+    '''
+
+    message = 'Invalid webhook signature'
+
+    def __str__(self):
+        return self.message
@@ -1,8 +1,138 @@
+'''
+filters.py
+'''
+MISSING = object()
+
+
+def compile_path(path):
+    '''
+    Compiles a dotted key path such as 'authorization.bin' into a function
+    returning the value at that path in a dict, or MISSING if any key is absent
+    '''
+    keys = tuple(path.split('.')) if isinstance(path, str) else tuple(path)
+    if not keys or not all(keys):
+        raise ValueError("Invalid key path : %r" % (path,))
+
+    if len(keys) == 1:
+        key = keys[0]
+
+        def get(record):
+            return record.get(key, MISSING)
+
+        return get
+
+    def get_nested(record):
+        for key in keys:
+            if not isinstance(record, dict):
+                return MISSING
+            record = record.get(key, MISSING)
+            if record is MISSING:
+                return MISSING
+        return record
+
+    return get_nested
+
+
+class Predicate():
+    '''
+    A compiled test over a response dict.
+    Predicates are combined with & (and), | (or) and ~ (not),
+    and are applied by calling them or with select.
+    '''
+
+    def __init__(self, test):
+        self.test = test
+
+    def __call__(self, record):
+        return self.test(record)
+
+    def __and__(self, other):
+        first, second = self.test, other.test
+        return Predicate(lambda record: first(record) and second(record))
+
+    def __or__(self, other):
+        first, second = self.test, other.test
+        return Predicate(lambda record: first(record) or second(record))
+
+    def __invert__(self):
+        test = self.test
+        return Predicate(lambda record: not test(record))
+
+    def select(self, records):
+        '''
+        Generator over the records matching the predicate
+        '''
+        return filter(self.test, records)
+
+
 class Filter():
     '''
     Filter class for checking through dicts
+
+    find_key_value and filter_amount search every nested dict on each call.
+    For large streams of records, build a Predicate once with equals, between,
+    is_in or test and apply it to each record instead.
     '''
 
+    @staticmethod
+    def test(path, function):
+        '''
+        Predicate that is True when the value at path exists and function(value) is truthy
+        '''
+        get = compile_path(path)
+
+        def check(record):
+            value = get(record)
+            return value is not MISSING and bool(function(value))
+
+        return Predicate(check)
+
+    @staticmethod
+    def equals(path, expected):
+        get = compile_path(path)
+        return Predicate(lambda record: get(record) == expected)
+
+    @staticmethod
+    def is_in(path, values):
+        get = compile_path(path)
+        values = frozenset(values)
+
+        def check(record):
+            value = get(record)
+            return value is not MISSING and value in values
+
+        return Predicate(check)
+
+    @staticmethod
+    def between(path, low=None, high=None):
+        '''
+        Predicate that is True when low <= value <= high. Either bound may be None.
+        A range may be given as low, in which case its stop is excluded.
+        '''
+        get = compile_path(path)
+        if isinstance(low, range):
+            low, high = low.start, low.stop - 1
+
+        def check(record):
+            value = get(record)
+            if value is MISSING or value is None:
+                return False
+            if low is not None and value < low:
+                return False
+            return high is None or value <= high
+
+        return Predicate(check)
+
+    @staticmethod
+    def all_of(*predicates):
+        tests = tuple(predicate.test for predicate in predicates)
+        return Predicate(lambda record: all(test(record) for test in tests))
+
+    @staticmethod
+    def any_of(*predicates):
+        tests = tuple(predicate.test for predicate in predicates)
+        return Predicate(lambda record: any(test(record) for test in tests))
+
     @staticmethod
     def find_key_value(key, dataset):
         '''
@@ -27,7 +157,9 @@ class Filter():
                 return (True, dataset[item])
 
         for dataset in dicts:
-            return Filter.find_key_value(key, dataset)
+            found, value = Filter.find_key_value(key, dataset)
+            if found:
+                return (found, value)
 
         return (False, 0)
 
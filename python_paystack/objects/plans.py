@@ -1,30 +1,33 @@
 '''
 plans.py
 '''
-from forex_python.converter import CurrencyCodes
 from .base import Base
+from .currencies import is_valid_currency
 
 class Plan(Base):
     '''
     Plan class for making payment plans
     '''
 
-    interval = None
-    name = None
-    amount = None
-    plan_code = None
-    currency = None
-    id = None
-    send_sms = True
-    send_invoices = True
-    description = None
+    _defaults = {
+        'interval' : None,
+        'name' : None,
+        'amount' : None,
+        'plan_code' : None,
+        'currency' : None,
+        'id' : None,
+        'send_sms' : True,
+        'send_invoices' : True,
+        'description' : None,
+    }
+    __slots__ = tuple(_defaults) + ('_extra',)
     __interval_values = ('hourly', 'daily', 'weekly', 'monthly', 'annually')
 
     def __init__(self, name, interval, amount, currency='NGN', plan_code=None,
                  id=None, send_sms=None, send_invoices=None, description=None):
         super().__init__()
         #Check if currency supplied is valid
-        if not CurrencyCodes().get_symbol(currency.upper()):
+        if not is_valid_currency(currency):
             raise ValueError("Invalid currency supplied")
 
         if interval.lower() not in self.__interval_values:
@@ -7,15 +7,17 @@ class SubAccount(Base):
     '''
 
     '''
-    business_name = None
-    settlement_bank = None
-    account_number = None
-    percentage_charge = None
-
-    primary_contact_email = None
-    primary_contact_name = None
-    primary_contact_phone = None
-    settlement_schedule = None
+    _defaults = {
+        'business_name' : None,
+        'settlement_bank' : None,
+        'account_number' : None,
+        'percentage_charge' : None,
+        'primary_contact_email' : None,
+        'primary_contact_name' : None,
+        'primary_contact_phone' : None,
+        'settlement_schedule' : None,
+    }
+    __slots__ = tuple(_defaults) + ('_extra',)
   
     def __init__(self, business_name, settlement_bank, account_number, percentage_charge):
         super().__init__()
@@ -1,40 +1,62 @@
 '''
 transactions.py
 '''
-import math, uuid
-from datetime import datetime
-import validators
 from .base import Base
+from ..fees import transaction_cost
+from ..lazy import LazyModule
 from .errors import InvalidEmailError
+from .validation import is_valid_email, parse_amount
+
+uuid = LazyModule('uuid')
 
 class Transaction(Base):
     '''
     Transactions class
     '''
-    reference = None
-    amount = None
-    email = None
-    plan = None
-    transaction_charge = None
-    metadata = None
-    card_locale = 'LOCAL'
-    authorization_url = None
-    authorization_code = None
+    _defaults = {
+        'reference' : None,
+        'amount' : None,
+        'email' : None,
+        'plan' : None,
+        'transaction_charge' : None,
+        'metadata' : None,
+        'card_locale' : 'LOCAL',
+        'authorization_url' : None,
+        'authorization_code' : None,
+        #Fields returned by the transaction endpoints
+        'id' : None,
+        'access_code' : None,
+        'status' : None,
+        'currency' : None,
+        'channel' : None,
+        'gateway_response' : None,
+        'message' : None,
+        'domain' : None,
+        'ip_address' : None,
+        'fees' : None,
+        'paid_at' : None,
+        'created_at' : None,
+        'customer' : None,
+        'authorization' : None,
+    }
+    __slots__ = tuple(_defaults) + ('_extra',)
 
-    def __init__(self, amount: int, email):
+    def __init__(self, amount: int, email, trusted=False):
+        '''
+        Arguments:
+        amount : Amount in kobo
+        email : Customer's email
+        trusted : Skip validation, for values already validated, e.g by paystack
+        '''
         super().__init__()
-        try:
-            amount = int(amount)
-        except ValueError:
-            raise ValueError("Invalid amount. Amount(in kobo) should be an integer")
-
-        else:
-            if validators.email(email):
-                self.amount = amount
-                self.email = email
-            else:
+        if not trusted:
+            amount = parse_amount(amount)
+            if not is_valid_email(email):
                 raise InvalidEmailError
 
+        self.amount = amount
+        self.email = email
+
     def generate_reference_code(self):
         '''
         Generates a unique transaction reference code
@@ -50,23 +72,12 @@ class Transaction(Base):
         '''
         if self.amount:
 
-            if locale not in ('LOCAL', 'INTERNATIONAL'):
-                raise ValueError("Invalid locale, locale should be 'LOCAL' or 'INTERNATIONAL'")
-
-            else:
-                locale_cost = {'LOCAL' : local_cost, 'INTERNATIONAL' : intl_cost}
-
-                cost = self.amount / (1 - locale_cost[locale])
-
-                if cost > 250000:
-                    cost = (self.amount + 100)/ (1 - locale_cost[locale])
-
-                paystack_charge = locale_cost[locale] * cost
-                #Paystack_charge is capped at N2000
-                if paystack_charge > 200000:
-                    cost = self.amount + 200000
+            if locale == 'LOCAL':
+                return transaction_cost(self.amount, local_cost)
+            if locale == 'INTERNATIONAL':
+                return transaction_cost(self.amount, intl_cost)
 
-                return math.ceil(cost)
+            raise ValueError("Invalid locale, locale should be 'LOCAL' or 'INTERNATIONAL'")
 
         else:
             raise AttributeError("Amount not set")
@@ -1,38 +1,51 @@
 '''
 transfers.py
 '''
-from forex_python.converter import CurrencyCodes
 from .base import Base
+from ..lazy import LazyModule
+from .currencies import is_valid_currency
+from .validation import parse_amount
+
+uuid = LazyModule('uuid')
 
 class Transfer(Base):
     '''
     Transfer class
     '''
-    source = None
-    amount = None
-    currency = None
-    reason = None
-    recipient = None
-    status = None
-    id = None
-    transfer_code = None
-    otp = None
+    _defaults = {
+        'source' : None,
+        'amount' : None,
+        'currency' : None,
+        'reason' : None,
+        'recipient' : None,
+        'status' : None,
+        'id' : None,
+        'transfer_code' : None,
+        'otp' : None,
+        'reference' : None,
+    }
+    __slots__ = tuple(_defaults) + ('_extra',)
 
-    def __init__(self, amount, recipient, source = 'balance', reason='', currency='NGN'):
+    def __init__(self, amount, recipient, source = 'balance', reason='', currency='NGN',
+                 reference=None, trusted=False):
         super().__init__()
-        try:
-            amount = int(amount)
-        except ValueError:
-            raise ValueError("Invalid amount. Amount(in kobo) should be an integer")
-
-        if not CurrencyCodes().get_symbol(currency.upper()):
-            raise ValueError("Invalid currency supplied")
+        if not trusted:
+            amount = parse_amount(amount)
+            if not is_valid_currency(currency):
+                raise ValueError("Invalid currency supplied")
 
         self.source = source
         self.amount = amount
         self.recipient = recipient
         self.reason = reason
         self.currency = currency
+        self.reference = reference
+
+    def generate_reference_code(self):
+        '''
+        Generates a unique transfer reference code
+        '''
+        return uuid.uuid4()
 
     def __str__(self):
         value = "Transfer of %s %s from %s to %s %s" % (self.amount, self.currency,
@@ -0,0 +1,57 @@
+'''
+validation.py
+Validators used when models are constructed and requests are built.
+
+Emails are checked with precompiled patterns equivalent to validators.email for
+ASCII addresses; other addresses are passed to the validators package.
+URLs are checked with validators.url and the results are memoized, since the
+same callback url is usually validated on every call.
+'''
+import re
+from functools import lru_cache
+
+from ..lazy import LazyModule
+
+validators = LazyModule('validators')
+
+EMAIL_USER = re.compile(
+    r"(^[0-9a-z!#$%&'*+/=?^_`{}|~\-]+(\.[0-9a-z!#$%&'*+/=?^_`{}|~\-]+)*$"
+    r'|^"([\001-\010\013\014\016-\037!#-\[\]-\177]|\\[\011.])*"$)',
+    re.IGNORECASE)
+
+EMAIL_DOMAIN = re.compile(
+    r'^(?:[a-z0-9](?:[a-z0-9-]{0,61}[a-z0-9])?\.)+[a-z0-9][a-z0-9-]{0,61}[a-z]$',
+    re.IGNORECASE)
+
+
+def is_valid_email(value):
+    '''
+    Returns True if value is a valid email address
+    '''
+    if not value or not isinstance(value, str) or value.count('@') != 1:
+        return False
+    if not value.isascii():
+        return bool(validators.email(value))
+
+    user, domain = value.split('@')
+    if len(user) > 64 or len(domain) > 253:
+        return False
+    return EMAIL_USER.match(user) is not None and EMAIL_DOMAIN.match(domain) is not None
+
+
+@lru_cache(maxsize=1024)
+def is_valid_url(value):
+    '''
+    Returns True if value is a valid url. Results are memoized.
+    '''
+    return bool(validators.url(value))
+
+
+def parse_amount(amount):
+    '''
+    Returns amount (in kobo) as an int, or raises ValueError
+    '''
+    try:
+        return int(amount)
+    except ValueError:
+        raise ValueError("Invalid amount. Amount(in kobo) should be an integer")
@@ -5,20 +5,80 @@ Contains PaystackConfig class
 
 import os
 
-class PaystackConfig():
+
+class EnvironmentSetting():
     '''
-    PaystackConfig class.
+    Setting that falls back to an environment variable, read when the setting
+    is first used rather than when the module is imported
     '''
-    PAYSTACK_URL = "https://api.paystack.co"
 
-    SECRET_KEY = os.environ['PAYSTACK_SECRET_KEY']
+    def __init__(self, variable):
+        self.variable = variable
+        self.name = None
+
+    def __set_name__(self, owner, name):
+        self.name = '_' + name
+
+    def __get__(self, cls, owner=None):
+        value = getattr(cls, self.name, None)
+        if value is None:
+            return os.environ.get(self.variable)
+        return value
+
+    def __set__(self, cls, value):
+        setattr(cls, self.name, value)
+
+
+class PaystackConfigType(type):
+    '''
+    Metaclass holding the settings read from the environment
+    '''
+    SECRET_KEY = EnvironmentSetting('PAYSTACK_SECRET_KEY')
+    PUBLIC_KEY = EnvironmentSetting('PAYSTACK_PUBLIC_KEY')
+
 
-    PUBLIC_KEY = os.environ['PAYSTACK_PUBLIC_KEY']
+class PaystackConfig(metaclass=PaystackConfigType):
+    '''
+    PaystackConfig class.
+
+    SECRET_KEY and PUBLIC_KEY default to the PAYSTACK_SECRET_KEY and
+    PAYSTACK_PUBLIC_KEY environment variables.
+    '''
+    PAYSTACK_URL = "https://api.paystack.co"
 
     PASS_ON_TRANSACTION_COST = True
 
     LOCAL_COST = 0.015
     INTL_COST = 0.039
 
+    #HTTP connection pool settings shared by every Manager
+    POOL_CONNECTIONS = 10
+    POOL_MAXSIZE = 10
+    POOL_BLOCK = False
+    #Seconds to wait for a connection and for a response, respectively
+    TIMEOUT = (5, 30)
+
+    #Requests per second allowed across every Manager in the process, None to disable
+    RATE_LIMIT = None
+    RATE_LIMIT_BURST = None
+    #Retries with jittered exponential backoff for throttled and failed requests
+    MAX_RETRIES = 3
+    RETRY_BACKOFF = 0.5
+    RETRY_BACKOFF_MAX = 30
+    RETRY_STATUSES = (429, 500, 502, 503, 504)
+
+    #Seconds Utils lookups are cached for, 0 disables caching of a lookup
+    CACHE_TTLS = {
+        'banks' : 24 * 60 * 60,
+        'card_bin' : 7 * 24 * 60 * 60,
+        'account_number' : 60 * 60,
+    }
+    CACHE_MAXSIZE = 4096
+    #Transactions in a terminal status kept by the verification cache
+    VERIFICATION_CACHE_MAXSIZE = 10000
+
+    #JSON library for request and response bodies: 'auto', 'orjson', 'ujson' or 'json'
+    JSON_CODEC = 'auto'
+
     def __new__(cls):
         raise TypeError("Can not make instance of class")
@@ -0,0 +1,133 @@
+'''
+pipeline.py
+Stages of the request pipeline every manager request goes through.
+
+Manager.execute runs a Call through the manager's request_stages, sends it with
+Manager.request (rate limiting, retries, instrumentation), then runs it through
+the response_stages. A stage is any callable taking (manager, call); add one by
+extending the tuples, e.g
+
+    manager.request_stages = manager.request_stages + (compress_body,)
+'''
+from .objects.errors import APIConnectionFailedError
+
+
+class Call():
+    '''
+    A single API call as it moves through the pipeline
+
+    Attributes:
+    method : HTTP method
+    url : Full request url
+    data : Request data before serialization, or None
+    params : Query parameters, or None
+    bind : Callable the response data is passed through, e.g a model's from_dict
+    raw : Return the whole decoded response instead of its data
+    check : Raise APIConnectionFailedError when the response status is false
+    idempotent : The request is safe to retry whatever its method
+    headers : Request headers, a dict stages may change. The auth stage shares the
+              manager's read only headers, which are only copied if a stage uses headers.
+    body : Serialized request body
+    response : Transport response
+    content : Decoded response body
+    result : Value returned by Manager.execute
+    '''
+
+    __slots__ = ('method', 'url', 'data', 'params', 'bind', 'raw', 'check', 'idempotent',
+                 'shared_headers', '_headers', 'body', 'response', 'content', 'result')
+
+    def __init__(self, method, url, data=None, params=None, bind=None, raw=False, check=True,
+                 idempotent=False):
+        self.method = method
+        self.url = url
+        self.data = data
+        self.params = params
+        self.bind = bind
+        self.raw = raw
+        self.check = check
+        self.idempotent = idempotent
+        #Read only headers sent as they are unless a stage asks for headers
+        self.shared_headers = None
+        self._headers = None
+        self.body = None
+        self.response = None
+        self.content = None
+        self.result = None
+
+    @property
+    def headers(self):
+        if self._headers is None:
+            self._headers = dict(self.shared_headers) if self.shared_headers else {}
+        return self._headers
+
+    @headers.setter
+    def headers(self, headers):
+        self._headers = headers
+
+    def request_kwargs(self):
+        '''
+        Returns the keyword arguments for Manager.request
+        '''
+        headers = self._headers if self._headers is not None else self.shared_headers
+        kwargs = {'headers' : headers if headers is not None else {}}
+        if self.body is not None:
+            kwargs['data'] = self.body
+        if self.params:
+            kwargs['params'] = self.params
+        return kwargs
+
+
+def authenticate(manager, call):
+    '''
+    Sets the authorization and content headers
+    '''
+    if call._headers is None:
+        call.shared_headers = manager.headers
+    else:
+        call._headers.update(manager.headers)
+
+
+def serialize(manager, call):
+    '''
+    Encodes the request data as json with the manager's codec.
+    Strings and bytes are sent as they are.
+    '''
+    if call.data is None:
+        return
+    if isinstance(call.data, (str, bytes)):
+        call.body = call.data
+    else:
+        call.body = manager.codec.dumps(call.data)
+
+
+def decode(manager, call):
+    '''
+    Decodes the json response body
+    '''
+    call.content = manager.parse_response_content(call.response.content)
+
+
+def map_errors(manager, call):
+    '''
+    Raises APIConnectionFailedError with paystack's message when the response status is false
+    '''
+    if not call.check:
+        return
+    status, message = manager.get_content_status(call.content)
+    if not status:
+        raise APIConnectionFailedError(message)
+
+
+def bind_model(manager, call):
+    '''
+    Sets the call result to the response data, passed through call.bind if given
+    '''
+    if call.raw:
+        call.result = call.content
+        return
+    data = call.content.get('data')
+    call.result = call.bind(data) if call.bind is not None else data
+
+
+REQUEST_STAGES = (authenticate, serialize)
+RESPONSE_STAGES = (decode, map_errors, bind_model)
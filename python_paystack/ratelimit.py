@@ -0,0 +1,169 @@
+'''
+ratelimit.py
+Client-side rate limiting for requests sent to the Paystack API
+'''
+import random
+import threading
+import time
+
+from .lazy import LazyModule
+from .paystack_config import PaystackConfig
+
+email_utils = LazyModule('email.utils')
+
+_limiter_lock = threading.Lock()
+_shared_limiter = None
+
+
+class RateLimiter():
+    '''
+    Thread-safe token bucket.
+
+    Attributes:
+    rate : Tokens added per second
+    capacity : Maximum number of tokens, i.e the largest burst allowed
+    '''
+
+    def __init__(self, rate, capacity=None):
+        if rate <= 0:
+            raise ValueError("rate should be greater than 0")
+
+        self.rate = float(rate)
+        self.capacity = float(capacity or max(rate, 1))
+        self._tokens = self.capacity
+        self._updated = time.monotonic()
+        self._lock = threading.Lock()
+
+    def _refill(self, now):
+        elapsed = now - self._updated
+        if elapsed > 0:
+            self._tokens = min(self.capacity, self._tokens + elapsed * self.rate)
+            self._updated = now
+
+    def try_acquire(self, tokens=1):
+        '''
+        Takes tokens if they are available and returns 0,
+        otherwise returns the number of seconds to wait for them
+        '''
+        with self._lock:
+            self._refill(time.monotonic())
+            if self._tokens >= tokens:
+                self._tokens -= tokens
+                return 0
+            return (tokens - self._tokens) / self.rate
+
+    def pause(self, seconds):
+        '''
+        Withholds tokens for the given number of seconds, e.g when the API asks
+        every caller sharing this limiter to back off
+        '''
+        with self._lock:
+            self._refill(time.monotonic())
+            self._tokens = min(self._tokens, -seconds * self.rate)
+
+    def acquire(self, tokens=1):
+        '''
+        Blocks until tokens are available and takes them
+        '''
+        while True:
+            delay = self.try_acquire(tokens)
+            if not delay:
+                return
+            time.sleep(delay)
+
+
+def get_rate_limiter():
+    '''
+    Returns the process wide RateLimiter built from PaystackConfig.RATE_LIMIT,
+    or None if rate limiting is disabled
+    '''
+    global _shared_limiter
+    if _shared_limiter is None and PaystackConfig.RATE_LIMIT:
+        with _limiter_lock:
+            if _shared_limiter is None:
+                _shared_limiter = RateLimiter(PaystackConfig.RATE_LIMIT,
+                                              PaystackConfig.RATE_LIMIT_BURST)
+    return _shared_limiter
+
+
+def set_rate_limiter(limiter):
+    '''
+    Replaces the process wide RateLimiter. Pass None to rebuild it from PaystackConfig on next use.
+    '''
+    global _shared_limiter
+    with _limiter_lock:
+        _shared_limiter = limiter
+
+
+class RetryPolicy():
+    '''
+    Decides which failed requests are retried and how long to wait between attempts.
+
+    429 responses mean paystack throttled the request without processing it, so they
+    are retried for every method. Other retry statuses, including 503 which a gateway
+    may return after paystack applied the request, and connection errors are only
+    retried for idempotent requests, since a POST may already have been applied.
+
+    Attributes:
+    max_retries : Number of retries after the first attempt
+    backoff : Base delay in seconds, doubled on every attempt
+    max_backoff : Upper bound for a single delay
+    statuses : HTTP status codes that may be retried
+    '''
+
+    SAFE_STATUSES = (429,)
+    IDEMPOTENT_METHODS = ('GET', 'HEAD', 'OPTIONS', 'PUT', 'DELETE')
+
+    def __init__(self, max_retries=None, backoff=None, max_backoff=None, statuses=None):
+        self.max_retries = PaystackConfig.MAX_RETRIES if max_retries is None else max_retries
+        self.backoff = PaystackConfig.RETRY_BACKOFF if backoff is None else backoff
+        self.max_backoff = PaystackConfig.RETRY_BACKOFF_MAX if max_backoff is None else max_backoff
+        self.statuses = frozenset(PaystackConfig.RETRY_STATUSES if statuses is None else statuses)
+
+    def should_retry(self, method, status_code, attempt, idempotent=False):
+        '''
+        Returns True if another attempt should be made
+
+        Arguments:
+        method : HTTP method of the request
+        status_code : Response status code, or None if the connection failed
+        attempt : Number of retries already made
+        idempotent : The request is safe to repeat whatever its method,
+                     e.g a POST carrying a client generated transaction reference
+        '''
+        if attempt >= self.max_retries:
+            return False
+        idempotent = idempotent or method.upper() in self.IDEMPOTENT_METHODS
+        if status_code is None:
+            return idempotent
+        if status_code not in self.statuses:
+            return False
+        return status_code in self.SAFE_STATUSES or idempotent
+
+    def delay(self, attempt, retry_after=None):
+        '''
+        Returns the number of seconds to wait before the next attempt.
+        Uses the Retry-After header when the API sends one, otherwise
+        exponential backoff with full jitter.
+        '''
+        if retry_after:
+            seconds = parse_retry_after(retry_after)
+            if seconds is not None:
+                return min(seconds, self.max_backoff)
+        return random.uniform(0, min(self.max_backoff, self.backoff * (2 ** attempt)))
+
+
+def parse_retry_after(value):
+    '''
+    Returns the number of seconds in a Retry-After header (delay-seconds or HTTP-date),
+    or None if it can not be parsed
+    '''
+    try:
+        return max(0.0, float(value))
+    except (TypeError, ValueError):
+        pass
+    try:
+        retry_at = email_utils.parsedate_to_datetime(value)
+    except (TypeError, ValueError):
+        return None
+    return max(0.0, retry_at.timestamp() - time.time())
@@ -0,0 +1,481 @@
+'''
+simulator.py
+Local stand-in for the Paystack API, for load testing and benchmarks.
+
+PaystackSimulator keeps customers, plans, subaccounts, transfers and transactions
+in memory and answers the endpoints used by the managers. Use it in-process:
+
+    simulator = PaystackSimulator(latency=0.005)
+    transaction_manager = TransactionsManager(session=SimulatorSession(simulator))
+
+or over HTTP:
+
+    server = serve(simulator)
+    PaystackConfig.PAYSTACK_URL = server.url
+'''
+import json
+import random
+import re
+import threading
+import time
+from datetime import datetime, timezone
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from urllib.parse import parse_qsl, urlsplit
+
+from .paystack_config import PaystackConfig
+
+BANKS = [
+    {'id' : 1, 'name' : 'Access Bank', 'slug' : 'access-bank', 'code' : '044'},
+    {'id' : 2, 'name' : 'First Bank of Nigeria', 'slug' : 'first-bank-of-nigeria',
+     'code' : '011'},
+    {'id' : 3, 'name' : 'Guaranty Trust Bank', 'slug' : 'guaranty-trust-bank', 'code' : '058'},
+    {'id' : 4, 'name' : 'United Bank For Africa', 'slug' : 'united-bank-for-africa', 'code' : '033'},
+    {'id' : 5, 'name' : 'Zenith Bank', 'slug' : 'zenith-bank', 'code' : '057'},
+]
+
+#Prefix of the code generated for each resource, and the field it is stored in
+RESOURCE_CODES = {
+    'customer' : ('CUS_', 'customer_code'),
+    'plan' : ('PLN_', 'plan_code'),
+    'subaccount' : ('ACCT_', 'subaccount_code'),
+    'transfer' : ('TRF_', 'transfer_code'),
+}
+
+
+class SimulatedResponse():
+    '''
+    Response returned by the simulator, with the attributes managers read
+    from a requests.Response
+    '''
+
+    def __init__(self, status_code, content, headers=None):
+        self.status_code = status_code
+        self.content = content
+        self.headers = headers or {}
+
+    def json(self):
+        return json.loads(self.content)
+
+
+class _Fail(Exception):
+    def __init__(self, status_code, message):
+        super().__init__(message)
+        self.status_code = status_code
+        self.message = message
+
+
+def _now():
+    return datetime.now(timezone.utc).strftime('%Y-%m-%dT%H:%M:%S.%f')[:-3] + 'Z'
+
+
+class PaystackSimulator():
+    '''
+    In-memory Paystack API
+
+    Arguments:
+    latency : Seconds added to every response, or a (low, high) range to draw from
+    error_rate : Fraction of requests answered with HTTP 500
+    throttle_rate : Fraction of requests answered with HTTP 429
+    retry_after : Retry-After header sent with 429 responses
+    secret_key : Key requests must be authorized with, None accepts any key
+    seed : Seed for the error and latency draws
+    '''
+
+    def __init__(self, latency=0, error_rate=0, throttle_rate=0, retry_after=1,
+                 secret_key=None, seed=None):
+        self.latency = latency
+        self.error_rate = error_rate
+        self.throttle_rate = throttle_rate
+        self.retry_after = retry_after
+        self.secret_key = secret_key
+        self.requests = 0
+        self._random = random.Random(seed)
+        self._lock = threading.RLock()
+        self._ids = 0
+        self._resources = {name : {} for name in ('transaction', 'customer', 'plan',
+                                                  'subaccount', 'transfer')}
+        self._references = {}
+        routes = (
+            ('GET', '/bank', self._list_banks),
+            ('GET', '/bank/resolve', self._resolve_account_number),
+            ('GET', '/bank/resolve_bvn/(?P<bvn>[^/]+)', self._resolve_bvn),
+            ('GET', '/decision/bin/(?P<card_bin>[^/]+)', self._resolve_card_bin),
+            ('POST', '/transaction/initialize', self._initialize_transaction),
+            ('GET', '/transaction/verify/(?P<reference>[^/]+)', self._verify_transaction),
+            ('POST', '/transaction/charge_authorization', self._charge_authorization),
+            ('GET', '/transaction/totals', self._transaction_totals),
+            ('POST', '/customer/set_risk_action', self._set_risk_action),
+            ('POST', '/customer/deactivate_authorization', self._deactivate_authorization),
+            ('POST', '/transfer/finalize_transfer', self._finalize_transfer),
+            ('POST', '/transfer/bulk', self._bulk_transfer),
+            ('POST', '/(?P<resource>customer|plan|subaccount|transfer)', self._create),
+            ('GET', '/(?P<resource>transaction|customer|plan|subaccount|transfer)', self._list),
+            ('GET', '/(?P<resource>transaction|customer|plan|subaccount|transfer)/(?P<key>[^/]+)',
+             self._get),
+            ('PUT', '/(?P<resource>customer|plan|subaccount|transfer)/(?P<key>[^/]+)',
+             self._update),
+        )
+        self._routes = [(method, re.compile('^%s$' % pattern), handler)
+                        for method, pattern, handler in routes]
+
+    def handle(self, method, url, headers=None, body=None, params=None):
+        '''
+        Answers a request and returns a SimulatedResponse
+
+        Arguments:
+        method : HTTP method
+        url : Full request url, any host
+        headers : Request headers
+        body : Request body as json bytes or str
+        params : Query parameters, merged with those in url
+        '''
+        with self._lock:
+            self.requests += 1
+            latency = self.latency
+            if isinstance(latency, tuple):
+                latency = self._random.uniform(*latency)
+            draw = self._random.random()
+
+        if latency:
+            time.sleep(latency)
+
+        if draw < self.throttle_rate:
+            return self._response(429, {'status' : False, 'message' : 'Too many requests'},
+                                  {'Retry-After' : str(self.retry_after)})
+        if draw < self.throttle_rate + self.error_rate:
+            return self._response(500, {'status' : False, 'message' : 'Internal server error'})
+
+        if self.secret_key is not None:
+            authorization = (headers or {}).get('Authorization', '')
+            if authorization != 'Bearer %s' % self.secret_key:
+                return self._response(401, {'status' : False, 'message' : 'Invalid key'})
+
+        parts = urlsplit(url)
+        query = dict(parse_qsl(parts.query))
+        query.update(params or {})
+        path = '/' + parts.path.strip('/')
+
+        try:
+            data = json.loads(body) if body else {}
+        except ValueError:
+            return self._response(400, {'status' : False, 'message' : 'Invalid JSON'})
+
+        for route_method, pattern, handler in self._routes:
+            match = pattern.match(path)
+            if route_method == method.upper() and match:
+                try:
+                    #Encoded under the lock, as the data may be changed by other requests
+                    with self._lock:
+                        return self._response(200, handler(data=data, query=query,
+                                                           **match.groupdict()))
+                except _Fail as error:
+                    return self._response(error.status_code,
+                                          {'status' : False, 'message' : error.message})
+
+        return self._response(404, {'status' : False, 'message' : 'Not found'})
+
+    def _response(self, status_code, content, headers=None):
+        return SimulatedResponse(status_code, json.dumps(content).encode(), headers)
+
+    def _next_id(self):
+        self._ids += 1
+        return self._ids
+
+    def _ok(self, data, message='Success', meta=None):
+        content = {'status' : True, 'message' : message, 'data' : data}
+        if meta is not None:
+            content['meta'] = meta
+        return content
+
+    def _find(self, resource, key):
+        items = self._resources[resource]
+        if str(key).isdigit() and int(key) in items:
+            return items[int(key)]
+        field = RESOURCE_CODES.get(resource, (None, 'reference'))[1]
+        for item in items.values():
+            if str(item.get(field)) == str(key) or item.get('email') == key:
+                return item
+        raise _Fail(404, '%s not found' % resource.capitalize())
+
+    def _add(self, resource, item):
+        item['id'] = self._next_id()
+        item.setdefault('createdAt', _now())
+        if resource in RESOURCE_CODES:
+            prefix, field = RESOURCE_CODES[resource]
+            item.setdefault(field, '%s%010d' % (prefix, item['id']))
+        self._resources[resource][item['id']] = item
+        return item
+
+    def _customer(self, email):
+        for customer in self._resources['customer'].values():
+            if customer.get('email') == email:
+                return customer
+        return self._add('customer', {'email' : email, 'risk_action' : 'default'})
+
+    def add_transactions(self, count, amount=(100, 1000000),
+                         statuses=('success', 'failed', 'abandoned'), currency='NGN'):
+        '''
+        Adds count random transactions, e.g to benchmark listing large histories
+        '''
+        with self._lock:
+            for _ in range(count):
+                self._add_transaction({
+                    'amount' : self._random.randint(*amount),
+                    'email' : 'customer%d@example.com' % self._random.randint(1, 1000),
+                    'currency' : currency,
+                }, self._random.choice(statuses))
+
+    def _add_transaction(self, data, status):
+        reference = data.get('reference') or 'SIM_%d' % (self._ids + 1)
+        if reference in self._references:
+            raise _Fail(400, 'Duplicate Transaction Reference')
+        if not data.get('amount') or not data.get('email'):
+            raise _Fail(400, 'Amount and email are required')
+
+        customer = self._customer(data['email'])
+        code = data.get('authorization_code') or 'AUTH_%d' % (self._ids + 1)
+        transaction = self._add('transaction', {
+            'reference' : reference,
+            'amount' : int(data['amount']),
+            'currency' : data.get('currency') or 'NGN',
+            'status' : status,
+            'gateway_response' : 'Approved' if status == 'success' else status.capitalize(),
+            'channel' : 'card',
+            'fees' : int(int(data['amount']) * PaystackConfig.LOCAL_COST),
+            'metadata' : data.get('metadata'),
+            'paid_at' : _now() if status == 'success' else None,
+            'customer' : {'id' : customer['id'], 'email' : customer['email'],
+                          'customer_code' : customer['customer_code']},
+            'authorization' : {'authorization_code' : code, 'bin' : '408408', 'last4' : '4081',
+                               'card_type' : 'visa', 'reusable' : True},
+        })
+        transaction['created_at'] = transaction['createdAt']
+        self._references[reference] = transaction
+        return transaction
+
+    def _paginate(self, items, query):
+        page = max(1, int(query.get('page', 1)))
+        per_page = max(1, int(query.get('perPage', 50)))
+        start = (page - 1) * per_page
+        meta = {'total' : len(items), 'skipped' : start, 'perPage' : per_page, 'page' : page,
+                'pageCount' : max(1, -(-len(items) // per_page))}
+        return self._ok(items[start:start + per_page], 'Records retrieved', meta)
+
+    #Endpoints
+
+    def _list_banks(self, data, query):
+        return self._ok(BANKS, 'Banks retrieved')
+
+    def _resolve_account_number(self, data, query):
+        account_number = query.get('account_number', '')
+        if len(account_number) != 10 or not account_number.isdigit():
+            raise _Fail(422, 'Could not resolve account name')
+        return self._ok({'account_number' : account_number,
+                         'account_name' : 'ACCOUNT %s' % account_number[-4:], 'bank_id' : 1},
+                        'Account number resolved')
+
+    def _resolve_bvn(self, data, query, bvn):
+        return self._ok({'bvn' : bvn, 'first_name' : 'JOHN', 'last_name' : 'DOE',
+                         'formatted_dob' : '1990-01-01', 'mobile' : '08000000000'},
+                        'BVN resolved')
+
+    def _resolve_card_bin(self, data, query, card_bin):
+        return self._ok({'bin' : card_bin[:6], 'brand' : 'Visa', 'card_type' : 'DEBIT',
+                         'bank' : 'Test Bank', 'country_code' : 'NG', 'linked_bank_id' : 1})
+
+    def _initialize_transaction(self, data, query):
+        transaction = self._add_transaction(data, 'abandoned')
+        transaction['access_code'] = 'ACCESS_%d' % transaction['id']
+        return self._ok({'authorization_url' : 'https://checkout.paystack.com/%s'
+                                               % transaction['access_code'],
+                         'access_code' : transaction['access_code'],
+                         'reference' : transaction['reference']}, 'Authorization URL created')
+
+    def _verify_transaction(self, data, query, reference):
+        transaction = self._references.get(reference)
+        if transaction is None:
+            raise _Fail(400, 'Transaction reference not found')
+        return self._ok(transaction, 'Verification successful')
+
+    def _charge_authorization(self, data, query):
+        if not data.get('authorization_code'):
+            raise _Fail(400, 'Authorization code is required')
+        return self._ok(self._add_transaction(data, 'success'), 'Charge attempted')
+
+    def _transaction_totals(self, data, query):
+        transactions = [item for item in self._resources['transaction'].values()
+                        if item['status'] == 'success']
+        volumes = {}
+        for transaction in transactions:
+            currency = transaction['currency']
+            volumes[currency] = volumes.get(currency, 0) + transaction['amount']
+        return self._ok({
+            'total_transactions' : len(transactions),
+            'unique_customers' : len({item['customer']['id'] for item in transactions}),
+            'total_volume' : sum(volumes.values()),
+            'total_volume_by_currency' : [{'currency' : currency, 'amount' : amount}
+                                          for currency, amount in sorted(volumes.items())],
+        })
+
+    def _set_risk_action(self, data, query):
+        customer = self._find('customer', data.get('customer'))
+        customer['risk_action'] = data.get('risk_action')
+        return self._ok(customer, 'Customer updated')
+
+    def _deactivate_authorization(self, data, query):
+        return self._ok(None, 'Authorization has been deactivated')
+
+    def _finalize_transfer(self, data, query):
+        transfer = self._find('transfer', data.get('transfer_code'))
+        if not data.get('otp'):
+            raise _Fail(400, 'OTP is required')
+        transfer['status'] = 'success'
+        return self._ok(transfer, 'Transfer has been queued')
+
+    def _check_transfer_references(self, items):
+        used = {transfer.get('reference') for transfer in self._resources['transfer'].values()}
+        references = [item.get('reference') for item in items if item.get('reference')]
+        if len(set(references)) != len(references) or used.intersection(references):
+            raise _Fail(400, 'Duplicate Transfer Reference')
+
+    def _bulk_transfer(self, data, query):
+        results = []
+        self._check_transfer_references(data.get('transfers') or [])
+        for item in data.get('transfers') or []:
+            transfer = dict(item, currency=data.get('currency'), source=data.get('source'),
+                            status='pending')
+            results.append(self._add('transfer', transfer))
+        return self._ok(results, '%d transfers queued' % len(results))
+
+    def _create(self, data, query, resource):
+        item = dict(data)
+        if resource == 'customer':
+            if not item.get('email'):
+                raise _Fail(400, 'Email is required')
+            item.setdefault('risk_action', 'default')
+        if resource == 'transfer':
+            self._check_transfer_references([item])
+            item.setdefault('status', 'otp')
+        return self._ok(self._add(resource, item), '%s created' % resource.capitalize())
+
+    def _list(self, data, query, resource):
+        items = list(self._resources[resource].values())
+        items.reverse()
+        if query.get('status'):
+            items = [item for item in items if item.get('status') == query['status']]
+        if query.get('from'):
+            items = [item for item in items if item['createdAt'] >= query['from']]
+        if query.get('to'):
+            items = [item for item in items if item['createdAt'] < query['to']]
+        return self._paginate(items, query)
+
+    def _get(self, data, query, resource, key):
+        return self._ok(self._find(resource, key), '%s retrieved' % resource.capitalize())
+
+    def _update(self, data, query, resource, key):
+        item = self._find(resource, key)
+        item.update((name, value) for name, value in data.items() if name != 'id')
+        return self._ok(item, '%s updated' % resource.capitalize())
+
+
+class SimulatorSession():
+    '''
+    Drop-in replacement for requests.Session that answers from a PaystackSimulator
+    without any network traffic. Pass it as a manager's session.
+    '''
+
+    def __init__(self, simulator):
+        self.simulator = simulator
+
+    def request(self, method, url, headers=None, data=None, params=None, **kwargs):
+        return self.simulator.handle(method, url, headers, data, params)
+
+    def close(self):
+        pass
+
+
+class _Handler(BaseHTTPRequestHandler):
+    protocol_version = 'HTTP/1.1'
+    #Headers and body are written separately, so Nagle's algorithm would delay the body
+    disable_nagle_algorithm = True
+
+    def _handle(self):
+        length = int(self.headers.get('Content-Length') or 0)
+        body = self.rfile.read(length) if length else None
+        response = self.server.simulator.handle(self.command, self.path, self.headers, body)
+
+        self.send_response(response.status_code)
+        self.send_header('Content-Type', 'application/json')
+        self.send_header('Content-Length', str(len(response.content)))
+        for name, value in response.headers.items():
+            self.send_header(name, value)
+        self.end_headers()
+        self.wfile.write(response.content)
+
+    do_GET = do_POST = do_PUT = do_DELETE = _handle
+
+    def log_message(self, format, *args):
+        pass
+
+
+class SimulatorServer(ThreadingHTTPServer):
+    '''
+    HTTP server answering from a PaystackSimulator, see serve()
+    '''
+    daemon_threads = True
+
+    def __init__(self, simulator, address):
+        super().__init__(address, _Handler)
+        self.simulator = simulator
+
+    @property
+    def url(self):
+        host, port = self.server_address[:2]
+        return 'http://%s:%s' % (host, port)
+
+
+def serve(simulator, host='127.0.0.1', port=0):
+    '''
+    Serves simulator over HTTP from a background thread and returns the SimulatorServer.
+    Point managers at it with PaystackConfig.PAYSTACK_URL = server.url and
+    stop it with server.shutdown().
+
+    Arguments:
+    port : Port to listen on, 0 picks a free one
+    '''
+    server = SimulatorServer(simulator, (host, port))
+    thread = threading.Thread(target=server.serve_forever, daemon=True)
+    thread.start()
+    return server
+
+
+def main():
+    '''
+    Runs the simulator as a standalone server, e.g
+    python -m python_paystack.simulator --port 8000 --latency 0.01
+    '''
+    import argparse
+
+    parser = argparse.ArgumentParser(description='Local Paystack API simulator')
+    parser.add_argument('--host', default='127.0.0.1')
+    parser.add_argument('--port', type=int, default=8000)
+    parser.add_argument('--latency', type=float, default=0.0)
+    parser.add_argument('--error-rate', type=float, default=0.0)
+    parser.add_argument('--throttle-rate', type=float, default=0.0)
+    parser.add_argument('--transactions', type=int, default=0,
+                        help='number of random transactions to start with')
+    args = parser.parse_args()
+
+    simulator = PaystackSimulator(latency=args.latency, error_rate=args.error_rate,
+                                  throttle_rate=args.throttle_rate)
+    simulator.add_transactions(args.transactions)
+    server = SimulatorServer(simulator, (args.host, args.port))
+    print('Paystack simulator listening on %s' % server.url)
+    try:
+        server.serve_forever()
+    except KeyboardInterrupt:
+        server.server_close()
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,71 @@
+'''
+transport.py
+Pooled, keep-alive HTTP session shared by the Manager classes
+'''
+import threading
+
+from .lazy import LazyModule
+from .paystack_config import PaystackConfig
+
+requests = LazyModule('requests')
+adapters = LazyModule('requests.adapters')
+
+_session_lock = threading.Lock()
+_shared_session = None
+
+
+def build_session(pool_connections=None, pool_maxsize=None, pool_block=None):
+    '''
+    Returns a requests.Session backed by a connection pool.
+    Settings that are not supplied are taken from PaystackConfig.
+
+    Arguments:
+    pool_connections : Number of host pools to keep
+    pool_maxsize : Maximum number of connections kept alive per host
+    pool_block : Block when the pool is exhausted instead of opening extra connections
+    '''
+    if pool_connections is None:
+        pool_connections = PaystackConfig.POOL_CONNECTIONS
+    if pool_maxsize is None:
+        pool_maxsize = PaystackConfig.POOL_MAXSIZE
+    if pool_block is None:
+        pool_block = PaystackConfig.POOL_BLOCK
+
+    adapter = adapters.HTTPAdapter(pool_connections=pool_connections,
+                                   pool_maxsize=pool_maxsize, pool_block=pool_block)
+    session = requests.Session()
+    session.mount('https://', adapter)
+    session.mount('http://', adapter)
+    session.headers['Connection'] = 'keep-alive'
+    return session
+
+
+def get_session():
+    '''
+    Returns the process wide session, creating it on first use
+    '''
+    global _shared_session
+    if _shared_session is None:
+        with _session_lock:
+            if _shared_session is None:
+                _shared_session = build_session()
+    return _shared_session
+
+
+def set_session(session):
+    '''
+    Replaces the process wide session, e.g. with one pointed at a local stub server.
+    The previous session is closed.
+    '''
+    global _shared_session
+    with _session_lock:
+        previous, _shared_session = _shared_session, session
+    if previous is not None and previous is not session:
+        previous.close()
+
+
+def close_session():
+    '''
+    Closes the process wide session and releases its pooled connections
+    '''
+    set_session(None)
@@ -0,0 +1,291 @@
+'''
+webhooks.py
+Verification, parsing and dispatch of paystack webhook events
+'''
+import hashlib
+import hmac
+import json
+import queue
+import threading
+from collections import OrderedDict
+
+from .jsoncodec import get_codec
+from .objects.customers import Customer
+from .objects.errors import Error, InvalidSignatureError
+from .objects.transactions import Transaction
+from .objects.transfers import Transfer
+from .paystack_config import PaystackConfig
+
+SIGNATURE_HEADER = 'x-paystack-signature'
+
+#Model each event's data is parsed into, by the event name prefix
+EVENT_MODELS = {
+    'charge' : Transaction,
+    'transfer' : Transfer,
+    'customeridentification' : Customer,
+}
+
+#Fields identifying an event's data, most specific first
+KEY_FIELDS = ('id', 'reference', 'transfer_code', 'invoice_code', 'subscription_code',
+              'request_code', 'customer_code', 'plan_code')
+
+_STOP = object()
+
+
+def compute_signature(payload: bytes, secret_key=None):
+    '''
+    Returns the hex HMAC-SHA512 digest paystack sends for payload
+    '''
+    if secret_key is None:
+        secret_key = PaystackConfig.SECRET_KEY
+    if isinstance(secret_key, str):
+        secret_key = secret_key.encode()
+    return hmac.new(secret_key, payload, hashlib.sha512).hexdigest()
+
+
+def verify_signature(payload: bytes, signature, secret_key=None):
+    '''
+    Returns True if signature is the HMAC-SHA512 of payload.
+    payload must be the raw request body, as re-serialized json will not match.
+    The comparison takes constant time.
+    '''
+    if not signature or not isinstance(payload, (bytes, bytearray)):
+        return False
+    if isinstance(signature, bytes):
+        signature = signature.decode('ascii', 'replace')
+    return hmac.compare_digest(compute_signature(payload, secret_key), signature.lower())
+
+
+class Event():
+    '''
+    A webhook event
+
+    Attributes:
+    event : Event name e.g 'charge.success'
+    data : Raw event data
+    object : data parsed into a Transaction, Transfer or Customer, or None
+             for events without a model
+    '''
+
+    __slots__ = ('event', 'data', 'object')
+
+    def __init__(self, event, data, object=None):
+        self.event = event
+        self.data = data
+        self.object = object
+
+    @property
+    def key(self):
+        '''
+        Identifies the event across repeated deliveries, by the first of KEY_FIELDS
+        in its data or a digest of the data when it has none of them
+        '''
+        data = self.data
+        for field in KEY_FIELDS:
+            identifier = data.get(field)
+            if identifier:
+                return '%s:%s' % (self.event, identifier)
+        encoded = json.dumps(data, sort_keys=True, default=str).encode()
+        return '%s:%s' % (self.event, hashlib.sha256(encoded).hexdigest())
+
+    def __str__(self):
+        return "%s %s" % (self.event, self.key)
+
+
+def parse_event(payload):
+    '''
+    Parses a webhook payload (bytes, str or dict) into an Event
+    '''
+    if not isinstance(payload, dict):
+        payload = get_codec().loads(payload)
+
+    event = payload.get('event')
+    data = payload.get('data') or {}
+    if not event or not isinstance(data, dict):
+        raise ValueError("payload is not a paystack event")
+
+    model = EVENT_MODELS.get(event.split('.', 1)[0])
+    return Event(event, data, model.from_dict(data) if model is not None else None)
+
+
+class SeenSet():
+    '''
+    Thread-safe set of the most recently seen keys, evicting the oldest beyond maxsize
+    '''
+
+    def __init__(self, maxsize=10000):
+        self.maxsize = maxsize
+        self._keys = OrderedDict()
+        self._lock = threading.Lock()
+
+    def add(self, key):
+        '''
+        Adds key and returns True, or returns False if it was already seen
+        '''
+        with self._lock:
+            if key in self._keys:
+                self._keys.move_to_end(key)
+                return False
+            self._keys[key] = None
+            if len(self._keys) > self.maxsize:
+                self._keys.popitem(last=False)
+            return True
+
+    def discard(self, key):
+        '''
+        Forgets key, e.g when the event it identifies could not be processed
+        '''
+        with self._lock:
+            self._keys.pop(key, None)
+
+    def __contains__(self, key):
+        return key in self._keys
+
+    def __len__(self):
+        return len(self._keys)
+
+
+class WebhookProcessor():
+    '''
+    Verifies webhook deliveries and dispatches their events to handlers
+    on a pool of worker threads.
+
+    Events wait in a bounded queue, so a slow handler makes submit block
+    (backpressure) instead of letting memory grow.
+
+    Arguments:
+    secret_key : Key the signatures are checked with, defaults to PaystackConfig.SECRET_KEY
+    workers : Number of worker threads
+    queue_size : Maximum number of events waiting for a worker
+    seen_size : Number of recent event keys kept to drop repeated deliveries
+    batch_size : Maximum number of queued events a worker takes at once
+    error_handler : Called with (event, error) when a handler raises. Errors raised by
+                    error_handler itself are counted in stats['error_handler_failed'].
+    '''
+
+    def __init__(self, secret_key=None, workers=4, queue_size=1000, seen_size=10000,
+                 batch_size=32, error_handler=None):
+        if workers < 1:
+            raise ValueError("workers should be at least 1")
+
+        self.secret_key = secret_key
+        self.batch_size = batch_size
+        self.error_handler = error_handler
+        self.seen = SeenSet(seen_size)
+        self.stats = {'received' : 0, 'duplicates' : 0, 'handled' : 0, 'failed' : 0,
+                      'error_handler_failed' : 0}
+        self._handlers = {}
+        self._queue = queue.Queue(queue_size)
+        self._stats_lock = threading.Lock()
+        self._workers = [threading.Thread(target=self._work, daemon=True)
+                         for _ in range(workers)]
+        for worker in self._workers:
+            worker.start()
+
+    def on(self, event, handler=None):
+        '''
+        Registers handler for event, e.g 'charge.success', or '*' for every event.
+        Can be used as a decorator.
+        '''
+        if handler is None:
+            return lambda handler: self.on(event, handler)
+        self._handlers.setdefault(event, []).append(handler)
+        return handler
+
+    def submit(self, payload: bytes, signature, timeout=None):
+        '''
+        Verifies and queues a webhook delivery.
+        Returns the Event, or None if it is a repeated delivery.
+
+        Arguments:
+        payload : Raw request body
+        signature : Value of the x-paystack-signature header
+        timeout : Seconds to wait for room in the queue, raises queue.Full when exceeded.
+                  None waits indefinitely. An event that was not queued is not
+                  remembered as seen, so paystack's redelivery of it is processed.
+        '''
+        if not verify_signature(payload, signature, self.secret_key):
+            raise InvalidSignatureError
+
+        event = parse_event(payload)
+        with self._stats_lock:
+            self.stats['received'] += 1
+        key = event.key
+        if not self.seen.add(key):
+            with self._stats_lock:
+                self.stats['duplicates'] += 1
+            return None
+
+        try:
+            self._queue.put(event, timeout=timeout)
+        except BaseException:
+            self.seen.discard(key)
+            raise
+        return event
+
+    def dispatch(self, event: Event):
+        '''
+        Calls the handlers of event in the current thread
+        '''
+        handlers = self._handlers.get(event.event, []) + self._handlers.get('*', [])
+        for handler in handlers:
+            try:
+                handler(event)
+            except (Exception, Error) as error:
+                with self._stats_lock:
+                    self.stats['failed'] += 1
+                if self.error_handler is not None:
+                    try:
+                        self.error_handler(event, error)
+                    except (Exception, Error):
+                        with self._stats_lock:
+                            self.stats['error_handler_failed'] += 1
+        with self._stats_lock:
+            self.stats['handled'] += 1
+
+    def _work(self):
+        get = self._queue.get
+        get_nowait = self._queue.get_nowait
+        while True:
+            batch = [get()]
+            try:
+                #A batch ends at a stop marker, so each worker takes exactly one
+                while batch[-1] is not _STOP and len(batch) < self.batch_size:
+                    batch.append(get_nowait())
+            except queue.Empty:
+                pass
+
+            for event in batch:
+                try:
+                    if event is not _STOP:
+                        self.dispatch(event)
+                except (Exception, Error):
+                    #The worker keeps serving the queue whatever dispatch raised
+                    with self._stats_lock:
+                        self.stats['failed'] += 1
+                finally:
+                    self._queue.task_done()
+
+            if batch[-1] is _STOP:
+                return
+
+    def join(self):
+        '''
+        Blocks until every queued event has been handled
+        '''
+        self._queue.join()
+
+    def close(self):
+        '''
+        Handles the queued events and stops the workers
+        '''
+        for _ in self._workers:
+            self._queue.put(_STOP)
+        for worker in self._workers:
+            worker.join()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc_info):
+        self.close()
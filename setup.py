@@ -12,6 +12,10 @@ setup(name='python_paystack',
           'requests',
           'validators',
           'jsonpickle',
-          'forex_python'
-          ]
+          ],
+      extras_require={
+          'async': ['aiohttp'],
+          'analytics': ['numpy'],
+          'fast': ['orjson'],
+          },
      )
@@ -0,0 +1,69 @@
+'''
+Shared fixtures. Tests run against a PaystackSimulator, without network access.
+'''
+import os
+
+import pytest
+
+os.environ.setdefault('PAYSTACK_SECRET_KEY', 'sk_test_suite')
+os.environ.setdefault('PAYSTACK_PUBLIC_KEY', 'pk_test_suite')
+
+from python_paystack.paystack_config import PaystackConfig
+from python_paystack.simulator import PaystackSimulator, SimulatedResponse, SimulatorSession
+
+
+@pytest.fixture(autouse=True)
+def no_backoff(monkeypatch):
+    monkeypatch.setattr(PaystackConfig, 'RETRY_BACKOFF', 0)
+
+
+@pytest.fixture
+def simulator():
+    return PaystackSimulator(retry_after=0, seed=1)
+
+
+@pytest.fixture
+def session(simulator):
+    return SimulatorSession(simulator)
+
+
+class RecordingSession():
+    '''
+    Session answering from a SimulatorSession, recording every request
+    '''
+
+    def __init__(self, session):
+        self.session = session
+        self.calls = []
+
+    def request(self, method, url, **kwargs):
+        self.calls.append((method, url, kwargs))
+        return self.session.request(method, url, **kwargs)
+
+    def close(self):
+        pass
+
+
+@pytest.fixture
+def recording(session):
+    return RecordingSession(session)
+
+
+class LostResponseSession(RecordingSession):
+    '''
+    Applies the first request to path_suffix, then answers it with status_code,
+    as a gateway does when paystack's response is lost
+    '''
+
+    def __init__(self, session, path_suffix, status_code=502, count=1):
+        super().__init__(session)
+        self.path_suffix = path_suffix
+        self.status_code = status_code
+        self.remaining = count
+
+    def request(self, method, url, **kwargs):
+        response = super().request(method, url, **kwargs)
+        if self.remaining and url.endswith(self.path_suffix):
+            self.remaining -= 1
+            return SimulatedResponse(self.status_code, b'Bad Gateway')
+        return response
@@ -0,0 +1,126 @@
+import asyncio
+
+import pytest
+
+pytest.importorskip('aiohttp')
+
+from python_paystack.async_managers import (AsyncCustomersManager, AsyncPlanManager,
+                                            AsyncTransactionsManager)
+from python_paystack.client import PaystackClient
+from python_paystack.objects.customers import Customer
+from python_paystack.objects.errors import APIConnectionFailedError
+from python_paystack.objects.plans import Plan
+from python_paystack.objects.transactions import Transaction
+from python_paystack.simulator import serve
+
+
+@pytest.fixture(scope='module')
+def server():
+    server = serve(None)
+    yield server
+    server.shutdown()
+    server.server_close()
+
+
+@pytest.fixture
+def client(server, simulator):
+    #One server for the module, answering from each test's own simulator
+    server.simulator = simulator
+    return PaystackClient('sk_test_suite', 'pk_test_suite', paystack_url=server.url)
+
+
+def references(simulator, status=None):
+    return [item['reference'] for item in simulator._resources['transaction'].values()
+            if status is None or item['status'] == status]
+
+
+def test_verify_transaction(simulator, client):
+    simulator.add_transactions(5, statuses=('success',))
+    reference = references(simulator)[0]
+
+    async def main():
+        async with AsyncTransactionsManager(client=client) as manager:
+            return await manager.verify_transaction(reference)
+
+    transaction = asyncio.run(main())
+    assert isinstance(transaction, Transaction)
+    assert transaction.reference == reference
+    assert transaction.email and transaction.authorization_code
+
+
+def test_verify_unknown_reference_raises(client):
+    async def main():
+        async with AsyncTransactionsManager(client=client) as manager:
+            await manager.verify_transaction('missing')
+
+    with pytest.raises(APIConnectionFailedError):
+        asyncio.run(main())
+
+
+def test_create_and_get(client):
+    async def main():
+        async with AsyncCustomersManager(client=client) as customers:
+            created = await customers.create(Customer('async@example.com', 'Ada', 'Obi'))
+            fetched = await customers.get(created.id)
+        async with AsyncPlanManager(client=client) as plans:
+            plan = await plans.create(Plan('Gold', 'monthly', 10000))
+            fetched_plan = await plans.get(plan.id)
+        return created, fetched, plan, fetched_plan
+
+    created, fetched, plan, fetched_plan = asyncio.run(main())
+    assert created.id and fetched.id == created.id
+    assert fetched.email == 'async@example.com' and fetched.first_name == 'Ada'
+    assert fetched_plan.name == 'Gold' and fetched_plan.amount == plan.amount
+
+
+@pytest.mark.parametrize('prefetch', [True, False])
+def test_iter_all(simulator, client, prefetch):
+    simulator.add_transactions(250)
+
+    async def main():
+        async with AsyncTransactionsManager(client=client) as manager:
+            return [transaction async for transaction
+                    in manager.iter_all(per_page=100, prefetch=prefetch)]
+
+    transactions = asyncio.run(main())
+    assert len(transactions) == 250
+    assert all(isinstance(transaction, Transaction) for transaction in transactions)
+    assert {transaction.reference for transaction in transactions} == set(references(simulator))
+
+
+def test_iter_all_filters_and_stops_early(simulator, client):
+    simulator.add_transactions(300)
+    expected = references(simulator, 'success')
+
+    async def main():
+        async with AsyncTransactionsManager(client=client) as manager:
+            filtered = [item async for item
+                        in manager.iter_all(per_page=50, raw=True, status='success')]
+            first = []
+            async for item in manager.iter_all(per_page=50, raw=True):
+                first.append(item)
+                if len(first) == 10:
+                    break
+            return filtered, first
+
+    filtered, first = asyncio.run(main())
+    assert sorted(item['reference'] for item in filtered) == sorted(expected)
+    assert len(first) == 10
+
+
+def test_verify_many(simulator, client):
+    simulator.add_transactions(40)
+    wanted = references(simulator) + ['missing']
+
+    async def main():
+        async with AsyncTransactionsManager(client=client) as manager:
+            manager.verification_cache = None
+            return [result async for result in manager.verify_many(wanted, concurrency=8)]
+
+    results = asyncio.run(main())
+    assert sorted(reference for reference, _, _ in results) == sorted(wanted)
+    for reference, transaction, error in results:
+        if reference == 'missing':
+            assert transaction is None and isinstance(error, APIConnectionFailedError)
+        else:
+            assert error is None and transaction.reference == reference
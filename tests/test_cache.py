@@ -0,0 +1,146 @@
+import asyncio
+import threading
+
+import pytest
+
+from python_paystack.cache import LookupCache, TTLCache, VerificationCache
+from python_paystack.managers import Utils
+
+
+def test_terminal_transactions_are_cached_as_copies():
+    cache = VerificationCache(maxsize=10)
+    calls = []
+
+    def load():
+        calls.append(1)
+        return {'status' : 'success', 'amount' : 5000}
+
+    first = cache.get_or_verify('ref-1', load)
+    first['amount'] = 1
+    assert cache.get_or_verify('ref-1', load) == {'status' : 'success', 'amount' : 5000}
+    assert len(calls) == 1
+
+
+def test_pending_transactions_are_not_cached():
+    cache = VerificationCache(maxsize=10)
+    cache.get_or_verify('ref-1', lambda: {'status' : 'ongoing'})
+    assert cache.get_or_verify('ref-1', lambda: {'status' : 'success'})['status'] == 'success'
+
+
+def test_concurrent_verifications_share_one_load():
+    cache = VerificationCache(maxsize=10)
+    started, release = threading.Event(), threading.Event()
+    calls = []
+
+    def load():
+        calls.append(1)
+        started.set()
+        release.wait()
+        return {'status' : 'ongoing'}
+
+    results = []
+    threads = [threading.Thread(target=lambda: results.append(cache.get_or_verify('ref', load)))
+               for _ in range(4)]
+    threads[0].start()
+    started.wait()
+    for thread in threads[1:]:
+        thread.start()
+    while cache.coalesced < 3:
+        pass
+    release.set()
+    for thread in threads:
+        thread.join()
+
+    assert len(calls) == 1
+    assert results == [{'status' : 'ongoing'}] * 4
+
+
+def test_async_verifications_share_one_load():
+    cache = VerificationCache(maxsize=10)
+    calls = []
+
+    async def load():
+        calls.append(1)
+        await asyncio.sleep(0.01)
+        return {'status' : 'success'}
+
+    async def main():
+        return await asyncio.gather(*[cache.get_or_verify_async('ref', load)
+                                      for _ in range(5)])
+
+    assert asyncio.run(main()) == [{'status' : 'success'}] * 5
+    assert len(calls) == 1
+    assert cache.stats()['coalesced'] == 4
+
+
+def test_cancelled_caller_does_not_fail_the_others():
+    cache = VerificationCache(maxsize=10)
+
+    async def load():
+        await asyncio.sleep(0.05)
+        return {'status' : 'success'}
+
+    async def main():
+        first = asyncio.ensure_future(cache.get_or_verify_async('ref', load))
+        await asyncio.sleep(0)
+        second = asyncio.ensure_future(cache.get_or_verify_async('ref', load))
+        await asyncio.sleep(0)
+        first.cancel()
+        with pytest.raises(asyncio.CancelledError):
+            await first
+        return await second
+
+    assert asyncio.run(main()) == {'status' : 'success'}
+    assert cache.stats()['misses'] == 1
+
+
+def test_failed_load_reaches_every_caller():
+    cache = VerificationCache(maxsize=10)
+
+    async def load():
+        await asyncio.sleep(0.01)
+        raise ValueError('unavailable')
+
+    async def main():
+        return await asyncio.gather(*[cache.get_or_verify_async('ref', load)
+                                      for _ in range(3)], return_exceptions=True)
+
+    results = asyncio.run(main())
+    assert all(isinstance(result, ValueError) for result in results)
+    assert len(cache) == 0
+
+
+def test_cached_lookups_are_copies(simulator, session):
+    utils = Utils(session=session, cache=LookupCache(TTLCache()))
+    banks = utils.get_banks()
+    banks.clear()
+
+    requests = simulator.requests
+    assert utils.get_banks()
+    assert simulator.requests == requests
+
+
+def test_coalesced_lookups_get_their_own_copy():
+    cache = LookupCache(TTLCache())
+    started, release = threading.Event(), threading.Event()
+
+    def load():
+        started.set()
+        release.wait()
+        return [{'name' : 'Bank'}]
+
+    results = []
+    threads = [threading.Thread(target=lambda: results.append(cache.get_or_load('banks', load, 60)))
+               for _ in range(2)]
+    threads[0].start()
+    started.wait()
+    threads[1].start()
+    while cache.misses < 2:
+        pass
+    release.set()
+    for thread in threads:
+        thread.join()
+
+    assert results[0] == results[1] and results[0] is not results[1]
+    results[0].clear()
+    assert cache.get_or_load('banks', load, 60) == [{'name' : 'Bank'}]
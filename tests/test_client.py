@@ -0,0 +1,52 @@
+from python_paystack.client import PaystackClient
+from python_paystack.idempotency import IdempotencyJournal
+from python_paystack.managers import CustomersManager, TransactionsManager
+from python_paystack.mirror import CUSTOMER_FIELDS, Mirror
+from python_paystack.objects.customers import Customer
+
+import pytest
+
+from conftest import RecordingSession
+
+
+def test_requests_use_the_client_headers(recording):
+    client = PaystackClient('sk_tenant_a', 'pk_tenant_a', session=recording)
+    client.transactions.get_total_transactions()
+    method, url, kwargs = recording.calls[-1]
+    assert kwargs['headers']['Authorization'] == 'Bearer sk_tenant_a'
+
+
+def test_bind_does_not_share_the_mirror(session):
+    tenant_a = PaystackClient('sk_a', 'pk_a', session=session)
+    tenant_b = PaystackClient('sk_b', 'pk_b', session=session)
+    manager = CustomersManager(client=tenant_a, mirror=Mirror(CUSTOMER_FIELDS))
+    customer = manager.create(Customer('x@y.com'))
+
+    bound = manager.bind(tenant_b)
+    assert bound.mirror is None
+    assert manager.mirror.find('x@y.com')['id'] == customer.id
+
+    other_mirror = Mirror(CUSTOMER_FIELDS)
+    assert manager.bind(tenant_b, mirror=other_mirror).mirror is other_mirror
+
+
+def test_bind_does_not_share_the_journal(session):
+    client = PaystackClient('sk_b', 'pk_b', session=session)
+    manager = TransactionsManager(session=session, journal=IdempotencyJournal(':memory:'))
+    assert manager.bind(client).journal is None
+
+
+def test_bind_rejects_unknown_attributes(session):
+    manager = CustomersManager(session=session)
+    with pytest.raises(TypeError):
+        manager.bind(PaystackClient('sk_b', 'pk_b'), journal=None)
+
+
+def test_bind_uses_the_new_clients_session(session):
+    dedicated = RecordingSession(session)
+    tenant_a = PaystackClient('sk_a', 'pk_a', session=dedicated)
+    tenant_b = PaystackClient('sk_b', 'pk_b')
+
+    manager = TransactionsManager(client=tenant_a)
+    assert manager._session is dedicated
+    assert manager.bind(tenant_b)._session is None
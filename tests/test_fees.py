@@ -0,0 +1,79 @@
+import pytest
+
+from python_paystack.fees import (batch_transaction_cost, exact_transaction_cost, FEE_CAP,
+                                  FEE_THRESHOLD, FLAT_FEE)
+from python_paystack.objects.transactions import Transaction
+from python_paystack.paystack_config import PaystackConfig
+
+numpy = pytest.importorskip('numpy')
+
+LOCAL_COST, INTL_COST = PaystackConfig.LOCAL_COST, PaystackConfig.INTL_COST
+
+
+@pytest.fixture(scope='module')
+def sample():
+    '''
+    Seeded amounts and locales, concentrated around the flat fee threshold
+    and the fee cap of both rates
+    '''
+    rng = numpy.random.default_rng(20180101)
+    centres = [FEE_THRESHOLD, FEE_THRESHOLD * (1 - LOCAL_COST), FEE_THRESHOLD * (1 - INTL_COST)]
+    for rate in (LOCAL_COST, INTL_COST):
+        centres.append(FEE_CAP * (1 - rate) / rate - FLAT_FEE)
+    amounts = numpy.concatenate([rng.integers(int(centre) - 2000, int(centre) + 2000, 2000)
+                                 for centre in centres] + [rng.integers(1, 20000000, 10000)])
+    locales = rng.choice(numpy.array(['LOCAL', 'INTERNATIONAL']), len(amounts))
+    return amounts, locales
+
+
+def scalar_costs(amounts, locales):
+    transaction = Transaction(1, 'customer@example.com')
+    costs = []
+    for amount, locale in zip(amounts.tolist(), locales.tolist()):
+        transaction.amount = amount
+        costs.append(transaction.full_transaction_cost(locale, LOCAL_COST, INTL_COST))
+    return numpy.array(costs)
+
+
+def test_batch_matches_full_transaction_cost(sample):
+    amounts, locales = sample
+    costs = batch_transaction_cost(amounts, locales, LOCAL_COST, INTL_COST)
+    assert costs.dtype == numpy.int64
+    numpy.testing.assert_array_equal(costs, scalar_costs(amounts, locales))
+
+
+def test_exact_batch_matches_exact_transaction_cost(sample):
+    amounts, locales = sample
+    rates = {'LOCAL' : LOCAL_COST, 'INTERNATIONAL' : INTL_COST}
+    expected = [exact_transaction_cost(amount, rates[locale])
+                for amount, locale in zip(amounts.tolist(), locales.tolist())]
+    costs = batch_transaction_cost(amounts, locales, LOCAL_COST, INTL_COST, exact=True)
+    numpy.testing.assert_array_equal(costs, expected)
+
+
+def test_exact_and_floating_point_agree_within_a_kobo(sample):
+    amounts, locales = sample
+    exact = batch_transaction_cost(amounts, locales, LOCAL_COST, INTL_COST, exact=True)
+    floating = scalar_costs(amounts, locales)
+    assert numpy.abs(exact - floating).max() <= 1
+
+
+def test_sample_covers_the_boundaries(sample):
+    amounts, locales = sample
+    costs = scalar_costs(amounts, locales)
+    capped = costs == amounts + FEE_CAP
+    assert capped.any() and not capped.all()
+    flat_fee = (costs > FEE_THRESHOLD) & ~capped
+    assert flat_fee.any() and (costs <= FEE_THRESHOLD).any()
+
+
+def test_single_locale_and_invalid_locales():
+    amounts = numpy.array([1000, 500000])
+    numpy.testing.assert_array_equal(
+        batch_transaction_cost(amounts, 'LOCAL', LOCAL_COST, INTL_COST),
+        [Transaction(amount, 'customer@example.com').full_transaction_cost(
+            'LOCAL', LOCAL_COST, INTL_COST) for amount in amounts.tolist()])
+    with pytest.raises(ValueError):
+        batch_transaction_cost(amounts, 'MARS', LOCAL_COST, INTL_COST)
+    with pytest.raises(ValueError):
+        batch_transaction_cost(amounts, ['LOCAL'], LOCAL_COST, INTL_COST)
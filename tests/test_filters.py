@@ -0,0 +1,88 @@
+import pytest
+
+from python_paystack.objects.filters import Filter, compile_path
+
+RECORD = {
+    'id' : 1,
+    'amount' : 50000,
+    'currency' : 'NGN',
+    'status' : 'success',
+    'customer' : {'email' : 'a@b.com', 'metadata' : {'tier' : 'gold'}},
+    'authorization' : {'card_type' : 'visa', 'bin' : '408408', 'bank' : None},
+    'plan' : {},
+}
+
+
+def test_find_key_value_finds_top_level_keys_first():
+    record = {'email' : 'top@b.com', 'customer' : {'email' : 'nested@b.com'}}
+    assert Filter.find_key_value('email', record) == (True, 'top@b.com')
+
+
+def test_find_key_value_searches_every_nested_dict():
+    assert Filter.find_key_value('card_type', RECORD) == (True, 'visa')
+    assert Filter.find_key_value('tier', RECORD) == (True, 'gold')
+    assert Filter.find_key_value('bank', RECORD) == (True, None)
+
+
+def test_find_key_value_reports_missing_keys():
+    assert Filter.find_key_value('missing', RECORD) == (False, 0)
+    with pytest.raises(TypeError):
+        Filter.find_key_value('amount', [RECORD])
+
+
+def test_filter_amount():
+    assert Filter.filter_amount(range(10000, 100000), RECORD)
+    assert not Filter.filter_amount(range(10000, 50000), RECORD)
+    with pytest.raises(AttributeError):
+        Filter.filter_amount(range(0, 10), {'customer' : {}})
+
+
+def test_compile_path():
+    assert compile_path('customer.metadata.tier')(RECORD) == 'gold'
+    assert compile_path(('authorization', 'bin'))(RECORD) == '408408'
+    with pytest.raises(ValueError):
+        compile_path('customer..email')
+
+
+def test_predicates_read_nested_paths():
+    assert Filter.equals('customer.email', 'a@b.com')(RECORD)
+    assert not Filter.equals('customer.email.domain', 'b.com')(RECORD)
+    assert Filter.is_in('authorization.card_type', ('visa', 'mastercard'))(RECORD)
+    assert not Filter.is_in('plan.interval', ('monthly',))(RECORD)
+    assert Filter.test('authorization.bin', lambda value: value.startswith('408'))(RECORD)
+    assert not Filter.test('authorization.last4', lambda value: True)(RECORD)
+
+
+def test_between_bounds():
+    assert Filter.between('amount', 50000, 50000)(RECORD)
+    assert Filter.between('amount', low=10000)(RECORD)
+    assert Filter.between('amount', high=50000)(RECORD)
+    assert not Filter.between('amount', range(10000, 50000))(RECORD)
+    assert not Filter.between('authorization.bank', 0)(RECORD)
+    assert not Filter.between('fees', 0)(RECORD)
+
+
+def test_predicates_compose():
+    visa = Filter.equals('authorization.card_type', 'visa')
+    ghs = Filter.equals('currency', 'GHS')
+    large = Filter.between('amount', low=100000)
+
+    assert (visa & ~ghs)(RECORD)
+    assert not (visa & ghs)(RECORD)
+    assert (ghs | visa)(RECORD)
+    assert not (ghs | large)(RECORD)
+    assert (~(ghs | large))(RECORD)
+    assert Filter.all_of(visa, ~ghs, ~large)(RECORD)
+    assert not Filter.all_of(visa, ghs)(RECORD)
+    assert Filter.any_of(ghs, large, visa)(RECORD)
+    assert not Filter.any_of(ghs, large)(RECORD)
+
+
+def test_select_matches_filter_amount():
+    records = [dict(RECORD, id=index, amount=index * 1000) for index in range(200)]
+    amount_range = range(25000, 150000)
+    predicate = Filter.between('amount', amount_range)
+
+    expected = [record for record in records if Filter.filter_amount(amount_range, record)]
+    assert list(predicate.select(records)) == expected
+    assert len(expected) == 125
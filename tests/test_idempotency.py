@@ -0,0 +1,202 @@
+import json
+import sqlite3
+
+import pytest
+import requests
+
+from python_paystack.client import PaystackClient
+from python_paystack.idempotency import IdempotencyJournal, JournalEntry
+from python_paystack.managers import TransactionsManager
+from python_paystack.objects.errors import APIConnectionFailedError, URLValidationError
+from python_paystack.objects.transactions import Transaction
+from python_paystack.paystack_config import PaystackConfig
+
+from conftest import LostResponseSession, RecordingSession
+
+
+class UnreachableSession(RecordingSession):
+    '''
+    Applies the first count requests, then raises a connection error for each of them
+    '''
+
+    def __init__(self, session, count):
+        super().__init__(session)
+        self.remaining = count
+
+    def request(self, method, url, **kwargs):
+        response = super().request(method, url, **kwargs)
+        if self.remaining:
+            self.remaining -= 1
+            raise requests.ConnectionError('connection reset')
+        return response
+
+
+def charge(amount, email, authorization_code='AUTH_1', reference=None):
+    transaction = Transaction(amount, email)
+    transaction.authorization_code = authorization_code
+    transaction.reference = reference
+    return transaction
+
+
+def initializations(session):
+    return [call for call in session.calls if call[1].endswith('/transaction/initialize')]
+
+
+def test_initialize_recovers_when_the_applied_attempt_is_lost(session):
+    lossy = LostResponseSession(session, '/transaction/initialize')
+    manager = TransactionsManager(session=lossy)
+    transaction = manager.initialize_transaction('STANDARD', Transaction(5000, 'a@b.com'))
+
+    assert transaction.authorization_url
+    #The lost attempt, its retry rejected as a duplicate, and one with a new reference
+    assert len(initializations(lossy)) == 3
+
+
+def test_journaled_initialize_recovers_and_completes(session):
+    lossy = LostResponseSession(session, '/transaction/initialize')
+    journal = IdempotencyJournal(':memory:')
+    manager = TransactionsManager(session=lossy, journal=journal)
+
+    first = manager.initialize_transaction('STANDARD', Transaction(5000, 'a@b.com'),
+                                           idempotency_key='order-1')
+    entry = journal.get('order-1', 'pk_test_suite')
+    assert entry.state == JournalEntry.SUCCEEDED
+    assert entry.reference == first.reference
+
+    again = manager.initialize_transaction('STANDARD', Transaction(5000, 'a@b.com'),
+                                           idempotency_key='order-1')
+    assert again.authorization_url == first.authorization_url
+    assert len(initializations(lossy)) == 3
+
+
+def test_supplied_reference_duplicate_is_not_replaced(session):
+    manager = TransactionsManager(session=session)
+    transaction = Transaction(5000, 'a@b.com')
+    transaction.reference = 'order-ref-1'
+    manager.initialize_transaction('STANDARD', transaction)
+
+    repeat = Transaction(5000, 'a@b.com')
+    repeat.reference = 'order-ref-1'
+    with pytest.raises(APIConnectionFailedError, match='Duplicate'):
+        manager.initialize_transaction('STANDARD', repeat)
+
+
+def test_failed_entry_is_pending_again_before_a_new_attempt():
+    journal = IdempotencyJournal(':memory:')
+    entry = journal.begin('order-2', 'charge_authorization', 'ref-2')
+    journal.fail(entry.key, 'Declined')
+    assert journal.get('order-2').state == JournalEntry.FAILED
+
+    entry = journal.begin('order-2', 'charge_authorization', 'ref-other')
+    assert entry.state == JournalEntry.PENDING
+    assert entry.reference == 'ref-2'
+    assert [pending.key for pending in journal.pending()] == ['order-2']
+
+
+def test_retried_charge_after_a_failure_completes(session):
+    journal = IdempotencyJournal(':memory:')
+    manager = TransactionsManager(session=session, journal=journal)
+    transaction = Transaction(5000, 'a@b.com')
+    with pytest.raises(APIConnectionFailedError):
+        manager.charge_authorization(transaction, idempotency_key='order-3')
+    assert journal.get('order-3', 'pk_test_suite').state == JournalEntry.FAILED
+
+    transaction.authorization_code = 'AUTH_1'
+    data = manager.charge_authorization(transaction, idempotency_key='order-3')
+    entry = journal.get('order-3', 'pk_test_suite')
+    assert entry.state == JournalEntry.SUCCEEDED
+    assert entry.response['reference'] == data['reference'] == entry.reference
+
+
+def test_journal_keys_are_scoped_to_the_integration(session):
+    journal = IdempotencyJournal(':memory:')
+    tenant_a = TransactionsManager(client=PaystackClient('sk_a', 'pk_a', session=session),
+                                   journal=journal)
+    tenant_b = TransactionsManager(client=PaystackClient('sk_b', 'pk_b', session=session),
+                                   journal=journal)
+
+    charge_a = Transaction(5000, 'a@b.com')
+    charge_a.authorization_code = 'AUTH_A'
+    charge_b = Transaction(9999, 'c@d.com')
+    charge_b.authorization_code = 'AUTH_B'
+    data_a = tenant_a.charge_authorization(charge_a, idempotency_key='order-1001')
+    data_b = tenant_b.charge_authorization(charge_b, idempotency_key='order-1001')
+
+    assert data_b['reference'] != data_a['reference']
+    assert data_b['amount'] == 9999
+    assert journal.get('order-1001', 'pk_b').response['amount'] == 9999
+    assert list(tenant_a.resolve_pending(older_than=0)) == []
+
+
+def test_unscoped_journal_is_migrated(tmp_path):
+    path = str(tmp_path / 'payments.db')
+    connection = sqlite3.connect(path)
+    connection.execute(
+        "CREATE TABLE operations ("
+        "key TEXT PRIMARY KEY, operation TEXT NOT NULL, reference TEXT NOT NULL, "
+        "state TEXT NOT NULL, response TEXT, error TEXT, "
+        "created REAL NOT NULL, updated REAL NOT NULL)")
+    connection.execute("INSERT INTO operations VALUES "
+                       "('order-4', 'charge_authorization', 'ref-4', 'pending', NULL, NULL, 0, 0)")
+    connection.commit()
+    connection.close()
+
+    journal = IdempotencyJournal(path)
+    entry = journal.get('order-4')
+    assert (entry.tenant, entry.reference, entry.state) == ('', 'ref-4', JournalEntry.PENDING)
+    entry = journal.begin('order-4', 'charge_authorization', 'ref-new', 'pk_a')
+    assert entry.reference == 'ref-new'
+    journal.close()
+
+
+def test_reused_caller_reference_is_not_taken_for_an_earlier_charge(session):
+    manager = TransactionsManager(session=session)
+    manager.charge_authorization(charge(5000, 'a@b.com', reference='order-1'))
+
+    with pytest.raises(APIConnectionFailedError, match='Duplicate'):
+        manager.charge_authorization(charge(99999, 'other@b.com', reference='order-1'))
+
+
+def test_journaled_charge_checks_the_earlier_charge_matches(session):
+    manager = TransactionsManager(session=session, journal=IdempotencyJournal(':memory:'))
+    manager.charge_authorization(charge(5000, 'a@b.com', reference='order-5'))
+
+    with pytest.raises(APIConnectionFailedError, match='different charge'):
+        manager.charge_authorization(charge(99999, 'other@b.com', reference='order-5'),
+                                     idempotency_key='order-5')
+
+
+def test_charge_with_a_lost_response_returns_the_applied_charge(session):
+    manager = TransactionsManager(session=LostResponseSession(
+        session, '/transaction/charge_authorization'))
+    data = manager.charge_authorization(charge(5000, 'a@b.com'))
+    assert (data['amount'], data['status']) == (5000, 'success')
+
+
+def test_retried_initialize_does_not_add_the_fees_twice(session):
+    unreachable = UnreachableSession(session, PaystackConfig.MAX_RETRIES + 1)
+    journal = IdempotencyJournal(':memory:')
+    manager = TransactionsManager(session=unreachable, journal=journal)
+    manager.PASS_ON_TRANSACTION_COST = True
+    transaction = Transaction(5000, 'a@b.com')
+    cost = transaction.full_transaction_cost('LOCAL', manager.LOCAL_COST, manager.INTL_COST)
+
+    with pytest.raises(requests.ConnectionError):
+        manager.initialize_transaction('STANDARD', transaction, idempotency_key='order-6')
+    manager.initialize_transaction('STANDARD', transaction, idempotency_key='order-6')
+
+    assert transaction.amount == 5000
+    amounts = {json.loads(call[2]['data'])['amount'] for call in initializations(unreachable)}
+    assert amounts == {cost}
+
+
+def test_invalid_initialize_is_not_journaled(session):
+    journal = IdempotencyJournal(':memory:')
+    manager = TransactionsManager(session=session, journal=journal)
+    with pytest.raises(URLValidationError):
+        manager.initialize_transaction('STANDARD', Transaction(5000, 'a@b.com'),
+                                       callback_url='not a url', idempotency_key='order-7')
+    with pytest.raises(ValueError):
+        manager.initialize_transaction('POPUP', Transaction(5000, 'a@b.com'),
+                                       idempotency_key='order-8')
+    assert journal.pending() == []
@@ -0,0 +1,46 @@
+'''
+Import time budget. Each check runs in a fresh interpreter, as the test
+session has already imported everything.
+'''
+import os
+import subprocess
+import sys
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+#Cumulative microseconds python -X importtime may report for python_paystack.managers
+IMPORT_BUDGET_US = 100000
+
+#Modules only loaded once a request is sent or a feature needing them is used
+DEFERRED_MODULES = ('requests', 'validators', 'jsonpickle', 'numpy', 'aiohttp')
+
+
+def run_python(*args):
+    return subprocess.run([sys.executable] + list(args), cwd=ROOT, capture_output=True,
+                          text=True, check=True)
+
+
+def import_time(module):
+    '''
+    Returns the cumulative microseconds taken to import module, as reported by -X importtime
+    '''
+    stderr = run_python('-X', 'importtime', '-c', 'import %s' % module).stderr
+    for line in stderr.splitlines():
+        #import time: self [us] | cumulative | imported package
+        fields = line.split('|')
+        if len(fields) == 3 and fields[2].strip() == module:
+            return int(fields[1])
+    raise AssertionError("%s not found in the -X importtime output" % module)
+
+
+def test_importing_managers_defers_heavy_modules():
+    code = ('import sys, python_paystack.managers\n'
+            'print(" ".join(name for name in %r if name in sys.modules))' % (DEFERRED_MODULES,))
+    assert run_python('-c', code).stdout.split() == []
+
+
+def test_importing_managers_is_within_budget():
+    #The best of a few runs, so a busy machine does not fail the test
+    elapsed = min(import_time('python_paystack.managers') for _ in range(3))
+    assert elapsed < IMPORT_BUDGET_US, \
+        "importing python_paystack.managers took %d us" % elapsed
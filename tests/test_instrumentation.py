@@ -0,0 +1,70 @@
+import asyncio
+
+import aiohttp
+import pytest
+import requests
+
+from python_paystack.async_managers import AsyncTransactionsManager
+from python_paystack.instrumentation import Metrics
+from python_paystack.managers import TransactionsManager
+
+
+class BrokenSession():
+    '''
+    Session whose every request raises error
+    '''
+
+    closed = False
+
+    def __init__(self, error):
+        self.error = error
+
+    def request(self, method, url, **kwargs):
+        raise self.error
+
+
+def test_metrics_count_successful_requests(session):
+    metrics = Metrics()
+    manager = TransactionsManager(session=session)
+    manager.instrument = metrics
+    manager.get_total_transactions()
+
+    assert metrics.in_flight == 0
+    assert metrics.snapshot()[('GET', '/transaction/totals')]['statuses'] == {'200' : 1}
+
+
+def test_openmetrics_export_reports_only_measured_series(session):
+    metrics = Metrics()
+    manager = TransactionsManager(session=session)
+    manager.instrument = metrics
+    manager.get_total_transactions()
+
+    exported = metrics.to_openmetrics()
+    labels = '{method="GET",endpoint="/transaction/totals"'
+    assert 'paystack_request_duration_seconds_count%s} 1' % labels in exported
+    assert 'paystack_requests_total%s,status="200"} 1' % labels in exported
+    assert 'paystack_requests_in_flight 0' in exported
+    assert 'pool' not in exported
+    assert exported.endswith('# EOF\n')
+
+
+def test_metrics_record_attempts_that_raise():
+    metrics = Metrics()
+    manager = TransactionsManager(session=BrokenSession(requests.exceptions.ChunkedEncodingError()))
+    manager.instrument = metrics
+    with pytest.raises(requests.exceptions.ChunkedEncodingError):
+        manager.get_total_transactions()
+
+    assert metrics.in_flight == 0
+    assert metrics.snapshot()[('GET', '/transaction/totals')]['statuses'] == {'error' : 1}
+
+
+def test_async_metrics_record_attempts_that_raise():
+    metrics = Metrics()
+    manager = AsyncTransactionsManager(session=BrokenSession(aiohttp.ClientPayloadError()))
+    manager.instrument = metrics
+    with pytest.raises(aiohttp.ClientPayloadError):
+        asyncio.run(manager.verify_transaction('ref-1'))
+
+    assert metrics.in_flight == 0
+    assert metrics.snapshot()[('GET', '/transaction/verify/{id}')]['statuses'] == {'error' : 1}
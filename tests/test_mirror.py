@@ -0,0 +1,106 @@
+from python_paystack.managers import CustomersManager, PlanManager
+from python_paystack.mirror import CUSTOMER_FIELDS, PLAN_FIELDS, Mirror
+from python_paystack.objects.customers import Customer
+from python_paystack.objects.plans import Plan
+
+
+def test_sync_serves_lookups_without_requests(simulator, session):
+    manager = CustomersManager(session=session)
+    for index in range(5):
+        manager.create(Customer('customer%d@example.com' % index))
+
+    mirror = Mirror(CUSTOMER_FIELDS)
+    assert mirror.sync(manager, per_page=2) == 5
+    mirrored = CustomersManager(session=session, mirror=mirror)
+
+    requests = simulator.requests
+    customer = mirrored.get('customer3@example.com')
+    assert customer.email == 'customer3@example.com'
+    assert mirrored.get(customer.customer_code).id == customer.id
+    assert simulator.requests == requests
+
+
+def test_found_records_are_copies():
+    mirror = Mirror(CUSTOMER_FIELDS)
+    mirror.put({'id' : 1, 'email' : 'a@b.com', 'customer_code' : 'CUS_1'})
+    mirror.find('a@b.com')['email'] = 'changed@b.com'
+    assert mirror.find(1)['email'] == 'a@b.com'
+
+
+def test_changed_index_fields_are_reindexed():
+    mirror = Mirror(CUSTOMER_FIELDS)
+    mirror.put({'id' : 1, 'email' : 'a@b.com', 'customer_code' : 'CUS_1'})
+    mirror.merge('CUS_1', {'email' : 'new@b.com'})
+    assert 'a@b.com' not in mirror
+    assert mirror.find('new@b.com')['id'] == 1
+
+    mirror.remove('new@b.com')
+    assert len(mirror) == 0 and 'CUS_1' not in mirror
+
+
+def test_created_customers_are_mirrored(session):
+    mirror = Mirror(CUSTOMER_FIELDS)
+    manager = CustomersManager(session=session, mirror=mirror)
+    customer = manager.create(Customer('a@b.com'))
+    assert mirror.find('a@b.com')['id'] == customer.id
+
+
+def test_incremental_sync_only_fetches_new_records(simulator, recording):
+    manager = CustomersManager(session=recording)
+    for index in range(3):
+        manager.create(Customer('old%d@example.com' % index))
+    mirror = Mirror(CUSTOMER_FIELDS)
+    mirror.sync(manager)
+
+    watermark = mirror.watermark
+    manager.create(Customer('new@example.com'))
+    del recording.calls[:]
+    mirror.sync(manager)
+
+    assert recording.calls[0][2]['params']['from'] == watermark
+    assert len(mirror) == 4 and 'new@example.com' in mirror
+
+
+def test_full_sync_drops_records_paystack_no_longer_lists(simulator, session):
+    manager = CustomersManager(session=session)
+    kept = manager.create(Customer('kept@example.com'))
+    gone = manager.create(Customer('gone@example.com'))
+    mirror = Mirror(CUSTOMER_FIELDS)
+    mirror.sync(manager)
+
+    del simulator._resources['customer'][gone.id]
+    assert mirror.sync(manager, full=True) == 1
+    assert kept.id in mirror and 'gone@example.com' not in mirror
+    assert mirror.stats()['full_synced_at'] is not None
+
+
+def test_missed_lookups_go_to_paystack_and_are_recorded(simulator, session):
+    created = CustomersManager(session=session).create(Customer('a@b.com'))
+    mirror = Mirror(CUSTOMER_FIELDS)
+    manager = CustomersManager(session=session, mirror=mirror)
+
+    assert manager.get(created.id).email == 'a@b.com'
+    requests = simulator.requests
+    assert manager.get('a@b.com').id == created.id
+    assert simulator.requests == requests
+
+
+def test_updates_and_risk_actions_are_mirrored(session):
+    mirror = Mirror(CUSTOMER_FIELDS)
+    manager = CustomersManager(session=session, mirror=mirror)
+    customer = manager.create(Customer('a@b.com'))
+
+    manager.update(customer.id, Customer('a@b.com', first_name='Ada'))
+    assert mirror.find('a@b.com')['first_name'] == 'Ada'
+    manager.set_risk_action('deny', customer)
+    assert mirror.find(customer.id)['risk_action'] == 'deny'
+
+
+def test_plans_are_mirrored_by_plan_code(simulator, session):
+    mirror = Mirror(PLAN_FIELDS)
+    manager = PlanManager(session=session, mirror=mirror)
+    plan = manager.create(Plan('Gold', 'monthly', 10000))
+
+    requests = simulator.requests
+    assert manager.get(plan.plan_code).name == 'Gold'
+    assert simulator.requests == requests
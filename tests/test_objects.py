@@ -0,0 +1,84 @@
+import json
+import tracemalloc
+
+import pytest
+
+from python_paystack.managers import TransactionsManager
+from python_paystack.objects.customers import Customer
+from python_paystack.objects.plans import Plan
+from python_paystack.objects.transactions import Transaction
+from python_paystack.objects.transfers import Transfer
+
+
+def test_response_keys_without_a_field_are_kept():
+    transaction = Transaction.from_dict({'amount' : 5000, 'email' : 'a@b.com',
+                                         'requested_amount' : 5100})
+    assert transaction.requested_amount == 5100
+    assert transaction.to_dict() == {'amount' : 5000, 'email' : 'a@b.com',
+                                     'requested_amount' : 5100}
+    assert Transaction.from_json(transaction.to_json()).requested_amount == 5100
+    assert Transaction.from_json(transaction.to_json(pickled=True),
+                                 pickled=True).requested_amount == 5100
+
+
+def test_missing_attributes_raise_attribute_error():
+    customer = Customer('a@b.com')
+    with pytest.raises(AttributeError):
+        customer.requested_amount
+    assert getattr(customer, 'requested_amount', None) is None
+
+
+def test_to_dict_does_not_grow_objects():
+    transactions = [Transaction(5000, 'a@b.com', trusted=True) for _ in range(10000)]
+    tracemalloc.start()
+    try:
+        before = tracemalloc.get_traced_memory()[0]
+        for transaction in transactions:
+            transaction.to_dict()
+        grown = tracemalloc.get_traced_memory()[0] - before
+    finally:
+        tracemalloc.stop()
+    assert grown < 10000
+    assert not hasattr(transactions[0], '__dict__')
+
+
+def test_attributes_without_a_field_are_sent(recording):
+    transaction = Transaction(5000, 'a@b.com')
+    transaction.subaccount = 'ACCT_x'
+    transaction.bearer = 'subaccount'
+    TransactionsManager(session=recording).initialize_transaction('STANDARD', transaction)
+
+    sent = json.loads(recording.calls[-1][2]['data'])
+    assert (sent['subaccount'], sent['bearer']) == ('ACCT_x', 'subaccount')
+    assert Transaction.from_json(transaction.to_json(pickled=True), pickled=True).bearer == \
+        'subaccount'
+
+
+def test_response_keys_can_be_set_and_deleted():
+    transaction = Transaction.from_dict({'amount' : 5000, 'requested_amount' : 5100})
+    transaction.requested_amount = 1
+    assert transaction.to_dict()['requested_amount'] == 1
+    del transaction.requested_amount
+    assert 'requested_amount' not in transaction.to_dict()
+    with pytest.raises(AttributeError):
+        transaction.requested_amount
+
+
+def test_read_only_properties_still_raise(session):
+    manager = TransactionsManager(session=session)
+    with pytest.raises(AttributeError):
+        manager.session = session
+
+
+@pytest.mark.parametrize('currency', ['NGN', 'ghs', 'USD', 'XOF'])
+def test_plans_and_transfers_accept_iso_currencies(currency):
+    assert Plan('Gold', 'monthly', 10000, currency=currency).currency == currency
+    assert Transfer(5000, 'RCP_1', currency=currency).currency == currency
+
+
+@pytest.mark.parametrize('currency', ['NAIRA', 'XYZ', '', None])
+def test_plans_and_transfers_reject_unknown_currencies(currency):
+    with pytest.raises(ValueError):
+        Plan('Gold', 'monthly', 10000, currency=currency)
+    with pytest.raises(ValueError):
+        Transfer(5000, 'RCP_1', currency=currency)
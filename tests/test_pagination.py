@@ -0,0 +1,146 @@
+import json
+import threading
+import time
+
+import pytest
+
+from python_paystack.managers import TransactionsManager
+from python_paystack.objects.errors import APIConnectionFailedError
+from python_paystack.objects.transactions import Transaction
+from python_paystack.simulator import SimulatedResponse
+
+from conftest import RecordingSession
+
+
+def pages(calls):
+    return [kwargs['params']['page'] for _, _, kwargs in calls]
+
+
+class NoPageCountSession(RecordingSession):
+    '''
+    Answers list requests without pageCount in their meta
+    '''
+
+    def request(self, method, url, **kwargs):
+        response = super().request(method, url, **kwargs)
+        content = json.loads(response.content)
+        content.get('meta', {}).pop('pageCount', None)
+        return SimulatedResponse(response.status_code, json.dumps(content).encode(),
+                                 response.headers)
+
+
+class FailingPageSession(RecordingSession):
+    '''
+    Answers requests for page with a 400 error
+    '''
+
+    def __init__(self, session, page):
+        super().__init__(session)
+        self.page = page
+
+    def request(self, method, url, **kwargs):
+        if kwargs.get('params', {}).get('page') == self.page:
+            self.calls.append((method, url, kwargs))
+            return SimulatedResponse(400, b'{"status": false, "message": "Page unavailable"}')
+        return super().request(method, url, **kwargs)
+
+
+class GatedPageSession(RecordingSession):
+    '''
+    Holds requests for page until released is set
+    '''
+
+    def __init__(self, session, page):
+        super().__init__(session)
+        self.page = page
+        self.released = threading.Event()
+
+    def request(self, method, url, **kwargs):
+        if kwargs.get('params', {}).get('page') == self.page:
+            self.released.wait(5)
+        return super().request(method, url, **kwargs)
+
+
+@pytest.mark.parametrize('prefetch', [True, False])
+def test_iter_all_walks_every_page_in_order(simulator, recording, prefetch):
+    simulator.add_transactions(250)
+    manager = TransactionsManager(session=recording)
+    transactions = list(manager.iter_all(per_page=100, prefetch=prefetch))
+
+    assert len(transactions) == 250
+    assert all(isinstance(transaction, Transaction) for transaction in transactions)
+    assert len({transaction.id for transaction in transactions}) == 250
+    assert pages(recording.calls) == [1, 2, 3]
+
+
+def test_iter_all_without_page_count_stops_on_a_short_page(simulator, session):
+    simulator.add_transactions(250)
+    lacking = NoPageCountSession(session)
+    manager = TransactionsManager(session=lacking)
+
+    assert len(list(manager.iter_all(per_page=100, raw=True))) == 250
+    assert pages(lacking.calls) == [1, 2, 3]
+
+
+def test_iter_all_without_page_count_stops_on_an_empty_page(simulator, session):
+    simulator.add_transactions(200)
+    lacking = NoPageCountSession(session)
+    manager = TransactionsManager(session=lacking)
+
+    assert len(list(manager.iter_all(per_page=100, raw=True))) == 200
+    assert pages(lacking.calls) == [1, 2, 3]
+
+
+@pytest.mark.parametrize('prefetch', [True, False])
+def test_iter_all_raises_a_failed_page_after_the_pages_before_it(simulator, session, prefetch):
+    simulator.add_transactions(250)
+    failing = FailingPageSession(session, 2)
+    manager = TransactionsManager(session=failing)
+    received = []
+
+    with pytest.raises(APIConnectionFailedError):
+        for item in manager.iter_all(per_page=100, raw=True, prefetch=prefetch):
+            received.append(item)
+
+    assert len(received) == 100
+    assert pages(failing.calls) == [1, 2]
+
+
+def test_closing_iter_all_early_does_not_wait_for_the_prefetched_page(simulator, session):
+    simulator.add_transactions(250)
+    gated = GatedPageSession(session, 2)
+    manager = TransactionsManager(session=gated)
+
+    iterator = manager.iter_all(per_page=100, raw=True)
+    next(iterator)
+    started = time.perf_counter()
+    iterator.close()
+    assert time.perf_counter() - started < 1
+
+    gated.released.set()
+    with pytest.raises(StopIteration):
+        next(iterator)
+    #The prefetch in flight may finish, but no page after it is requested
+    deadline = time.monotonic() + 5
+    while len(gated.calls) < 2 and time.monotonic() < deadline:
+        time.sleep(0.01)
+    assert pages(gated.calls) == [1, 2]
+
+
+def test_iter_all_sends_filters_to_the_server(simulator, recording):
+    simulator.add_transactions(300)
+    manager = TransactionsManager(session=recording)
+    expected = sum(1 for item in simulator._resources['transaction'].values()
+                   if item['status'] == 'success')
+
+    transactions = list(manager.iter_all(per_page=50, raw=True, status='success',
+                                         start='2000-01-01', end='2999-01-01'))
+
+    assert len(transactions) == expected
+    assert all(item['status'] == 'success' for item in transactions)
+    for _, _, kwargs in recording.calls:
+        params = kwargs['params']
+        assert params['status'] == 'success'
+        assert params['from'] == '2000-01-01' and params['to'] == '2999-01-01'
+        assert params['perPage'] == 50
+    assert len(recording.calls) == -(-expected // 50)
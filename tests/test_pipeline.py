@@ -0,0 +1,26 @@
+from python_paystack.managers import TransactionsManager
+
+
+def add_trace_header(manager, call):
+    call.headers['X-Trace-Id'] = 'trace-1'
+
+
+def test_stages_can_add_headers(recording):
+    manager = TransactionsManager(session=recording)
+    manager.request_stages = manager.request_stages + (add_trace_header,)
+    manager.get_total_transactions()
+
+    headers = recording.calls[-1][2]['headers']
+    assert headers['X-Trace-Id'] == 'trace-1'
+    assert headers['Authorization'] == 'Bearer %s' % manager.SECRET_KEY
+    assert 'X-Trace-Id' not in manager.headers
+
+
+def test_headers_added_before_authentication_are_kept(recording):
+    manager = TransactionsManager(session=recording)
+    manager.request_stages = (add_trace_header,) + manager.request_stages
+    manager.get_total_transactions()
+
+    headers = recording.calls[-1][2]['headers']
+    assert headers['X-Trace-Id'] == 'trace-1'
+    assert headers['Authorization'] == 'Bearer %s' % manager.SECRET_KEY
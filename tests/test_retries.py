@@ -0,0 +1,42 @@
+import pytest
+
+from python_paystack.managers import TransfersManager
+from python_paystack.objects.errors import APIConnectionFailedError
+from python_paystack.objects.transfers import Transfer
+from python_paystack.ratelimit import RetryPolicy
+
+from conftest import LostResponseSession
+
+
+@pytest.mark.parametrize('method, status_code, idempotent, retried', [
+    ('POST', 429, False, True),
+    ('POST', 503, False, False),
+    ('POST', 502, False, False),
+    ('POST', 503, True, True),
+    ('GET', 503, False, True),
+    ('GET', None, False, True),
+    ('POST', None, False, False),
+    ('GET', 404, False, False),
+])
+def test_should_retry(method, status_code, idempotent, retried):
+    policy = RetryPolicy(max_retries=3)
+    assert policy.should_retry(method, status_code, 0, idempotent) is retried
+
+
+def test_retries_stop_at_max_retries():
+    assert not RetryPolicy(max_retries=2).should_retry('GET', 503, 2)
+
+
+def test_transfer_is_not_resent_after_a_503(session):
+    lossy = LostResponseSession(session, '/transfer', status_code=503)
+    with pytest.raises(APIConnectionFailedError):
+        TransfersManager(session=lossy).create(Transfer(5000, 'RCP_1'))
+    assert len(lossy.calls) == 1
+
+
+def test_throttled_transfer_is_resent(simulator, session):
+    simulator.throttle_rate = 1
+    manager = TransfersManager(session=session)
+    with pytest.raises(APIConnectionFailedError):
+        manager.create(Transfer(5000, 'RCP_1'))
+    assert simulator.requests == manager.retry_policy.max_retries + 1
@@ -0,0 +1,56 @@
+import pytest
+
+from python_paystack.managers import TransfersManager
+from python_paystack.objects.errors import APIConnectionFailedError
+from python_paystack.objects.transfers import Transfer
+
+from conftest import LostResponseSession
+
+
+def transfers(count, currency='NGN'):
+    return [Transfer(1000 + index, 'RCP_%d' % index, currency=currency)
+            for index in range(count)]
+
+
+def test_bulk_create_chunks_by_currency(recording):
+    manager = TransfersManager(session=recording)
+    results = list(manager.bulk_create(transfers(150) + transfers(20, 'GHS'), chunk_size=100))
+
+    assert len(results) == 170
+    assert all(error is None for _, _, error in results)
+    assert len(recording.calls) == 3
+    for transfer, created, _ in results:
+        assert created.amount == transfer.amount
+        assert created.reference == transfer.reference
+
+
+def test_bulk_create_gives_transfers_references(session):
+    manager = TransfersManager(session=session)
+    supplied = Transfer(5000, 'RCP_x', reference='payout-1')
+    results = list(manager.bulk_create(transfers(3) + [supplied]))
+
+    references = [transfer.reference for transfer, _, _ in results]
+    assert all(references) and len(set(references)) == 4
+    assert 'payout-1' in references
+
+
+def test_resubmitted_chunk_is_not_paid_twice(session):
+    lossy = LostResponseSession(session, '/transfer/bulk')
+    manager = TransfersManager(session=lossy)
+    failed = [transfer for transfer, _, error in manager.bulk_create(transfers(5))
+              if error is not None]
+    assert len(failed) == 5
+
+    results = list(manager.bulk_create(failed))
+    assert all(isinstance(error, APIConnectionFailedError) for _, _, error in results)
+    assert 'Duplicate' in str(results[0][2])
+    _, meta = TransfersManager(session=session).get_all()
+    assert meta['total'] == 5
+
+
+def test_bulk_create_checks_its_arguments(session):
+    manager = TransfersManager(session=session)
+    with pytest.raises(ValueError):
+        list(manager.bulk_create(transfers(1), chunk_size=101))
+    with pytest.raises(TypeError):
+        list(manager.bulk_create([object()]))
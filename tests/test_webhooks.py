@@ -0,0 +1,107 @@
+import json
+import queue
+import threading
+
+import pytest
+
+from python_paystack.objects.errors import InvalidSignatureError
+from python_paystack.webhooks import compute_signature, parse_event, WebhookProcessor
+
+SECRET_KEY = 'sk_test_webhooks'
+
+
+def delivery(event, **data):
+    payload = json.dumps({'event' : event, 'data' : data}).encode()
+    return payload, compute_signature(payload, SECRET_KEY)
+
+
+def test_repeated_delivery_is_dropped():
+    handled = []
+    with WebhookProcessor(SECRET_KEY, workers=2) as processor:
+        processor.on('charge.success', handled.append)
+        payload, signature = delivery('charge.success', id=1, reference='ref-1', amount=5000)
+        assert processor.submit(payload, signature) is not None
+        assert processor.submit(payload, signature) is None
+        processor.join()
+
+    assert [event.object.reference for event in handled] == ['ref-1']
+    assert processor.stats['duplicates'] == 1
+
+
+def test_invalid_signature_is_rejected():
+    processor = WebhookProcessor(SECRET_KEY, workers=1)
+    payload, _ = delivery('charge.success', id=1)
+    with pytest.raises(InvalidSignatureError):
+        processor.submit(payload, compute_signature(payload, 'sk_other'))
+    processor.close()
+
+
+def test_event_not_queued_is_not_remembered():
+    release = threading.Event()
+    processor = WebhookProcessor(SECRET_KEY, workers=1, queue_size=1, batch_size=1)
+    processor.on('*', lambda event: release.wait())
+
+    #One event held by the worker, one filling the queue
+    processor.submit(*delivery('charge.success', id=1))
+    processor.submit(*delivery('charge.success', id=2))
+    payload, signature = delivery('charge.success', id=3)
+    with pytest.raises(queue.Full):
+        processor.submit(payload, signature, timeout=0.2)
+
+    release.set()
+    assert processor.submit(payload, signature) is not None
+    processor.close()
+    assert processor.stats['handled'] == 3
+
+
+def test_events_are_told_apart_by_their_codes():
+    first = parse_event(delivery('subscription.create', subscription_code='SUB_1')[0])
+    second = parse_event(delivery('subscription.create', subscription_code='SUB_2')[0])
+    assert first.key != second.key
+
+
+def test_events_without_an_identifier_are_keyed_by_their_data():
+    first = parse_event(delivery('paymentrequest.pending', amount=1, note='a')[0])
+    again = parse_event(json.dumps({'data' : {'note' : 'a', 'amount' : 1},
+                                    'event' : 'paymentrequest.pending'}))
+    other = parse_event(delivery('paymentrequest.pending', amount=2, note='a')[0])
+    assert first.key == again.key
+    assert first.key != other.key
+
+
+def test_failing_error_handler_does_not_stop_the_worker():
+    def error_handler(event, error):
+        raise RuntimeError('error handler failed')
+
+    def handler(event):
+        raise ValueError('handler failed')
+
+    processor = WebhookProcessor(SECRET_KEY, workers=1, error_handler=error_handler)
+    processor.on('charge.success', handler)
+    for index in range(3):
+        processor.submit(*delivery('charge.success', id=index))
+    processor.join()
+
+    assert all(worker.is_alive() for worker in processor._workers)
+    assert processor.stats['handled'] == 3
+    assert processor.stats['failed'] == 3
+    assert processor.stats['error_handler_failed'] == 3
+    processor.close()
+
+
+def test_worker_survives_dispatch_errors(monkeypatch):
+    processor = WebhookProcessor(SECRET_KEY, workers=1)
+    calls = []
+
+    def dispatch(event):
+        calls.append(event)
+        if len(calls) == 1:
+            raise RuntimeError('dispatch failed')
+
+    monkeypatch.setattr(processor, 'dispatch', dispatch)
+    for index in range(3):
+        processor.submit(*delivery('charge.success', id=index))
+    processor.join()
+
+    assert len(calls) == 3 and processor.stats['failed'] == 1
+    processor.close()